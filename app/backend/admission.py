@@ -0,0 +1,150 @@
+"""
+Event-loop lag monitoring and session admission control
+Reports readiness and turns away new sessions while the process is saturated
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional
+
+from resilience import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Samples how late the event loop wakes up a sleeping task."""
+
+    def __init__(self, interval_ms: float = 100.0, window_size: int = 50):
+        """
+        Initialize the lag monitor.
+
+        Args:
+            interval_ms: Time between samples
+            window_size: Recent samples used for the lag percentile
+        """
+        self.interval_ms = interval_ms
+        self.samples = LatencyWindow(window_size)
+        self.max_lag_ms = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start sampling on the running event loop."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._sample())
+
+    async def _sample(self):
+        interval = self.interval_ms / 1000
+        while True:
+            start_time = time.perf_counter()
+            await asyncio.sleep(interval)
+            # Anything beyond the requested sleep was spent waiting for the loop
+            lag_ms = max(0.0, (time.perf_counter() - start_time - interval) * 1000)
+            self.samples.add(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+    def lag_ms(self, percentile: float = 95) -> float:
+        """Get a recent lag percentile in milliseconds (0 before any sample)."""
+        return self.samples.percentile(percentile) or 0.0
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+class AdmissionController:
+    """Decides whether the process can take another voice session."""
+
+    def __init__(
+        self,
+        monitor: EventLoopLagMonitor,
+        max_sessions: int = 50,
+        max_lag_ms: float = 100.0,
+        retry_after_seconds: int = 5,
+    ):
+        """
+        Initialize the admission controller.
+
+        Args:
+            monitor: Event-loop lag monitor
+            max_sessions: Sessions this process accepts at most
+            max_lag_ms: p95 event-loop lag above which no session is admitted
+            retry_after_seconds: Retry hint returned to rejected callers
+        """
+        self.monitor = monitor
+        self.max_sessions = max_sessions
+        self.max_lag_ms = max_lag_ms
+        self.retry_after_seconds = retry_after_seconds
+        self.admitted = 0
+        self.rejected = 0
+
+    def check(self, active_sessions: int) -> Optional[str]:
+        """
+        Check whether the process is over capacity.
+
+        Args:
+            active_sessions: Voice sessions currently running in this process
+
+        Returns:
+            The reason the process is over capacity, or None if it has room
+        """
+        if active_sessions >= self.max_sessions:
+            return f"session limit reached ({active_sessions}/{self.max_sessions})"
+        lag_ms = self.monitor.lag_ms()
+        if lag_ms > self.max_lag_ms:
+            return f"event loop lag {lag_ms:.0f}ms over {self.max_lag_ms:.0f}ms"
+        return None
+
+    def admit(self, active_sessions: int) -> Optional[str]:
+        """Check capacity for a new session and count the decision."""
+        reason = self.check(active_sessions)
+        if reason is None:
+            self.admitted += 1
+        else:
+            self.rejected += 1
+            logger.warning(f"🚦 Session rejected: {reason}")
+        return reason
+
+    def get_stats(self, active_sessions: int) -> Dict[str, Any]:
+        """Get readiness inputs and admission counters."""
+        return {
+            "active_sessions": active_sessions,
+            "max_sessions": self.max_sessions,
+            "event_loop_lag_p95_ms": round(self.monitor.lag_ms(), 1),
+            "event_loop_lag_max_ms": round(self.monitor.max_lag_ms, 1),
+            "max_lag_ms": self.max_lag_ms,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+        }
+
+
+# Global instance
+_admission_controller: Optional[AdmissionController] = None
+
+
+def get_admission_controller() -> AdmissionController:
+    """
+    Get the global admission controller instance.
+
+    Limits come from MAX_SESSIONS, MAX_EVENT_LOOP_LAG_MS and
+    SESSION_RETRY_AFTER_SECONDS.
+
+    Returns:
+        AdmissionController instance
+    """
+    global _admission_controller
+    if _admission_controller is None:
+        _admission_controller = AdmissionController(
+            EventLoopLagMonitor(),
+            max_sessions=int(os.getenv("MAX_SESSIONS", "50")),
+            max_lag_ms=float(os.getenv("MAX_EVENT_LOOP_LAG_MS", "100")),
+            retry_after_seconds=int(os.getenv("SESSION_RETRY_AFTER_SECONDS", "5")),
+        )
+    return _admission_controller
@@ -3,6 +3,7 @@ FastAPI WebSocket server for Voice Assistant
 Clean implementation using webhandler.py for cloud/container deployments
 """
 
+import argparse
 import asyncio
 import json
 import logging
@@ -10,31 +11,100 @@ import base64
 from typing import Dict, List, Optional
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from contextlib import asynccontextmanager
 import uvicorn
+import importlib
 import os
-
-from web_handler import WebSocketVoiceClient, VoiceAssistantBridge
+import tempfile
+
+from admission import get_admission_controller
+from bridge import VoiceAssistantBridge
+from sampling_profiler import ProfilerBusyError, get_sampling_profiler
+from session_registry import CONTROL_MESSAGES, get_session_registry
+from stall_detector import get_stall_detector
+from task_context import set_task_context
+from structured_logging import (
+    configure_logging,
+    get_logging_pipeline,
+    get_sampled_logger,
+)
+from tracing import get_tracing
+from tool_loader import get_tool_loader
+from tools.search_client import get_search_client_manager
+from tools.embeddings import get_embedding_client
 from azure.core.credentials import AzureKeyCredential
 
-# Set up logging
-logging.basicConfig(
-    level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-)
+# Set up logging: queued, context-tagged, with per-frame audio logs sampled
+configure_logging()
 logger = logging.getLogger(__name__)
+audio_logger = get_sampled_logger("voice.audio")
 
 
 # Global bridge instance
 bridge = VoiceAssistantBridge()
 
 
+async def warm_up_backend():
+    """Load session and tool dependencies once the server is already answering."""
+    try:
+        # Import the VoiceLive SDK off the event loop before the first session
+        await asyncio.to_thread(importlib.import_module, "web_handler")
+
+        # Warm up tool worker processes before the first caller needs them
+        tool_loader = await asyncio.to_thread(get_tool_loader)
+        await tool_loader.warm_up_executors()
+
+        # Own the shared search client: pool, token and first query paid up front
+        await get_search_client_manager().warm_up()
+
+        # Precompute query vectors for common questions
+        embedding_client = get_embedding_client()
+        if embedding_client is not None:
+            await embedding_client.warm_up(tool_loader.get_warm_up_queries())
+
+        logger.info("Backend warm-up complete")
+    except Exception as e:
+        logger.error(f"Backend warm-up failed: {e}")
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     logger.info("Starting WebSocket server...")
+
+    # Sample event-loop lag for readiness and session admission
+    get_admission_controller().monitor.start()
+
+    # Own sessions in the shared registry and take control messages routed here
+    session_registry = get_session_registry()
+    await session_registry.start(handle_routed_control)
+
+    # Configure span export before the first session starts
+    get_tracing()
+
+    # Opt-in watchdog that reports what blocked the event loop
+    stall_detector = get_stall_detector()
+    if stall_detector is not None:
+        stall_detector.start()
+
+    # Warm up in the background so a cold start answers /health right away
+    warm_up_task = asyncio.create_task(warm_up_backend())
+
     yield
     logger.info("Shutting down WebSocket server...")
+    warm_up_task.cancel()
+    await get_admission_controller().monitor.stop()
+    await session_registry.stop()
+    if stall_detector is not None:
+        await stall_detector.stop()
+    await get_search_client_manager().close()
+    if get_embedding_client() is not None:
+        await get_embedding_client().close()
+    get_tool_loader().shutdown_executors()
+    # Flush spans still queued for export
+    get_tracing().shutdown()
 
 
 # Create FastAPI app
@@ -62,11 +132,95 @@ async def health_check():
     return {"status": "healthy", "service": "voice-assistant-websocket"}
 
 
+@app.get("/ready")
+async def readiness_check():
+    """Readiness endpoint: 503 while the process cannot take new sessions"""
+    admission = get_admission_controller()
+    active_sessions = len(bridge.voice_clients)
+    reason = admission.check(active_sessions)
+    body = {
+        "status": "ready" if reason is None else "not_ready",
+        "reason": reason,
+        **admission.get_stats(active_sessions),
+    }
+    if reason is None:
+        return body
+    return JSONResponse(
+        status_code=503,
+        content=body,
+        headers={"Retry-After": str(admission.retry_after_seconds)},
+    )
+
+
+@app.get("/debug/stalls")
+async def stall_report():
+    """Event-loop stalls with the coroutine, session and stack that caused them"""
+    stall_detector = get_stall_detector()
+    if stall_detector is None:
+        return {"enabled": False}
+    return stall_detector.get_report()
+
+
+@app.get("/debug/profile")
+async def profile(seconds: float = 10, format: str = "collapsed"):
+    """Sample the event loop and tool worker threads for a window, by phase"""
+    profiler = get_sampling_profiler()
+    if profiler is None:
+        return JSONResponse(status_code=404, content={"error": "Profiling disabled"})
+    try:
+        result = await profiler.profile(seconds, format)
+    except ProfilerBusyError as e:
+        return JSONResponse(status_code=409, content={"error": str(e)})
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+
+    if format == "collapsed":
+        return PlainTextResponse(result["profile"])
+    return result["profile"]
+
+
+@app.get("/debug/logging")
+async def logging_settings():
+    """Log levels, sampling rates and queue counters"""
+    return get_logging_pipeline().get_stats()
+
+
+@app.post("/debug/logging")
+async def update_logging_settings(settings: dict):
+    """Change per-category levels and sampling rates at runtime"""
+    if os.getenv("LOGGING_ADMIN_ENABLED", "false").lower() != "true":
+        return JSONResponse(
+            status_code=404, content={"error": "Logging admin disabled"}
+        )
+    pipeline = get_logging_pipeline()
+    try:
+        for category, level in settings.get("levels", {}).items():
+            pipeline.set_level(category, level)
+        for category, every_n in settings.get("sample_rates", {}).items():
+            pipeline.set_sample_rate(category, int(every_n))
+    except (TypeError, ValueError) as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
+    return pipeline.get_stats()
+
+
+@app.get("/debug/search")
+async def search_stats():
+    """Search warm-up, first-query and steady-state latencies"""
+    return get_search_client_manager().get_stats()
+
+
+@app.get("/sessions")
+async def session_stats():
+    """Session ownership for this worker and across all workers"""
+    return await get_session_registry().get_stats()
+
+
 # Define WebSocket endpoint
 @app.websocket("/ws/{client_id}")
 async def websocket_endpoint(websocket: WebSocket, client_id: str):
     """WebSocket endpoint for voice assistant communication"""
     await bridge.connect(websocket, client_id)
+    set_task_context(session_id=client_id)
 
     try:
         while True:
@@ -82,11 +236,25 @@ async def websocket_endpoint(websocket: WebSocket, client_id: str):
         logger.error(f"WebSocket error for client {client_id}: {e}")
     finally:
         await bridge.disconnect(client_id)
+        await get_session_registry().release(client_id)
 
 
 async def handle_frontend_message(client_id: str, message: dict, websocket: WebSocket):
     """Handle messages from frontend"""
     message_type = message.get("type")
+    voice_client = bridge.voice_clients.get(client_id)
+    if voice_client is not None:
+        voice_client.record_client_message(message)
+    set_task_context(
+        phase="audio_relay"
+        if message_type in ("audio_chunk", "send_audio")
+        else "session_control"
+    )
+
+    # Control messages for a session another worker owns are routed to it
+    if message_type in CONTROL_MESSAGES and client_id not in bridge.voice_clients:
+        await route_control_message(client_id, message)
+        return
 
     if message_type == "start_session":
         await start_voice_session(client_id, message.get("config", {}))
@@ -110,6 +278,21 @@ async def handle_frontend_message(client_id: str, message: dict, websocket: WebS
 
 async def start_voice_session(client_id: str, config: dict):
     """Start a voice session for the client"""
+    # Turn new callers away fast rather than degrading every running session
+    admission = get_admission_controller()
+    reason = admission.admit(len(bridge.voice_clients))
+    if reason is not None:
+        await bridge.send_message(
+            client_id,
+            {
+                "type": "session_error",
+                "error": f"Server busy: {reason}",
+                "retryable": True,
+                "retry_after_seconds": admission.retry_after_seconds,
+            },
+        )
+        return
+
     try:
         # Get environment variables
         endpoint = os.getenv("AZURE_VOICELIVE_ENDPOINT")
@@ -128,9 +311,10 @@ async def start_voice_session(client_id: str, config: dict):
         with open(instructions_path, "r", encoding="utf-8") as f:
             instructions = f.read()
 
-        # Load tools from YAML configuration
-        from tool_loader import get_tool_loader
+        # Load the VoiceLive client on first use to keep cold starts fast
+        from web_handler import WebSocketVoiceClient
 
+        # Load tools from YAML configuration
         tool_loader = get_tool_loader()
         tools = tool_loader.get_tool_definitions()
 
@@ -155,8 +339,10 @@ async def start_voice_session(client_id: str, config: dict):
                 }
 
                 await bridge.send_message(client_id, message)
-                logger.debug(
-                    f"🔊 Audio data streamed to client {client_id} ({len(audio_data)} bytes)"
+                audio_logger.debug(
+                    "🔊 Audio data streamed to client %s (%d bytes)",
+                    client_id,
+                    len(audio_data),
                 )
 
             except Exception as e:
@@ -180,6 +366,15 @@ async def start_voice_session(client_id: str, config: dict):
         # Store client
         bridge.voice_clients[client_id] = voice_client
 
+        # Take the session over from a worker still holding this client ID
+        session_registry = get_session_registry()
+        previous_owner = await session_registry.claim(client_id)
+        if previous_owner is not None:
+            logger.info(f"Client {client_id} moved from worker {previous_owner}")
+            await session_registry.send(
+                previous_owner, client_id, {"type": "stop_session"}
+            )
+
         # Send session started event
         await bridge.send_message(
             client_id,
@@ -217,6 +412,7 @@ async def stop_voice_session(client_id: str):
         voice_client = bridge.voice_clients[client_id]
         await voice_client.cleanup()
         del bridge.voice_clients[client_id]
+        await get_session_registry().release(client_id)
 
         await bridge.send_message(
             client_id, {"type": "session_stopped", "status": "success"}
@@ -224,6 +420,31 @@ async def stop_voice_session(client_id: str):
         logger.info(f"Voice session stopped for client {client_id}")
 
 
+async def route_control_message(client_id: str, message: dict):
+    """Forward a control message to the worker that owns the session"""
+    owner = await get_session_registry().route(client_id, message)
+    if owner is None:
+        return
+
+    logger.info(f"Routed {message['type']} for client {client_id} to worker {owner}")
+    acknowledgement = {
+        "interrupt": "assistant_interrupted",
+        "stop_session": "session_stopped",
+    }[message["type"]]
+    await bridge.send_message(
+        client_id, {"type": acknowledgement, "status": "success", "worker": owner}
+    )
+
+
+async def handle_routed_control(client_id: str, message: dict):
+    """Apply a control message another worker routed to this one"""
+    message_type = message.get("type")
+    if message_type == "interrupt":
+        await interrupt_assistant(client_id)
+    elif message_type == "stop_session":
+        await stop_voice_session(client_id)
+
+
 async def handle_audio_input(client_id: str, audio_data: str):
     """Handle audio input from frontend (legacy method)"""
     if client_id not in bridge.voice_clients:
@@ -233,7 +454,7 @@ async def handle_audio_input(client_id: str, audio_data: str):
     try:
         # Audio data should be base64 encoded
         await voice_client.process_audio_input(audio_data)
-        logger.debug(f"Audio input processed for client {client_id}")
+        audio_logger.debug("Audio input processed for client %s", client_id)
     except Exception as e:
         logger.error(f"Error handling audio input for {client_id}: {e}")
 
@@ -248,7 +469,7 @@ async def handle_audio_chunk(client_id: str, audio_base64: str):
     try:
         # Process audio chunk
         await voice_client.process_audio_input(audio_base64)
-        logger.debug(f"Audio chunk processed for client {client_id}")
+        audio_logger.debug("Audio chunk processed for client %s", client_id)
     except Exception as e:
         logger.error(f"Error handling audio chunk for {client_id}: {e}")
 
@@ -289,5 +510,48 @@ else:
         }
 
 
+def main():
+    """Run the server, with one event loop per worker process"""
+    parser = argparse.ArgumentParser(description="Voice Assistant WebSocket server")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", "1")),
+        help="worker processes, one per CPU core (default: WEB_CONCURRENCY or 1)",
+    )
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument(
+        "--reload",
+        action="store_true",
+        help="restart on code changes, for development (single worker only)",
+    )
+    args = parser.parse_args()
+    if args.reload and args.workers > 1:
+        parser.error("--reload runs a single worker")
+
+    if args.workers > 1:
+        # Workers must agree on who owns each session to route control messages
+        registry = os.getenv("SESSION_REGISTRY", "memory").lower()
+        if registry == "memory":
+            os.environ["SESSION_REGISTRY"] = "local"
+            os.environ.setdefault(
+                "SESSION_REGISTRY_PATH",
+                os.path.join(tempfile.gettempdir(), f"voice-sessions-{os.getpid()}.db"),
+            )
+        logger.info(
+            f"Starting {args.workers} workers with the "
+            f"{os.environ['SESSION_REGISTRY']} session registry"
+        )
+
+    uvicorn.run(
+        "app:app",
+        host="0.0.0.0",
+        port=args.port,
+        workers=args.workers,
+        reload=args.reload,
+        log_level="info",
+    )
+
+
 if __name__ == "__main__":
-    uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=True, log_level="info")
+    main()
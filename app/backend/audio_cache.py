@@ -0,0 +1,147 @@
+"""
+Phrase audio cache for Voice Assistant
+Stores audio for fixed assistant phrases on disk so they can be served locally
+"""
+
+import os
+import re
+import hashlib
+import logging
+from typing import Dict, Optional
+from pathlib import Path
+
+import aiofiles
+import yaml
+
+logger = logging.getLogger(__name__)
+
+# Bytes per 100ms of 24kHz mono PCM16, matching upstream delta sizes
+AUDIO_CHUNK_SIZE = 4800
+
+
+def normalize_phrase(text: str) -> str:
+    """Normalize phrase text so transcripts compare equal despite punctuation."""
+    text = re.sub(r"[^\w\s]", "", text.lower())
+    return " ".join(text.split())
+
+
+class PhraseAudioCache:
+    """Caches raw PCM16 audio for configured phrases by text, voice and format."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        phrases_file: str = "cached_phrases.yaml",
+    ):
+        """
+        Initialize the phrase audio cache.
+
+        Args:
+            cache_dir: Directory where audio files are stored
+            phrases_file: YAML file in the shared folder listing cacheable phrases
+        """
+        self.cache_dir = Path(
+            cache_dir
+            or os.getenv("AUDIO_CACHE_DIR")
+            or Path(__file__).parent / ".audio_cache"
+        )
+        self.phrases_path = Path(__file__).parent / "shared" / phrases_file
+        self.phrases: Dict[str, str] = {}
+        self._memory: Dict[str, bytes] = {}
+
+        self._load_phrases()
+
+    def _load_phrases(self):
+        """Load configured phrases from YAML file."""
+        try:
+            if not self.phrases_path.exists():
+                logger.warning(f"Phrases file not found: {self.phrases_path}")
+                return
+
+            with open(self.phrases_path, "r", encoding="utf-8") as file:
+                self.phrases = yaml.safe_load(file).get("phrases", {}) or {}
+            logger.info(f"Loaded {len(self.phrases)} cacheable phrases")
+
+        except Exception as e:
+            logger.error(f"Error loading cacheable phrases: {e}")
+            self.phrases = {}
+
+    def get_phrase(self, name: str) -> Optional[str]:
+        """Get the text of a configured phrase by name."""
+        return self.phrases.get(name)
+
+    @staticmethod
+    def make_key(text: str, voice: str, audio_format: str = "pcm16") -> str:
+        """Build the cache key for a phrase."""
+        raw = f"{normalize_phrase(text)}|{voice}|{audio_format}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str, audio_format: str) -> Path:
+        return self.cache_dir / f"{key}.{audio_format}"
+
+    async def get(
+        self, text: str, voice: str, audio_format: str = "pcm16"
+    ) -> Optional[bytes]:
+        """
+        Get cached audio for a phrase.
+
+        Returns:
+            Raw audio bytes, or None on a cache miss
+        """
+        key = self.make_key(text, voice, audio_format)
+        if key in self._memory:
+            return self._memory[key]
+
+        path = self._path_for(key, audio_format)
+        if not path.exists():
+            return None
+
+        try:
+            async with aiofiles.open(path, "rb") as file:
+                audio = await file.read()
+        except Exception as e:
+            logger.error(f"Error reading cached audio {path}: {e}")
+            return None
+
+        self._memory[key] = audio
+        return audio
+
+    async def put(
+        self, text: str, voice: str, audio: bytes, audio_format: str = "pcm16"
+    ):
+        """Store audio for a phrase in memory and on disk."""
+        if not audio:
+            return
+
+        key = self.make_key(text, voice, audio_format)
+        self._memory[key] = audio
+
+        path = self._path_for(key, audio_format)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see partial audio;
+            # the temp name is per process since workers share the cache
+            tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+            async with aiofiles.open(tmp_path, "wb") as file:
+                await file.write(audio)
+            os.replace(tmp_path, path)
+            logger.info(f"Cached phrase audio ({len(audio)} bytes): {text}")
+        except Exception as e:
+            logger.error(f"Error writing cached audio {path}: {e}")
+
+
+# Global instance
+_phrase_audio_cache: Optional[PhraseAudioCache] = None
+
+
+def get_phrase_audio_cache() -> PhraseAudioCache:
+    """
+    Get the global phrase audio cache instance.
+
+    Returns:
+        PhraseAudioCache instance
+    """
+    global _phrase_audio_cache
+    if _phrase_audio_cache is None:
+        _phrase_audio_cache = PhraseAudioCache()
+    return _phrase_audio_cache
@@ -0,0 +1,54 @@
+"""
+Frontend WebSocket bridge for Voice Assistant
+Tracks client connections and their voice clients without importing the VoiceLive SDK
+"""
+
+import json
+import logging
+from typing import Dict, TYPE_CHECKING
+from fastapi import WebSocket
+
+if TYPE_CHECKING:
+    from web_handler import WebSocketVoiceClient
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceAssistantBridge:
+    """Bridge between frontend WebSocket and Azure VoiceLive API"""
+
+    def __init__(self):
+        self.active_connections: Dict[str, WebSocket] = {}
+        self.voice_clients: Dict[str, "WebSocketVoiceClient"] = {}
+
+    async def connect(self, websocket: WebSocket, client_id: str):
+        """Accept a new WebSocket connection"""
+        await websocket.accept()
+        self.active_connections[client_id] = websocket
+        logger.info(f"Client {client_id} connected")
+
+    async def disconnect(self, client_id: str):
+        """Handle WebSocket disconnection"""
+        if client_id in self.active_connections:
+            del self.active_connections[client_id]
+        if client_id in self.voice_clients:
+            # Cleanup voice client
+            voice_client = self.voice_clients[client_id]
+            await voice_client.cleanup()
+            del self.voice_clients[client_id]
+        logger.info(f"Client {client_id} disconnected")
+
+    async def send_message(self, client_id: str, message: dict):
+        """Send message to specific client"""
+        if client_id in self.active_connections:
+            websocket = self.active_connections[client_id]
+            try:
+                await websocket.send_text(json.dumps(message))
+            except Exception as e:
+                logger.error(f"Error sending message to {client_id}: {e}")
+                await self.disconnect(client_id)
+
+    async def broadcast(self, message: dict):
+        """Broadcast message to all connected clients"""
+        for client_id in list(self.active_connections.keys()):
+            await self.send_message(client_id, message)
@@ -0,0 +1,335 @@
+"""
+Resilience policies for Voice Assistant tools
+Circuit breaking, hedged requests and a process-wide retry budget
+"""
+
+import time
+import asyncio
+import logging
+import functools
+from collections import OrderedDict, deque
+from typing import Any, Callable, Dict, Optional
+
+from single_flight import normalize_arguments
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyWindow:
+    """Sliding window of recent latencies in milliseconds."""
+
+    def __init__(self, size: int = 100):
+        self.samples: deque = deque(maxlen=size)
+
+    def add(self, latency_ms: float):
+        self.samples.append(latency_ms)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Get a latency percentile, or None without samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(len(ordered) * percentile / 100))
+        return ordered[index]
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+
+class RetryBudget:
+    """
+    Token bucket capping retries and hedges across the whole process.
+
+    Every primary call deposits `ratio` tokens and every extra attempt
+    withdraws one, so extra load stays a bounded fraction of real traffic.
+    """
+
+    def __init__(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+        self.denied = 0
+
+    def reconfigure(self, ratio: float = 0.1, max_tokens: float = 10.0):
+        """Apply reloaded settings, keeping the tokens already saved up."""
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = min(self.tokens, max_tokens)
+
+    def deposit(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        self.denied += 1
+        return False
+
+
+class CircuitBreaker:
+    """Opens on a high error rate or p95 latency over recent calls."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window_size: int = 20,
+        min_calls: int = 5,
+        error_rate_threshold: float = 0.5,
+        p95_latency_ms: Optional[float] = None,
+        open_seconds: float = 30.0,
+    ):
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.p95_latency_ms = p95_latency_ms
+        self.open_seconds = open_seconds
+        self.outcomes: deque = deque(maxlen=window_size)
+        self.latencies = LatencyWindow(window_size)
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        # Bumped on every state change; outcomes of calls admitted under an
+        # earlier state are stale and ignored
+        self.generation = 0
+
+    def allow(self) -> bool:
+        """
+        Check if a call may go through, moving to half-open after cool-down.
+
+        Callers pass `generation`, read right after a successful allow(), back
+        to record() so only outcomes of calls admitted in this state count.
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                return False
+            self._set_state(self.HALF_OPEN)
+        if self.state == self.HALF_OPEN:
+            # A single trial call decides whether the circuit closes again
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+        return True
+
+    def record(
+        self, success: bool, latency_ms: float, generation: Optional[int] = None
+    ):
+        """
+        Record a call outcome and update the circuit state.
+
+        Args:
+            success: Whether the call succeeded
+            latency_ms: Call latency in milliseconds
+            generation: The breaker generation the call was admitted in
+        """
+        if generation is not None and generation != self.generation:
+            return
+
+        if self.state == self.HALF_OPEN:
+            self._trial_in_flight = False
+            if success:
+                self._set_state(self.CLOSED)
+                self.outcomes.clear()
+                self.latencies.samples.clear()
+            else:
+                self._open()
+            return
+
+        self.outcomes.append(success)
+        self.latencies.add(latency_ms)
+        if len(self.outcomes) < self.min_calls:
+            return
+
+        error_rate = self.outcomes.count(False) / len(self.outcomes)
+        p95 = self.latencies.percentile(95)
+        if error_rate >= self.error_rate_threshold:
+            logger.warning(f"Circuit opened: error rate {error_rate:.0%}")
+            self._open()
+        elif self.p95_latency_ms is not None and p95 >= self.p95_latency_ms:
+            logger.warning(f"Circuit opened: p95 latency {p95:.0f}ms")
+            self._open()
+
+    def _open(self):
+        self._set_state(self.OPEN)
+        self.opened_at = time.monotonic()
+
+    def _set_state(self, state: str):
+        self.state = state
+        self.generation += 1
+
+
+class ResiliencePolicy:
+    """Applies a tool's circuit breaker, hedging, retries and fallback."""
+
+    def __init__(self, tool_name: str, config: Dict[str, Any], budget: RetryBudget):
+        """
+        Initialize the policy.
+
+        Args:
+            tool_name: Name of the tool
+            config: The tool's 'resilience' configuration section
+            budget: Process-wide retry budget shared by all policies
+        """
+        self.tool_name = tool_name
+        self.budget = budget
+        self.latencies = LatencyWindow()
+
+        # Last good results, used as the fallback answer for repeated queries
+        self._last_good: "OrderedDict[str, Any]" = OrderedDict()
+
+        self.hedges_fired = 0
+        self.hedges_won = 0
+        self.fallbacks = 0
+
+        self.config: Dict[str, Any] = {}
+        self.breaker: Optional[CircuitBreaker] = None
+        self.reconfigure(config)
+
+    def reconfigure(self, config: Dict[str, Any]):
+        """
+        Apply a reloaded 'resilience' section to this policy.
+
+        Wrapped tools keep calling this policy, so new settings reach them
+        without re-wrapping. A breaker is only rebuilt when its own settings
+        change, so an unchanged breaker keeps its state.
+
+        Args:
+            config: The tool's 'resilience' configuration section
+        """
+        self.max_retries = config.get("max_retries", 0)
+        self.fallback_message = config.get("fallback_message")
+
+        breaker_config = config.get("circuit_breaker")
+        if breaker_config != self.config.get("circuit_breaker"):
+            self.breaker = (
+                CircuitBreaker(**breaker_config) if breaker_config else None
+            )
+
+        hedge_config = config.get("hedge") or {}
+        self.hedge_percentile = hedge_config.get("percentile")
+        self.hedge_min_delay_ms = hedge_config.get("min_delay_ms", 0)
+
+        self._last_good_size = config.get("fallback_cache_size", 128)
+        while len(self._last_good) > self._last_good_size:
+            self._last_good.popitem(last=False)
+
+        self.config = config
+
+    def wrap(self, func: Callable) -> Callable:
+        """Wrap a tool implementation with this policy."""
+
+        @functools.wraps(func)
+        async def wrapper(args):
+            return await self.call(func, args)
+
+        return wrapper
+
+    async def call(self, func: Callable, args: Any) -> Any:
+        key = normalize_arguments(args)
+        breaker = self.breaker
+        if breaker and not breaker.allow():
+            return self._fallback(key, "circuit open")
+
+        self.budget.deposit()
+        attempt = 0
+        while True:
+            generation = breaker.generation if breaker else None
+            start_time = time.monotonic()
+            try:
+                result = await self._hedged(func, args)
+            except asyncio.CancelledError:
+                # A caller timeout counts against the breaker like an error
+                if breaker:
+                    latency_ms = (time.monotonic() - start_time) * 1000
+                    breaker.record(False, latency_ms, generation)
+                raise
+            except Exception as e:
+                latency_ms = (time.monotonic() - start_time) * 1000
+                if breaker:
+                    breaker.record(False, latency_ms, generation)
+                if (
+                    attempt < self.max_retries
+                    and (not breaker or breaker.allow())
+                    and self.budget.try_withdraw()
+                ):
+                    attempt += 1
+                    logger.warning(f"Retrying {self.tool_name} after error: {e}")
+                    continue
+                if not self._has_fallback(key):
+                    raise
+                return self._fallback(key, str(e))
+
+            latency_ms = (time.monotonic() - start_time) * 1000
+            self.latencies.add(latency_ms)
+            if breaker:
+                breaker.record(True, latency_ms, generation)
+            self._remember(key, result)
+            return result
+
+    async def _hedged(self, func: Callable, args: Any) -> Any:
+        """Run the call, firing an identical hedge if it outlasts the hedge delay."""
+        delay_ms = self._hedge_delay_ms()
+        if delay_ms is None:
+            return await func(args)
+
+        primary = asyncio.ensure_future(func(args))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay_ms / 1000)
+            if not done and self.budget.try_withdraw():
+                self.hedges_fired += 1
+                tasks.add(asyncio.ensure_future(func(args)))
+
+            while True:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.discard(task)
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedges_won += 1
+                        return task.result()
+                    if not tasks:
+                        return task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def _hedge_delay_ms(self) -> Optional[float]:
+        if self.hedge_percentile is None:
+            return None
+        percentile = self.latencies.percentile(self.hedge_percentile)
+        if percentile is None:
+            return None
+        return max(self.hedge_min_delay_ms, percentile)
+
+    def _remember(self, key: str, result: Any):
+        self._last_good[key] = result
+        self._last_good.move_to_end(key)
+        while len(self._last_good) > self._last_good_size:
+            self._last_good.popitem(last=False)
+
+    def _has_fallback(self, key: str) -> bool:
+        return key in self._last_good or self.fallback_message is not None
+
+    def _fallback(self, key: str, reason: str) -> Any:
+        if not self._has_fallback(key):
+            raise RuntimeError(f"{self.tool_name} unavailable: {reason}")
+
+        self.fallbacks += 1
+        logger.warning(f"Using fallback for {self.tool_name}: {reason}")
+        if key in self._last_good:
+            return self._last_good[key]
+        return self.fallback_message
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get breaker state and hedging counters."""
+        return {
+            "circuit_state": self.breaker.state if self.breaker else None,
+            "p95_latency_ms": self.latencies.percentile(95),
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "fallbacks": self.fallbacks,
+            "retry_budget_denied": self.budget.denied,
+        }
@@ -0,0 +1,231 @@
+"""
+On-demand sampling profiler for Voice Assistant
+Samples the event loop thread and tool worker threads for a bounded window and
+reports stacks by session phase as collapsed stacks or speedscope JSON
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from task_context import get_running_task, get_task_context, get_thread_context
+
+logger = logging.getLogger(__name__)
+
+TOOL_WORKER_PREFIX = "tool-worker"
+PROFILE_FORMATS = ("collapsed", "speedscope")
+
+# A frame is (function name, file, first line of the function)
+Frame = Tuple[str, str, int]
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when a profile is requested while another one is running."""
+
+
+class SamplingProfiler:
+    """Samples thread stacks from a background thread for a bounded window."""
+
+    def __init__(
+        self,
+        interval_ms: float = 5.0,
+        max_seconds: float = 60.0,
+        stack_depth: int = 64,
+    ):
+        """
+        Initialize the profiler.
+
+        Args:
+            interval_ms: Time between samples
+            max_seconds: Longest window a single request may profile
+            stack_depth: Innermost frames kept per sample
+        """
+        self.interval_ms = interval_ms
+        self.max_seconds = max_seconds
+        self.stack_depth = stack_depth
+        self.profiles_taken = 0
+        self._running = threading.Lock()
+
+    async def profile(
+        self, seconds: float, output_format: str = "collapsed"
+    ) -> Dict[str, Any]:
+        """
+        Profile the running event loop and tool worker threads.
+
+        Process-pool tool workers run in other processes and are not sampled.
+
+        Args:
+            seconds: Window to sample, capped at max_seconds
+            output_format: 'collapsed' or 'speedscope'
+
+        Returns:
+            Dict with 'samples', 'seconds' and the rendered 'profile'
+
+        Raises:
+            ProfilerBusyError: If another profile is in progress
+            ValueError: If the window or format is invalid
+        """
+        if output_format not in PROFILE_FORMATS:
+            raise ValueError(f"Unknown profile format: {output_format}")
+        if not 0 < seconds <= self.max_seconds:
+            raise ValueError(f"seconds must be in (0, {self.max_seconds:g}]")
+        if not self._running.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already in progress")
+
+        try:
+            loop = asyncio.get_running_loop()
+            loop_thread_id = threading.get_ident()
+            logger.info(f"🔬 Profiling for {seconds:g}s")
+            samples = await asyncio.to_thread(
+                self._sample, loop, loop_thread_id, seconds
+            )
+            self.profiles_taken += 1
+        finally:
+            self._running.release()
+
+        if output_format == "speedscope":
+            rendered = to_speedscope(samples, self.interval_ms)
+        else:
+            rendered = to_collapsed(samples)
+        return {
+            "samples": sum(samples.values()),
+            "seconds": seconds,
+            "profile": rendered,
+        }
+
+    def _sample(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        loop_thread_id: int,
+        seconds: float,
+    ) -> Counter:
+        """Collect (phase, thread, stack) sample counts until the window ends."""
+        samples: Counter = Counter()
+        interval = self.interval_ms / 1000
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            threads = {loop_thread_id: "event-loop"}
+            for thread in threading.enumerate():
+                if thread.name.startswith(TOOL_WORKER_PREFIX):
+                    threads[thread.ident] = thread.name
+
+            frames = sys._current_frames()
+            for thread_id, thread_name in threads.items():
+                frame = frames.get(thread_id)
+                if frame is None:
+                    continue
+                if thread_id == loop_thread_id:
+                    task = get_running_task(loop)
+                    context = get_task_context(task)
+                    default_phase = "loop" if task is not None else "idle"
+                else:
+                    context = get_thread_context(thread_id)
+                    default_phase = "idle"
+                    if context:
+                        default_phase = "tool_execution"
+                        thread_name = TOOL_WORKER_PREFIX
+                phase = context.get("phase", default_phase)
+                if phase == "tool_execution" and context.get("tool"):
+                    phase = f"tool_execution:{context['tool']}"
+                samples[(phase, thread_name, self._stack(frame))] += 1
+            time.sleep(interval)
+        return samples
+
+    def _stack(self, frame) -> Tuple[Frame, ...]:
+        """Get a root-first stack for a frame, keeping the innermost frames."""
+        stack: List[Frame] = []
+        while frame is not None and len(stack) < self.stack_depth:
+            code = frame.f_code
+            stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+
+def _frame_label(frame: Frame) -> str:
+    name, filename, line = frame
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def to_collapsed(samples: Counter) -> str:
+    """Render samples as collapsed stacks rooted at phase and thread."""
+    lines = []
+    for (phase, thread_name, stack), count in samples.most_common():
+        labels = [phase, thread_name, *(_frame_label(frame) for frame in stack)]
+        # Semicolons separate frames in the collapsed format
+        folded = ";".join(label.replace(";", ",") for label in labels)
+        lines.append(f"{folded} {count}")
+    return "\n".join(lines)
+
+
+def to_speedscope(samples: Counter, interval_ms: float) -> Dict[str, Any]:
+    """Render samples as a speedscope file with one profile per phase."""
+    frames: List[Dict[str, Any]] = []
+    frame_index: Dict[Any, int] = {}
+
+    def index_of(key, entry) -> int:
+        if key not in frame_index:
+            frame_index[key] = len(frames)
+            frames.append(entry)
+        return frame_index[key]
+
+    by_phase: Dict[str, List[Tuple[List[int], float]]] = {}
+    for (phase, thread_name, stack), count in samples.items():
+        indexes = [index_of(("thread", thread_name), {"name": thread_name})]
+        for frame in stack:
+            name, filename, line = frame
+            indexes.append(
+                index_of(frame, {"name": name, "file": filename, "line": line})
+            )
+        by_phase.setdefault(phase, []).append((indexes, count * interval_ms))
+
+    profiles = []
+    for phase, weighted in sorted(by_phase.items()):
+        total = sum(weight for _, weight in weighted)
+        profiles.append(
+            {
+                "type": "sampled",
+                "name": phase,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total,
+                "samples": [indexes for indexes, _ in weighted],
+                "weights": [weight for _, weight in weighted],
+            }
+        )
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "name": "voice-assistant",
+        "exporter": "voice-assistant sampling profiler",
+        "shared": {"frames": frames},
+        "profiles": profiles,
+    }
+
+
+# Global instance
+_sampling_profiler: Optional[SamplingProfiler] = None
+
+
+def get_sampling_profiler() -> Optional[SamplingProfiler]:
+    """
+    Get the global sampling profiler instance.
+
+    The profiler is opt-in: set PROFILER_ENABLED=true, and optionally
+    PROFILER_INTERVAL_MS and PROFILER_MAX_SECONDS.
+
+    Returns:
+        SamplingProfiler instance, or None when profiling is disabled
+    """
+    global _sampling_profiler
+    if _sampling_profiler is None:
+        if os.getenv("PROFILER_ENABLED", "false").lower() != "true":
+            return None
+        _sampling_profiler = SamplingProfiler(
+            interval_ms=float(os.getenv("PROFILER_INTERVAL_MS", "5")),
+            max_seconds=float(os.getenv("PROFILER_MAX_SECONDS", "60")),
+        )
+    return _sampling_profiler
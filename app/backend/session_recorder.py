@@ -0,0 +1,212 @@
+"""
+Session recording for Voice Assistant
+Captures VoiceLive events and frontend messages into a compact binary log for
+deterministic replay (see scripts/replay_session.py)
+
+File layout: MAGIC, then one record after another, each
+
+    <I length of the rest> <B kind> <Q ns since session start>
+    <I metadata length> <metadata JSON> <raw bytes>
+
+Audio (server audio deltas, frontend audio chunks) is kept as raw bytes; the
+metadata names the field it came from under "_raw".
+"""
+
+import os
+import json
+import time
+import base64
+import struct
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"VLREC\x01"
+LENGTH_PREFIX = struct.Struct("<I")
+RECORD_FIELDS = struct.Struct("<BQI")
+
+KIND_SESSION = 0
+KIND_SERVER_EVENT = 1
+KIND_CLIENT_MESSAGE = 2
+
+# Base64 fields of frontend messages stored as raw audio
+CLIENT_AUDIO_FIELDS = ("data", "audio")
+
+
+class SessionRecorder:
+    """Buffers session records and writes them to disk in batches."""
+
+    def __init__(
+        self,
+        path: str,
+        flush_interval_ms: float = 200.0,
+        flush_bytes: int = 256 * 1024,
+        max_buffer_bytes: int = 8 * 1024 * 1024,
+    ):
+        """
+        Initialize the recorder.
+
+        Args:
+            path: Recording file to create
+            flush_interval_ms: Longest time a record waits in memory
+            flush_bytes: Buffered size that triggers an early flush
+            max_buffer_bytes: Buffered size past which records are dropped
+        """
+        self.path = path
+        self.flush_interval = flush_interval_ms / 1000
+        self.flush_bytes = flush_bytes
+        self.max_buffer_bytes = max_buffer_bytes
+        self.records = 0
+        self.bytes_written = 0
+        self.dropped = 0
+
+        self._started_ns = time.monotonic_ns()
+        self._buffer: List[bytes] = [MAGIC]
+        self._buffered = len(MAGIC)
+        self._wake = asyncio.Event()
+        self._closed = False
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def _append(self, kind: int, meta: Dict[str, Any], raw: bytes = b""):
+        if self._closed:
+            return
+        meta_bytes = json.dumps(meta, separators=(",", ":"), default=str).encode()
+        fields = RECORD_FIELDS.pack(
+            kind, time.monotonic_ns() - self._started_ns, len(meta_bytes)
+        )
+        size = len(fields) + len(meta_bytes) + len(raw)
+        if self._buffered + size > self.max_buffer_bytes:
+            # The disk is not keeping up; never grow without bound
+            self.dropped += 1
+            return
+        self._buffer.extend((LENGTH_PREFIX.pack(size), fields, meta_bytes, raw))
+        self._buffered += LENGTH_PREFIX.size + size
+        self.records += 1
+        if self._buffered >= self.flush_bytes:
+            self._wake.set()
+
+    def record_session(self, **details: Any):
+        """Record session details (client, model, voice) for the replay."""
+        details["started_at"] = datetime.now().isoformat()
+        self._append(KIND_SESSION, details)
+
+    def record_server_event(self, event):
+        """Record an upstream VoiceLive event, keeping audio deltas raw."""
+        delta = getattr(event, "delta", None)
+        if not isinstance(delta, bytes):
+            self._append(KIND_SERVER_EVENT, event.as_dict())
+            return
+        # Audio delta fields are flat, so skip as_dict() and its base64 encoding
+        meta = {key: value for key, value in event.items() if key != "delta"}
+        meta["_raw"] = "delta"
+        self._append(KIND_SERVER_EVENT, meta, delta)
+
+    def record_client_message(self, message: Dict[str, Any]):
+        """Record a frontend message, keeping base64 audio raw."""
+        meta = dict(message)
+        raw = b""
+        for field in CLIENT_AUDIO_FIELDS:
+            if isinstance(meta.get(field), str):
+                try:
+                    raw = base64.b64decode(meta[field])
+                except ValueError:
+                    break
+                del meta[field]
+                meta["_raw"] = field
+                break
+        self._append(KIND_CLIENT_MESSAGE, meta, raw)
+
+    async def _write_loop(self):
+        try:
+            async with aiofiles.open(self.path, "wb") as file:
+                while not (self._closed and not self._buffer):
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+                    except asyncio.TimeoutError:
+                        pass
+                    self._wake.clear()
+                    if not self._buffer:
+                        continue
+                    chunk = b"".join(self._buffer)
+                    self._buffer.clear()
+                    self._buffered = 0
+                    await file.write(chunk)
+                    self.bytes_written += len(chunk)
+        except Exception as e:
+            logger.error(f"Session recording to {self.path} failed: {e}")
+
+    async def close(self):
+        """Flush buffered records and close the file."""
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        await self._writer
+        logger.info(
+            f"📼 Recorded {self.records} records ({self.bytes_written} bytes, "
+            f"{self.dropped} dropped) to {self.path}"
+        )
+
+
+def read_recording(path: str) -> Iterator[Tuple[int, float, Dict[str, Any], bytes]]:
+    """
+    Read a session recording.
+
+    Args:
+        path: Recording file
+
+    Yields:
+        (kind, seconds since session start, metadata, raw bytes) per record
+    """
+    with open(path, "rb") as recording:
+        if recording.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a session recording")
+        while True:
+            prefix = recording.read(LENGTH_PREFIX.size)
+            if len(prefix) < LENGTH_PREFIX.size:
+                return
+            (size,) = LENGTH_PREFIX.unpack(prefix)
+            body = recording.read(size)
+            if len(body) < size:
+                logger.warning(f"Truncated record at the end of {path}")
+                return
+            kind, offset_ns, meta_size = RECORD_FIELDS.unpack_from(body)
+            meta_end = RECORD_FIELDS.size + meta_size
+            meta = json.loads(body[RECORD_FIELDS.size : meta_end])
+            yield kind, offset_ns / 1e9, meta, body[meta_end:]
+
+
+def restore_payload(meta: Dict[str, Any], raw: bytes) -> Dict[str, Any]:
+    """Rebuild the original JSON payload, re-encoding raw audio as base64."""
+    payload = dict(meta)
+    field = payload.pop("_raw", None)
+    if field is not None:
+        payload[field] = base64.b64encode(raw).decode("ascii")
+    return payload
+
+
+def create_session_recorder(client_id: str) -> Optional[SessionRecorder]:
+    """
+    Create a recorder for a new session when recording is enabled.
+
+    Recording is opt-in: set SESSION_RECORDING_DIR to the folder recordings
+    are written to.
+
+    Args:
+        client_id: Session client ID, used in the file name
+
+    Returns:
+        SessionRecorder instance, or None when recording is disabled
+    """
+    directory = os.getenv("SESSION_RECORDING_DIR")
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    timestamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+    safe_id = "".join(c for c in client_id if c.isalnum() or c in "-_")[:64]
+    return SessionRecorder(os.path.join(directory, f"{safe_id}-{timestamp}.vlrec"))
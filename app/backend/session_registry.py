@@ -0,0 +1,477 @@
+"""
+Session registry for Voice Assistant
+Records which worker owns each voice session and routes control messages
+(interrupt, stop_session) to the owner, so several uvicorn workers and
+container replicas can serve sessions side by side
+"""
+
+import os
+import json
+import time
+import socket
+import asyncio
+import logging
+import sqlite3
+import tempfile
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SESSION_REGISTRY_BACKENDS = ("memory", "local", "redis")
+
+# Frontend messages that may be routed to the worker owning the session
+CONTROL_MESSAGES = ("interrupt", "stop_session")
+
+ControlHandler = Callable[[str, Dict[str, Any]], Awaitable[None]]
+
+
+def default_worker_id() -> str:
+    """Get an ID unique to this process across hosts."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class SessionRegistry:
+    """In-process registry: every session belongs to this worker."""
+
+    backend = "memory"
+
+    def __init__(self, worker_id: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            worker_id: ID of this worker; hostname and PID by default
+        """
+        self.worker_id = worker_id or default_worker_id()
+        self.local_sessions: Set[str] = set()
+        self.routed = 0
+        self.received = 0
+        self._handler: Optional[ControlHandler] = None
+
+    async def start(self, handler: ControlHandler):
+        """
+        Start receiving control messages routed to this worker.
+
+        Args:
+            handler: Coroutine called with (client_id, message) for each one
+        """
+        self._handler = handler
+
+    async def stop(self):
+        """Release this worker's sessions and stop receiving messages."""
+        for client_id in list(self.local_sessions):
+            await self.release(client_id)
+        self._handler = None
+
+    async def claim(self, client_id: str) -> Optional[str]:
+        """
+        Make this worker the owner of a session.
+
+        The newest session for a client ID wins, so a caller that reconnects
+        to another worker takes its session over.
+
+        Args:
+            client_id: Session client ID
+
+        Returns:
+            The worker that owned the session before, if it was another one
+        """
+        self.local_sessions.add(client_id)
+        return None
+
+    async def release(self, client_id: str):
+        """Give up a session, unless another worker has taken it over."""
+        self.local_sessions.discard(client_id)
+
+    async def owner(self, client_id: str) -> Optional[str]:
+        """Get the live worker owning a session, or None."""
+        return self.worker_id if client_id in self.local_sessions else None
+
+    async def count(self) -> int:
+        """Get the number of sessions across all live workers."""
+        return len(self.local_sessions)
+
+    async def send(self, worker_id: str, client_id: str, message: Dict[str, Any]):
+        """Deliver a control message to a session on a given worker."""
+        if worker_id == self.worker_id:
+            await self._deliver(client_id, message)
+        else:
+            self.routed += 1
+            await self._publish(worker_id, client_id, message)
+
+    async def route(self, client_id: str, message: Dict[str, Any]) -> Optional[str]:
+        """
+        Deliver a control message to whichever worker owns the session.
+
+        Args:
+            client_id: Session client ID
+            message: Frontend control message
+
+        Returns:
+            The owning worker, or None when no live worker owns the session
+        """
+        if client_id in self.local_sessions:
+            owner = self.worker_id
+        else:
+            owner = await self.owner(client_id)
+        if owner is not None:
+            await self.send(owner, client_id, message)
+        return owner
+
+    async def _deliver(self, client_id: str, message: Dict[str, Any]):
+        self.received += 1
+        if self._handler is None:
+            return
+        try:
+            await self._handler(client_id, message)
+        except Exception as e:
+            logger.error(f"Routed {message.get('type')} for {client_id} failed: {e}")
+
+    async def _publish(self, worker_id: str, client_id: str, message: Dict[str, Any]):
+        # A single process has no other worker to reach
+        logger.warning(f"Worker {worker_id} is unreachable from the memory registry")
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get ownership and routing counters."""
+        return {
+            "backend": self.backend,
+            "worker_id": self.worker_id,
+            "local_sessions": len(self.local_sessions),
+            "total_sessions": await self.count(),
+            "routed": self.routed,
+            "received": self.received,
+        }
+
+
+class LocalSessionRegistry(SessionRegistry):
+    """
+    Stand-in for a shared registry: a SQLite file shared by the workers of
+    one host.
+
+    Workers heartbeat into the file and poll it for control messages, so a
+    routed message waits at most one poll interval.
+    """
+
+    backend = "local"
+
+    def __init__(
+        self,
+        path: str,
+        worker_id: Optional[str] = None,
+        poll_interval_ms: float = 20.0,
+        worker_ttl_seconds: float = 10.0,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            path: SQLite file shared by the workers
+            worker_id: ID of this worker; hostname and PID by default
+            poll_interval_ms: Time between checks for routed messages
+            worker_ttl_seconds: Heartbeat age after which a worker is dead
+        """
+        super().__init__(worker_id)
+        self.path = path
+        self.poll_interval = poll_interval_ms / 1000
+        self.worker_ttl = worker_ttl_seconds
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS workers (
+                    worker_id TEXT PRIMARY KEY, seen REAL NOT NULL);
+                CREATE TABLE IF NOT EXISTS sessions (
+                    client_id TEXT PRIMARY KEY, worker_id TEXT NOT NULL);
+                CREATE TABLE IF NOT EXISTS controls (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    worker_id TEXT NOT NULL,
+                    client_id TEXT NOT NULL,
+                    message TEXT NOT NULL);
+                """
+            )
+        self._poll_task: Optional[asyncio.Task] = None
+
+    def _execute(self, sql: str, *params) -> list:
+        with self._lock, self._db:
+            return self._db.execute(sql, params).fetchall()
+
+    async def _run(self, sql: str, *params) -> list:
+        # Keep SQLite file locks and fsyncs off the event loop
+        return await asyncio.to_thread(self._execute, sql, *params)
+
+    async def start(self, handler: ControlHandler):
+        await super().start(handler)
+        await self._heartbeat()
+        if self._poll_task is None:
+            self._poll_task = asyncio.create_task(self._poll())
+
+    async def stop(self):
+        if self._poll_task is not None:
+            self._poll_task.cancel()
+            try:
+                await self._poll_task
+            except asyncio.CancelledError:
+                pass
+            self._poll_task = None
+        await super().stop()
+        await self._run("DELETE FROM workers WHERE worker_id = ?", self.worker_id)
+        await self._run("DELETE FROM controls WHERE worker_id = ?", self.worker_id)
+        await asyncio.to_thread(self._db.close)
+
+    async def _heartbeat(self):
+        await self._run(
+            "INSERT OR REPLACE INTO workers (worker_id, seen) VALUES (?, ?)",
+            self.worker_id,
+            time.time(),
+        )
+
+    async def _poll(self):
+        last_heartbeat = time.monotonic()
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                if time.monotonic() - last_heartbeat > self.worker_ttl / 3:
+                    await self._heartbeat()
+                    last_heartbeat = time.monotonic()
+                rows = await self._run(
+                    "DELETE FROM controls WHERE worker_id = ? "
+                    "RETURNING client_id, message",
+                    self.worker_id,
+                )
+                for client_id, message in rows:
+                    await self._deliver(client_id, json.loads(message))
+            except sqlite3.Error as e:
+                logger.warning(f"Session registry poll failed: {e}")
+
+    def _swap_owner(self, client_id: str) -> Optional[str]:
+        # One write transaction, so concurrent claims each see the one before
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._db.execute(
+                    "SELECT sessions.worker_id FROM sessions JOIN workers "
+                    "USING (worker_id) WHERE client_id = ? AND seen > ?",
+                    (client_id, time.time() - self.worker_ttl),
+                ).fetchone()
+                self._db.execute(
+                    "INSERT OR REPLACE INTO sessions (client_id, worker_id) "
+                    "VALUES (?, ?)",
+                    (client_id, self.worker_id),
+                )
+            except BaseException:
+                self._db.rollback()
+                raise
+            self._db.commit()
+        return row[0] if row else None
+
+    async def claim(self, client_id: str) -> Optional[str]:
+        self.local_sessions.add(client_id)
+        previous = await asyncio.to_thread(self._swap_owner, client_id)
+        return previous if previous != self.worker_id else None
+
+    async def release(self, client_id: str):
+        self.local_sessions.discard(client_id)
+        await self._run(
+            "DELETE FROM sessions WHERE client_id = ? AND worker_id = ?",
+            client_id,
+            self.worker_id,
+        )
+
+    async def owner(self, client_id: str) -> Optional[str]:
+        rows = await self._run(
+            "SELECT sessions.worker_id FROM sessions JOIN workers "
+            "USING (worker_id) WHERE client_id = ? AND seen > ?",
+            client_id,
+            time.time() - self.worker_ttl,
+        )
+        return rows[0][0] if rows else None
+
+    async def count(self) -> int:
+        rows = await self._run(
+            "SELECT COUNT(*) FROM sessions JOIN workers USING (worker_id) "
+            "WHERE seen > ?",
+            time.time() - self.worker_ttl,
+        )
+        return rows[0][0]
+
+    async def _publish(self, worker_id: str, client_id: str, message: Dict[str, Any]):
+        await self._run(
+            "INSERT INTO controls (worker_id, client_id, message) VALUES (?, ?, ?)",
+            worker_id,
+            client_id,
+            json.dumps(message),
+        )
+
+
+class RedisSessionRegistry(SessionRegistry):
+    """
+    Registry shared by every replica through Redis.
+
+    Ownership lives in one hash, each worker keeps a heartbeat key with a
+    TTL, and control messages are pushed over a per-worker pub/sub channel.
+    """
+
+    backend = "redis"
+
+    # Delete an owner entry only while it still names this worker
+    RELEASE_SCRIPT = """
+    if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+        return redis.call('HDEL', KEYS[1], ARGV[1])
+    end
+    return 0
+    """
+
+    # Set this worker as the owner and return the previous one, atomically
+    CLAIM_SCRIPT = """
+    local previous = redis.call('HGET', KEYS[1], ARGV[1])
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+    return previous
+    """
+
+    def __init__(
+        self,
+        url: str,
+        worker_id: Optional[str] = None,
+        worker_ttl_seconds: float = 10.0,
+        key_prefix: str = "voice",
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            url: Redis connection URL (redis:// or rediss://)
+            worker_id: ID of this worker; hostname and PID by default
+            worker_ttl_seconds: Heartbeat age after which a worker is dead
+            key_prefix: Prefix of every key and channel
+        """
+        import redis.asyncio as redis
+
+        super().__init__(worker_id)
+        self.worker_ttl = worker_ttl_seconds
+        self.sessions_key = f"{key_prefix}:sessions"
+        self.key_prefix = key_prefix
+        self.client = redis.from_url(url, decode_responses=True)
+        self._release = self.client.register_script(self.RELEASE_SCRIPT)
+        self._claim = self.client.register_script(self.CLAIM_SCRIPT)
+        self._tasks: list = []
+
+    def _worker_key(self, worker_id: str) -> str:
+        return f"{self.key_prefix}:worker:{worker_id}"
+
+    def _channel(self, worker_id: str) -> str:
+        return f"{self.key_prefix}:control:{worker_id}"
+
+    async def start(self, handler: ControlHandler):
+        await super().start(handler)
+        await self._heartbeat()
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self._channel(self.worker_id))
+        self._tasks = [
+            asyncio.create_task(self._listen(pubsub)),
+            asyncio.create_task(self._heartbeat_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        await super().stop()
+        await self.client.delete(self._worker_key(self.worker_id))
+        await self.client.aclose()
+
+    async def _heartbeat(self):
+        await self.client.set(
+            self._worker_key(self.worker_id), "1", px=int(self.worker_ttl * 1000)
+        )
+
+    async def _heartbeat_loop(self):
+        while True:
+            await asyncio.sleep(self.worker_ttl / 3)
+            try:
+                await self._heartbeat()
+            except Exception as e:
+                logger.warning(f"Session registry heartbeat failed: {e}")
+
+    async def _listen(self, pubsub):
+        try:
+            async for item in pubsub.listen():
+                payload = json.loads(item["data"])
+                await self._deliver(payload["client_id"], payload["message"])
+        finally:
+            await pubsub.aclose()
+
+    async def _alive(self, worker_id: str) -> bool:
+        return bool(await self.client.exists(self._worker_key(worker_id)))
+
+    async def claim(self, client_id: str) -> Optional[str]:
+        self.local_sessions.add(client_id)
+        previous = await self._claim(
+            keys=[self.sessions_key], args=[client_id, self.worker_id]
+        )
+        if previous is None or previous == self.worker_id:
+            return None
+        return previous if await self._alive(previous) else None
+
+    async def release(self, client_id: str):
+        self.local_sessions.discard(client_id)
+        await self._release(keys=[self.sessions_key], args=[client_id, self.worker_id])
+
+    async def owner(self, client_id: str) -> Optional[str]:
+        worker_id = await self.client.hget(self.sessions_key, client_id)
+        if worker_id is None or not await self._alive(worker_id):
+            return None
+        return worker_id
+
+    async def count(self) -> int:
+        owners = await self.client.hgetall(self.sessions_key)
+        workers = sorted(set(owners.values()))
+        if not workers:
+            return 0
+        alive = await self.client.mget([self._worker_key(w) for w in workers])
+        live_workers = {w for w, flag in zip(workers, alive) if flag is not None}
+        return sum(1 for worker_id in owners.values() if worker_id in live_workers)
+
+    async def _publish(self, worker_id: str, client_id: str, message: Dict[str, Any]):
+        await self.client.publish(
+            self._channel(worker_id),
+            json.dumps({"client_id": client_id, "message": message}),
+        )
+
+
+# Global instance
+_session_registry: Optional[SessionRegistry] = None
+
+
+def get_session_registry() -> SessionRegistry:
+    """
+    Get the global session registry instance.
+
+    SESSION_REGISTRY selects the backend: memory (default, one worker),
+    local (a SQLite file at SESSION_REGISTRY_PATH shared by the workers of
+    one host) or redis (REDIS_URL, shared by every replica).
+
+    Returns:
+        SessionRegistry instance
+    """
+    global _session_registry
+    if _session_registry is None:
+        backend = os.getenv("SESSION_REGISTRY", "memory").lower()
+        if backend not in SESSION_REGISTRY_BACKENDS:
+            raise ValueError(f"Unknown session registry: {backend}")
+        if backend == "redis":
+            _session_registry = RedisSessionRegistry(os.environ["REDIS_URL"])
+        elif backend == "local":
+            path = os.getenv("SESSION_REGISTRY_PATH") or os.path.join(
+                tempfile.gettempdir(), "voice-sessions.db"
+            )
+            _session_registry = LocalSessionRegistry(path)
+        else:
+            _session_registry = SessionRegistry()
+        logger.info(
+            f"Session registry: {backend} (worker {_session_registry.worker_id})"
+        )
+    return _session_registry
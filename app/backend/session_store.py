@@ -0,0 +1,89 @@
+"""
+Per-session tool result store for Voice Assistant
+Keeps prefetched tool results in memory with LRU eviction and a freshness TTL
+"""
+
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class SessionToolStore:
+    """Holds tool result tasks for a single session."""
+
+    def __init__(self, max_entries: int = 32, default_ttl_seconds: float = 300.0):
+        """
+        Initialize the session tool store.
+
+        Args:
+            max_entries: Maximum number of results kept before evicting the oldest
+            default_ttl_seconds: How long a result stays fresh when no TTL is given
+        """
+        self.max_entries = max_entries
+        self.default_ttl_seconds = default_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, asyncio.Task]]" = OrderedDict()
+
+    def put(self, key: str, task: asyncio.Task, ttl_seconds: Optional[float] = None):
+        """
+        Store a (possibly still running) tool result task.
+
+        Args:
+            key: Store key, usually the tool name and its arguments
+            task: Task producing the tool result
+            ttl_seconds: Freshness window, measured from now
+        """
+        ttl = ttl_seconds if ttl_seconds is not None else self.default_ttl_seconds
+        self.evict(key)
+        self._entries[key] = (time.monotonic() + ttl, task)
+        task.add_done_callback(self._log_failure)
+
+        while len(self._entries) > self.max_entries:
+            oldest_key = next(iter(self._entries))
+            logger.debug(f"Evicting stored tool result: {oldest_key}")
+            self.evict(oldest_key)
+
+    def get(self, key: str) -> Optional[asyncio.Task]:
+        """
+        Get a fresh tool result task.
+
+        Returns:
+            The stored task, or None if missing, expired or failed
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        expires_at, task = entry
+        if time.monotonic() > expires_at:
+            self.evict(key)
+            return None
+        if task.done() and (task.cancelled() or task.exception() is not None):
+            self.evict(key)
+            return None
+
+        self._entries.move_to_end(key)
+        return task
+
+    def evict(self, key: str):
+        """Remove a stored result, cancelling it if still running."""
+        entry = self._entries.pop(key, None)
+        if entry is not None and not entry[1].done():
+            entry[1].cancel()
+
+    def clear(self):
+        """Remove every stored result."""
+        for key in list(self._entries):
+            self.evict(key)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task):
+        # Retrieve the exception so unused failed prefetches are not reported
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Stored tool result failed: {task.exception()}")
@@ -0,0 +1,130 @@
+"""
+Single-flight coalescing for Voice Assistant tools
+Lets identical concurrent tool calls across sessions share one execution
+"""
+
+import json
+import asyncio
+import logging
+import functools
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_arguments(arguments: Any) -> str:
+    """
+    Build a canonical string for tool arguments.
+
+    JSON strings are parsed, string values are lowercased with whitespace
+    collapsed and keys are sorted, so trivially different queries match.
+    """
+    if isinstance(arguments, str):
+        try:
+            arguments = json.loads(arguments)
+        except json.JSONDecodeError:
+            pass
+
+    def _normalize(value):
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, dict):
+            return {key: _normalize(item) for key, item in value.items()}
+        if isinstance(value, list):
+            return [_normalize(item) for item in value]
+        return value
+
+    return json.dumps(_normalize(arguments), sort_keys=True, ensure_ascii=False)
+
+
+class _Flight:
+    """An in-flight execution and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Process-wide registry of in-flight tool executions."""
+
+    def __init__(self):
+        self._inflight: Dict[str, _Flight] = {}
+        self.calls = 0
+        self.executions = 0
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run factory() once for all concurrent callers sharing the same key.
+
+        A caller that is cancelled stops waiting without affecting the others;
+        the shared execution is cancelled only when its last caller goes away.
+        """
+        self.calls += 1
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(factory()))
+            self._inflight[key] = flight
+            self.executions += 1
+            flight.task.add_done_callback(lambda _: self._forget(key, flight))
+        else:
+            logger.info(
+                f"Coalesced tool call ({self.reduction_percent():.0f}% "
+                f"fewer upstream executions)"
+            )
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Later callers must not join an execution that is being cancelled
+                self._forget(key, flight)
+                flight.task.cancel()
+
+    def _forget(self, key: str, flight: _Flight):
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def wrap(self, tool_name: str, func: Callable) -> Callable:
+        """Wrap a tool implementation so identical concurrent calls coalesce."""
+
+        @functools.wraps(func)
+        async def wrapper(args):
+            key = f"{tool_name}:{normalize_arguments(args)}"
+            return await self.do(key, lambda: func(args))
+
+        return wrapper
+
+    def reduction_percent(self) -> float:
+        """Percentage of calls that did not trigger their own execution."""
+        if not self.calls:
+            return 0.0
+        return (1 - self.executions / self.calls) * 100
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get call and execution counters."""
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "in_flight": len(self._inflight),
+            "reduction_percent": round(self.reduction_percent(), 1),
+        }
+
+
+# Global instance
+_single_flight: Optional[SingleFlight] = None
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Get the global single-flight instance.
+
+    Returns:
+        SingleFlight instance
+    """
+    global _single_flight
+    if _single_flight is None:
+        _single_flight = SingleFlight()
+    return _single_flight
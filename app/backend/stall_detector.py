@@ -0,0 +1,182 @@
+"""
+Event-loop stall detection for Voice Assistant
+A watchdog thread notices when the event loop stops turning, captures the loop
+thread's stack and attributes the stall to the running task and its session
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import Counter, deque
+from typing import Any, Dict, List, Optional
+
+from task_context import (
+    describe_task,
+    get_running_task,
+    get_task_context,
+    install_task_factory,
+)
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+class StallDetector:
+    """Watchdog that reports event-loop stalls above a threshold."""
+
+    def __init__(
+        self,
+        threshold_ms: float = 100.0,
+        heartbeat_ms: float = 20.0,
+        max_reports: int = 50,
+        stack_depth: int = 25,
+    ):
+        """
+        Initialize the stall detector.
+
+        Args:
+            threshold_ms: Loop silence beyond the heartbeat that counts as a stall
+            heartbeat_ms: How often the loop proves it is alive
+            max_reports: Recent stalls kept for the report endpoint
+            stack_depth: Innermost stack frames kept per stall
+        """
+        self.threshold_ms = threshold_ms
+        self.heartbeat_ms = heartbeat_ms
+        self.stack_depth = stack_depth
+        self.recent: deque = deque(maxlen=max_reports)
+        self.by_location: Counter = Counter()
+
+        self.stalls_total = 0
+        self.stalled_ms_total = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._last_beat = time.monotonic()
+        self._current: Optional[Dict[str, Any]] = None
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the heartbeat on the running loop and the watchdog thread."""
+        if self._thread is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        install_task_factory(self._loop)
+
+        self._last_beat = time.monotonic()
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="stall-detector", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Stall detector started (threshold {self.threshold_ms:.0f}ms)")
+
+    async def _heartbeat(self):
+        interval = self.heartbeat_ms / 1000
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(interval)
+
+    def _watch(self):
+        while not self._stopped.wait(self.heartbeat_ms / 1000):
+            silent_ms = (time.monotonic() - self._last_beat) * 1000 - self.heartbeat_ms
+            if silent_ms > self.threshold_ms:
+                if self._current is None:
+                    self._current = self._capture()
+                self._current["duration_ms"] = round(silent_ms, 1)
+            elif self._current is not None:
+                self._finish(self._current)
+                self._current = None
+
+    def _capture(self) -> Dict[str, Any]:
+        """Snapshot the loop thread's stack and the task it is running."""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.extract_stack(frame)[-self.stack_depth :] if frame else []
+        task = get_running_task(self._loop)
+        return {
+            "started_at": time.time(),
+            "duration_ms": 0.0,
+            "coroutine": describe_task(task),
+            "context": dict(get_task_context(task)),
+            "location": self._guilty_location(stack),
+            "stack": [
+                f"{entry.filename}:{entry.lineno} in {entry.name}: {entry.line}"
+                for entry in stack
+            ],
+        }
+
+    @staticmethod
+    def _guilty_location(stack: List[traceback.FrameSummary]) -> Optional[str]:
+        """Get the innermost frame in backend code, else the innermost frame."""
+        for entry in reversed(stack):
+            in_backend = entry.filename.startswith(BACKEND_DIR)
+            if in_backend and "site-packages" not in entry.filename:
+                relative = os.path.relpath(entry.filename, BACKEND_DIR)
+                return f"{relative}:{entry.lineno} in {entry.name}"
+        if stack:
+            return f"{stack[-1].filename}:{stack[-1].lineno} in {stack[-1].name}"
+        return None
+
+    def _finish(self, report: Dict[str, Any]):
+        self.stalls_total += 1
+        self.stalled_ms_total += report["duration_ms"]
+        self.by_location[report["location"]] += 1
+        self.recent.append(report)
+        logger.warning(
+            f"🐢 Event loop stalled {report['duration_ms']:.0f}ms at "
+            f"{report['location']} (task {report['coroutine']}, "
+            f"context {report['context']})"
+        )
+
+    def get_report(self) -> Dict[str, Any]:
+        """Get the stall counter, the worst locations and recent stalls."""
+        return {
+            "enabled": self._thread is not None,
+            "threshold_ms": self.threshold_ms,
+            "stalls_total": self.stalls_total,
+            "stalled_ms_total": round(self.stalled_ms_total, 1),
+            "by_location": dict(self.by_location.most_common(20)),
+            "recent": list(reversed(self.recent)),
+        }
+
+    async def stop(self):
+        """Stop the watchdog thread and the heartbeat."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        if self._heartbeat_task is not None:
+            self._heartbeat_task.cancel()
+            self._heartbeat_task = None
+
+
+# Global instance
+_stall_detector: Optional[StallDetector] = None
+
+
+def get_stall_detector() -> Optional[StallDetector]:
+    """
+    Get the global stall detector instance.
+
+    The detector is opt-in: set STALL_DETECTOR_ENABLED=true, and optionally
+    STALL_THRESHOLD_MS.
+
+    Returns:
+        StallDetector instance, or None when stall detection is disabled
+    """
+    global _stall_detector
+    if _stall_detector is None:
+        if os.getenv("STALL_DETECTOR_ENABLED", "false").lower() != "true":
+            return None
+        _stall_detector = StallDetector(
+            threshold_ms=float(os.getenv("STALL_THRESHOLD_MS", "100"))
+        )
+    return _stall_detector
@@ -0,0 +1,289 @@
+"""
+Structured, non-blocking logging for Voice Assistant
+Records are queued on the caller and formatted and written by a background
+thread, with session context attached and hot-path categories sampled
+"""
+
+import os
+import sys
+import json
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, Union
+
+from task_context import get_current_context
+
+TEXT_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+# Task context fields copied onto every record
+CONTEXT_FIELDS = ("session_id", "turn_id", "phase", "tool")
+
+# Hot-path categories: one record kept per N emitted
+DEFAULT_SAMPLE_RATES = {"voice.audio": 1000}
+
+
+def _parse_mapping(value: str) -> Dict[str, str]:
+    """Parse 'name=value,name=value' settings."""
+    pairs = (item.split("=", 1) for item in value.split(",") if "=" in item)
+    return {name.strip(): setting.strip() for name, setting in pairs}
+
+
+def _category_of(name: str, categories) -> Optional[str]:
+    """Get the most specific category a logger name falls under."""
+    while name:
+        if name in categories:
+            return name
+        name = name.rpartition(".")[0]
+    return None
+
+
+class ContextFilter(logging.Filter):
+    """Attaches the emitting task's session context to a record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = get_current_context()
+        for field in CONTEXT_FIELDS:
+            if field in context and not hasattr(record, field):
+                setattr(record, field, context[field])
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keeps one record in N for each sampled logger category."""
+
+    def __init__(self, rates: Dict[str, int]):
+        super().__init__()
+        self.rates = dict(rates)
+        self.seen: Dict[str, int] = {}
+        self.sampled_out: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if getattr(record, "presampled", False):
+            return True
+        return self.keep(record.name, record.levelno)
+
+    def keep(self, name: str, level: int) -> bool:
+        """Decide whether a record from a logger at a level is kept."""
+        category = _category_of(name, self.rates)
+        # Warnings and errors are never sampled away
+        if category is None or level >= logging.WARNING:
+            return True
+        with self._lock:
+            seen = self.seen.get(category, 0)
+            self.seen[category] = seen + 1
+            if seen % self.rates[category] == 0:
+                return True
+            self.sampled_out[category] = self.sampled_out.get(category, 0) + 1
+            return False
+
+
+class SampledLogger:
+    """
+    Logger front-end for hot paths that samples before a record is created.
+
+    Creating a LogRecord costs far more than the sampling decision, so
+    sampled-out calls return before the logging machinery runs.
+    """
+
+    def __init__(self, logger: logging.Logger, sampling: SamplingFilter):
+        self.logger = logger
+        self.sampling = sampling
+
+    def _log(self, level: int, msg: str, args, kwargs):
+        if not self.logger.isEnabledFor(level):
+            return
+        if not self.sampling.keep(self.logger.name, level):
+            return
+        extra = dict(kwargs.pop("extra", None) or {}, presampled=True)
+        self.logger.log(level, msg, *args, extra=extra, stacklevel=3, **kwargs)
+
+    def debug(self, msg: str, *args, **kwargs):
+        self._log(logging.DEBUG, msg, args, kwargs)
+
+    def info(self, msg: str, *args, **kwargs):
+        self._log(logging.INFO, msg, args, kwargs)
+
+    def warning(self, msg: str, *args, **kwargs):
+        self._log(logging.WARNING, msg, args, kwargs)
+
+    def error(self, msg: str, *args, **kwargs):
+        self._log(logging.ERROR, msg, args, kwargs)
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Queues records without formatting them and drops them when full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Message arguments are formatted by the listener thread, off the loop
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        created = datetime.fromtimestamp(record.created, timezone.utc)
+        entry: Dict[str, Any] = {
+            "timestamp": created.isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class LoggingPipeline:
+    """Routes every log record through a queue to a background writer thread."""
+
+    def __init__(
+        self,
+        level: Union[int, str] = logging.INFO,
+        json_format: bool = False,
+        sample_rates: Optional[Dict[str, int]] = None,
+        levels: Optional[Dict[str, str]] = None,
+        queue_size: int = 10000,
+        stream=None,
+    ):
+        """
+        Initialize the logging pipeline.
+
+        Args:
+            level: Root log level
+            json_format: Write JSON lines instead of plain text
+            sample_rates: Logger category -> keep one record in N
+            levels: Logger category -> level, applied on start
+            queue_size: Records buffered before new ones are dropped
+            stream: Where records are written; stderr by default
+        """
+        self.level = level
+        self.json_format = json_format
+        self.levels = levels or {}
+        self.stream = stream
+        self.sampling = SamplingFilter(
+            DEFAULT_SAMPLE_RATES if sample_rates is None else sample_rates
+        )
+        self.handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+        # Sample first so dropped records cost as little as possible
+        self.handler.addFilter(self.sampling)
+        self.handler.addFilter(ContextFilter())
+        self._listener: Optional[QueueListener] = None
+
+    def start(self):
+        """Install the queue handler on the root logger and start the writer."""
+        if self._listener is not None:
+            return
+        output = logging.StreamHandler(self.stream or sys.stderr)
+        output.setFormatter(
+            JsonFormatter() if self.json_format else logging.Formatter(TEXT_FORMAT)
+        )
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.handler)
+        root.setLevel(self.level)
+        for category, level in self.levels.items():
+            self.set_level(category, level)
+
+        self._listener = QueueListener(self.handler.queue, output)
+        self._listener.start()
+        atexit.register(self.stop)
+
+    def set_level(self, category: str, level: Union[int, str]):
+        """Change a logger category's level at runtime."""
+        logging.getLogger(category).setLevel(
+            level.upper() if isinstance(level, str) else level
+        )
+        self.levels[category] = logging.getLevelName(
+            logging.getLogger(category).level
+        )
+
+    def set_sample_rate(self, category: str, every_n: int):
+        """Keep one record in every_n for a category (1 keeps all)."""
+        if every_n < 1:
+            raise ValueError("every_n must be at least 1")
+        self.sampling.rates[category] = every_n
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get levels, sampling and queue counters."""
+        return {
+            "level": logging.getLevelName(logging.getLogger().level),
+            "format": "json" if self.json_format else "text",
+            "levels": dict(self.levels),
+            "sample_rates": dict(self.sampling.rates),
+            "sampled_out": dict(self.sampling.sampled_out),
+            "queue_depth": self.handler.queue.qsize(),
+            "dropped": self.handler.dropped,
+        }
+
+    def stop(self):
+        """Write out queued records and stop the writer thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+# Global instance
+_logging_pipeline: Optional[LoggingPipeline] = None
+
+
+def get_logging_pipeline() -> LoggingPipeline:
+    """
+    Get the global logging pipeline instance.
+
+    Settings come from LOG_LEVEL, LOG_FORMAT (text or json; json by default
+    in production), LOG_LEVELS and LOG_SAMPLE_RATES, the last two written
+    as 'category=value,...'.
+
+    Returns:
+        LoggingPipeline instance
+    """
+    global _logging_pipeline
+    if _logging_pipeline is None:
+        in_production = os.getenv("RUNNING_IN_PRODUCTION", "false").lower() == "true"
+        log_format = os.getenv("LOG_FORMAT", "json" if in_production else "text")
+        sample_rates = dict(DEFAULT_SAMPLE_RATES)
+        for category, every_n in _parse_mapping(
+            os.getenv("LOG_SAMPLE_RATES", "")
+        ).items():
+            sample_rates[category] = int(every_n)
+        _logging_pipeline = LoggingPipeline(
+            level=os.getenv("LOG_LEVEL", "INFO").upper(),
+            json_format=log_format.lower() == "json",
+            sample_rates=sample_rates,
+            levels=_parse_mapping(os.getenv("LOG_LEVELS", "")),
+        )
+    return _logging_pipeline
+
+
+def get_sampled_logger(name: str) -> SampledLogger:
+    """Get a logger for a hot-path category, sampled by the global pipeline."""
+    return SampledLogger(logging.getLogger(name), get_logging_pipeline().sampling)
+
+
+def configure_logging() -> LoggingPipeline:
+    """Start the global logging pipeline."""
+    pipeline = get_logging_pipeline()
+    pipeline.start()
+    return pipeline
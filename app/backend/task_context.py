@@ -0,0 +1,98 @@
+"""
+Per-task diagnostic context for Voice Assistant sessions
+Tags asyncio tasks with session, phase and tool so diagnostics running on other
+threads can attribute what the event loop is doing
+"""
+
+import asyncio
+import weakref
+import threading
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+_context_var: ContextVar[Dict[str, Any]] = ContextVar("task_context", default={})
+_task_contexts: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+_thread_contexts: Dict[int, Dict[str, Any]] = {}
+
+
+def set_task_context(**context: Any):
+    """
+    Add diagnostic context (session_id, phase, tool, ...) to the current task.
+
+    Tasks created afterwards from this task inherit the context once
+    install_task_factory has been called on the loop.
+    """
+    value = {**_context_var.get(), **context}
+    _context_var.set(value)
+    try:
+        task = asyncio.current_task()
+    except RuntimeError:
+        return
+    if task is not None:
+        _task_contexts[task] = value
+
+
+def get_current_context() -> Dict[str, Any]:
+    """Get the diagnostic context of the code running right now."""
+    return _context_var.get()
+
+
+def get_task_context(task: Optional[asyncio.Task]) -> Dict[str, Any]:
+    """Get the diagnostic context of a task; safe to call from other threads."""
+    if task is None:
+        return {}
+    return _task_contexts.get(task, {})
+
+
+def get_thread_context(thread_id: int) -> Dict[str, Any]:
+    """Get the diagnostic context of the work a worker thread is running."""
+    return _thread_contexts.get(thread_id, {})
+
+
+def run_with_thread_context(context: Dict[str, Any], func: Callable, *args) -> Any:
+    """Run func in a worker thread, exposing context for the duration of the call."""
+    thread_id = threading.get_ident()
+    _thread_contexts[thread_id] = context
+    try:
+        return func(*args)
+    finally:
+        _thread_contexts.pop(thread_id, None)
+
+
+def get_running_task(loop: asyncio.AbstractEventLoop) -> Optional[asyncio.Task]:
+    """Get the task the loop is currently running; safe to call from other threads."""
+    try:
+        return asyncio.current_task(loop)
+    except RuntimeError:
+        return None
+
+
+def describe_task(task: Optional[asyncio.Task]) -> Optional[str]:
+    """Get the qualified name of the coroutine a task is running."""
+    if task is None:
+        return None
+    coroutine = task.get_coro()
+    return getattr(coroutine, "__qualname__", None) or task.get_name()
+
+
+def install_task_factory(loop: asyncio.AbstractEventLoop):
+    """Make new tasks on the loop inherit their creator's diagnostic context."""
+    if getattr(loop.get_task_factory(), "_inherits_task_context", False):
+        return
+
+    def factory(loop, coro, context=None):
+        # Loops only pass a context on Python 3.11+, where Task accepts one
+        if context is not None:
+            task = asyncio.Task(coro, loop=loop, context=context)
+            value = context.get(_context_var, {})
+        else:
+            task = asyncio.Task(coro, loop=loop)
+            value = _context_var.get()
+        if value:
+            _task_contexts[task] = value
+        return task
+
+    factory._inherits_task_context = True
+    loop.set_task_factory(factory)
@@ -0,0 +1,252 @@
+"""
+Refresh-ahead token caching for Azure credentials
+Wraps a credential so tokens are cached per scope and refreshed before they expire
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from azure.core.credentials import AccessToken
+
+from resilience import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+
+class _TokenCacheBase:
+    """Token storage and acquisition metrics shared by the sync and async wrappers."""
+
+    def __init__(
+        self,
+        credential,
+        refresh_margin_seconds: float = 300.0,
+        min_validity_seconds: float = 30.0,
+    ):
+        """
+        Initialize the token cache.
+
+        Args:
+            credential: Wrapped credential exposing get_token(*scopes, **kwargs)
+            refresh_margin_seconds: Refresh this long before a token expires
+            min_validity_seconds: Below this remaining lifetime a caller waits
+                for a fresh token instead of using the cached one
+        """
+        self._credential = credential
+        self.refresh_margin_seconds = refresh_margin_seconds
+        self.min_validity_seconds = min_validity_seconds
+        self._tokens: Dict[Tuple, AccessToken] = {}
+
+        self.acquisition_latency = LatencyWindow()
+        self.acquisitions = 0
+        self.cache_hits = 0
+        self.background_refreshes = 0
+        self.failures = 0
+
+    @staticmethod
+    def _cache_key(scopes: Tuple[str, ...], kwargs: Dict[str, Any]) -> Tuple:
+        return (tuple(sorted(scopes)), kwargs.get("tenant_id"))
+
+    @staticmethod
+    def _bypasses_cache(kwargs: Dict[str, Any]) -> bool:
+        # Claims challenges must always reach the underlying credential
+        return bool(kwargs.get("claims"))
+
+    def _remaining(self, token: AccessToken) -> float:
+        return token.expires_on - time.time()
+
+    def _record_acquisition(self, latency_ms: float):
+        self.acquisitions += 1
+        self.acquisition_latency.add(latency_ms)
+        logger.debug(f"Token acquired in {latency_ms:.0f}ms")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get token-acquisition latency and cache counters."""
+        return {
+            "acquisitions": self.acquisitions,
+            "cache_hits": self.cache_hits,
+            "background_refreshes": self.background_refreshes,
+            "failures": self.failures,
+            "acquisition_p50_ms": self.acquisition_latency.percentile(50),
+            "acquisition_p95_ms": self.acquisition_latency.percentile(95),
+        }
+
+
+class AsyncRefreshAheadCredential(_TokenCacheBase):
+    """Async credential wrapper with per-scope caching and background refresh."""
+
+    def __init__(self, credential, **kwargs):
+        super().__init__(credential, **kwargs)
+        self._refreshes: Dict[Tuple, asyncio.Task] = {}
+        self._timers: Dict[Tuple, asyncio.Task] = {}
+
+    async def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        if self._bypasses_cache(kwargs):
+            return await self._credential.get_token(*scopes, **kwargs)
+
+        key = self._cache_key(scopes, kwargs)
+        token = self._tokens.get(key)
+        if token is not None:
+            remaining = self._remaining(token)
+            if remaining > self.min_validity_seconds:
+                self.cache_hits += 1
+                if remaining <= self.refresh_margin_seconds:
+                    self._refresh(key, scopes, kwargs)
+                return token
+
+        return await asyncio.shield(self._refresh(key, scopes, kwargs))
+
+    def _refresh(self, key: Tuple, scopes, kwargs) -> asyncio.Task:
+        """Start a refresh for the key, or join the one already running."""
+        task = self._refreshes.get(key)
+        if task is None:
+            task = asyncio.create_task(self._acquire(key, scopes, kwargs))
+            self._refreshes[key] = task
+            task.add_done_callback(lambda _: self._refreshes.pop(key, None))
+        return task
+
+    async def _acquire(self, key: Tuple, scopes, kwargs) -> AccessToken:
+        start_time = time.perf_counter()
+        try:
+            token = await self._credential.get_token(*scopes, **kwargs)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Token acquisition failed for {scopes}: {e}")
+            raise
+        self._record_acquisition((time.perf_counter() - start_time) * 1000)
+        self._tokens[key] = token
+        self._schedule_refresh(key, scopes, kwargs, token)
+        return token
+
+    def _schedule_refresh(self, key: Tuple, scopes, kwargs, token: AccessToken):
+        """Refresh in the background once the token enters the refresh margin."""
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        remaining = self._remaining(token)
+        # Short-lived tokens refresh at half-life instead of in a tight loop
+        delay = max(remaining - self.refresh_margin_seconds, remaining / 2, 0.0)
+        self._timers[key] = asyncio.create_task(
+            self._refresh_later(key, scopes, kwargs, delay)
+        )
+
+    async def _refresh_later(self, key: Tuple, scopes, kwargs, delay: float):
+        await asyncio.sleep(delay)
+        self.background_refreshes += 1
+        try:
+            # Shielded so rescheduling this timer never cancels the refresh
+            await asyncio.shield(self._refresh(key, scopes, kwargs))
+        except Exception:
+            # Callers fall back to a synchronous refresh on their next request
+            pass
+
+    async def close(self):
+        """Stop background refreshes and close the wrapped credential."""
+        for task in [*self._timers.values(), *self._refreshes.values()]:
+            task.cancel()
+        self._timers.clear()
+        self._refreshes.clear()
+        if hasattr(self._credential, "close"):
+            await self._credential.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.close()
+
+
+class _PendingRefresh:
+    """A sync refresh in progress; waiters get its error if it fails."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.error: Optional[Exception] = None
+
+
+class RefreshAheadCredential(_TokenCacheBase):
+    """Sync credential wrapper with per-scope caching and background refresh."""
+
+    def __init__(self, credential, **kwargs):
+        super().__init__(credential, **kwargs)
+        self._lock = threading.Lock()
+        self._refreshing: Dict[Tuple, _PendingRefresh] = {}
+
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        if self._bypasses_cache(kwargs):
+            return self._credential.get_token(*scopes, **kwargs)
+
+        key = self._cache_key(scopes, kwargs)
+        token = self._tokens.get(key)
+        if token is not None:
+            remaining = self._remaining(token)
+            if remaining > self.min_validity_seconds:
+                self.cache_hits += 1
+                if remaining <= self.refresh_margin_seconds:
+                    threading.Thread(
+                        target=self._background_refresh,
+                        args=(key, scopes, kwargs),
+                        daemon=True,
+                    ).start()
+                return token
+
+        return self._refresh(key, scopes, kwargs)
+
+    def _refresh(self, key: Tuple, scopes, kwargs) -> Optional[AccessToken]:
+        """Acquire a token; concurrent callers wait for the refresh in progress."""
+        with self._lock:
+            in_progress = self._refreshing.get(key)
+            if in_progress is None:
+                in_progress = self._refreshing[key] = _PendingRefresh()
+                owner = True
+            else:
+                owner = False
+
+        if not owner:
+            in_progress.done.wait()
+            token = self._tokens.get(key)
+            # A token that is still valid beats no token; an expired one does not
+            if token is None or self._remaining(token) <= 0:
+                if in_progress.error is not None:
+                    raise in_progress.error
+                raise RuntimeError(f"Token refresh failed for {scopes}")
+            return token
+
+        start_time = time.perf_counter()
+        try:
+            token = self._credential.get_token(*scopes, **kwargs)
+            self._record_acquisition((time.perf_counter() - start_time) * 1000)
+            self._tokens[key] = token
+            return token
+        except Exception as e:
+            self.failures += 1
+            in_progress.error = e
+            logger.warning(f"Token acquisition failed for {scopes}: {e}")
+            raise
+        finally:
+            with self._lock:
+                del self._refreshing[key]
+            in_progress.done.set()
+
+    def _background_refresh(self, key: Tuple, scopes, kwargs):
+        with self._lock:
+            if key in self._refreshing:
+                return
+        self.background_refreshes += 1
+        try:
+            self._refresh(key, scopes, kwargs)
+        except Exception:
+            pass
+
+    def close(self):
+        """Close the wrapped credential."""
+        if hasattr(self._credential, "close"):
+            self._credential.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,194 @@
+"""
+Tool executor pools for Voice Assistant
+Runs blocking or CPU-heavy tools off the event loop in shared, bounded pools
+"""
+
+import asyncio
+import logging
+import functools
+import importlib
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from task_context import get_task_context, run_with_thread_context
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_KINDS = ("async", "thread", "process")
+
+
+def _run_callable(func: Callable, args: Any) -> Any:
+    """Run a tool implementation to completion, driving coroutines locally."""
+    result = func(args)
+    if asyncio.iscoroutine(result):
+        return asyncio.run(result)
+    return result
+
+
+def _run_in_process(module_name: str, function_name: str, args: Any) -> Any:
+    """Import and run a tool in a worker process; only names cross the boundary."""
+    module = importlib.import_module(module_name)
+    return _run_callable(getattr(module, function_name), args)
+
+
+def _import_modules(module_names: List[str]) -> int:
+    """Import tool modules so worker processes pay their import cost up front."""
+    for module_name in module_names:
+        importlib.import_module(module_name)
+    return multiprocessing.current_process().pid
+
+
+class _Pool:
+    """A bounded executor with queue-depth counters."""
+
+    def __init__(self, kind: str, executor: Executor, max_workers: int):
+        self.kind = kind
+        self.executor = executor
+        self.max_workers = max_workers
+        self.pending = 0
+        self.max_pending = 0
+        self.submitted = 0
+        self.completed = 0
+
+    async def run(self, func: Callable, *args) -> Any:
+        self.pending += 1
+        self.submitted += 1
+        self.max_pending = max(self.max_pending, self.pending)
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            # Pending includes running work; above max_workers means queueing
+            "queue_depth": max(0, self.pending - self.max_workers),
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "submitted": self.submitted,
+            "completed": self.completed,
+        }
+
+
+class ToolExecutorPools:
+    """Shared thread and process pools for tools that cannot run on the loop."""
+
+    def __init__(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the executor pools. Pools are created on first use.
+
+        Args:
+            config: The 'executors' section of the tools configuration
+        """
+        self.config = config or {}
+        self._pools: Dict[str, _Pool] = {}
+
+    def _get_pool(self, kind: str) -> _Pool:
+        if kind not in self._pools:
+            pool_config = self.config.get(kind, {})
+            if kind == "thread":
+                max_workers = pool_config.get("max_workers", 8)
+                executor = ThreadPoolExecutor(
+                    max_workers=max_workers, thread_name_prefix="tool-worker"
+                )
+            else:
+                max_workers = pool_config.get("max_workers", 2)
+                # Spawn avoids forking a process that owns an event loop and threads
+                executor = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            self._pools[kind] = _Pool(kind, executor, max_workers)
+            logger.info(f"Created {kind} tool pool with {max_workers} workers")
+        return self._pools[kind]
+
+    def wrap(
+        self,
+        kind: str,
+        func: Callable,
+        module_name: str,
+        function_name: str,
+    ) -> Callable:
+        """
+        Wrap a tool implementation to run in the pool for its executor kind.
+
+        Args:
+            kind: One of 'async', 'thread' or 'process'
+            func: The tool implementation
+            module_name: Module the implementation was imported from
+            function_name: Name of the implementation within the module
+
+        Returns:
+            An async callable taking the tool arguments
+        """
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        if kind == "async":
+            return func
+
+        @functools.wraps(func)
+        async def wrapper(args):
+            pool = self._get_pool(kind)
+            if kind == "thread":
+                # Let diagnostics attribute the worker thread to the calling task
+                context = get_task_context(asyncio.current_task())
+                return await pool.run(
+                    run_with_thread_context, context, _run_callable, func, args
+                )
+            # Tool arguments are JSON-derived, so they pickle as-is
+            return await pool.run(_run_in_process, module_name, function_name, args)
+
+        return wrapper
+
+    async def warm_up(self, module_names: List[str]):
+        """Start every process worker and import tool modules in each one."""
+        if not module_names:
+            return
+
+        pool = self._get_pool("process")
+        start_time = asyncio.get_running_loop().time()
+        pids = await asyncio.gather(
+            *(
+                pool.run(_import_modules, module_names)
+                for _ in range(pool.max_workers)
+            )
+        )
+        elapsed = asyncio.get_running_loop().time() - start_time
+        logger.info(
+            f"Warmed up {len(set(pids))} tool worker process(es) in {elapsed:.2f}s"
+        )
+
+    def reconfigure(self, config: Optional[Dict[str, Any]] = None):
+        """
+        Apply new pool settings. Pools are recreated on their next use.
+
+        Work already submitted finishes on the old executors, so calls in
+        flight during a reload are not cancelled.
+
+        Args:
+            config: The 'executors' section of the reloaded tools configuration
+        """
+        config = config or {}
+        if config == self.config:
+            return
+
+        retired = list(self._pools.values())
+        self.config = config
+        self._pools = {}
+        for pool in retired:
+            pool.executor.shutdown(wait=False)
+        logger.info(f"Executor settings changed, retired {len(retired)} tool pool(s)")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get queue-depth metrics for every pool in use."""
+        return {kind: pool.get_stats() for kind, pool in self._pools.items()}
+
+    def shutdown(self):
+        """Shut down all pools."""
+        for pool in self._pools.values():
+            pool.executor.shutdown(wait=False, cancel_futures=True)
+        self._pools.clear()
@@ -4,12 +4,17 @@ Loads tool definitions and configurations from YAML files
 """
 
 import os
-import yaml
 import logging
 import importlib
+import threading
 from typing import Dict, List, Any, Optional, Callable
 from pathlib import Path
 
+from single_flight import get_single_flight
+from tool_executors import ToolExecutorPools
+from resilience import ResiliencePolicy, RetryBudget
+from tools.retrieval import RetrievalPolicy
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,6 +35,10 @@ class ToolConfigLoader:
         self.environment = os.getenv("ENVIRONMENT", "production")
 
         self._load_config()
+        self.executor_pools = ToolExecutorPools(self.config.get("executors"))
+        self.retry_budget = RetryBudget(**self.config.get("retry_budget", {}))
+        self.resilience_policies: Dict[str, ResiliencePolicy] = {}
+        self.retrieval_policies: Dict[str, RetrievalPolicy] = {}
 
     def _load_config(self):
         """Load configuration from YAML file."""
@@ -38,6 +47,8 @@ class ToolConfigLoader:
                 logger.error(f"Tool config file not found: {self.config_path}")
                 return
 
+            import yaml
+
             with open(self.config_path, "r", encoding="utf-8") as file:
                 self.config = yaml.safe_load(file)
                 logger.info(f"Loaded YAML configuration from {self.config_file}")
@@ -147,18 +158,64 @@ class ToolConfigLoader:
                 # Import the module and get the function
                 module = importlib.import_module(module_name)
                 func = getattr(module, function_impl_name)
+
+                # Blocking or CPU-heavy tools run in shared thread/process pools
+                func = self.executor_pools.wrap(
+                    tool.get("executor", "async"),
+                    func,
+                    module_name,
+                    function_impl_name,
+                )
+
+                # Circuit breaker, hedging and retries shared by every session
+                resilience_config = tool.get("resilience")
+                if resilience_config:
+                    func = self._get_resilience_policy(
+                        function_name, resilience_config
+                    ).wrap(func)
+
+                # Identical concurrent calls share one execution across sessions
+                if tool.get("coalesce", False):
+                    func = get_single_flight().wrap(function_name, func)
+
                 implementations[function_name] = func
 
                 logger.debug(
                     f"Loaded implementation for {function_name} from {module_name}.{function_impl_name}"
                 )
 
-            except (ImportError, AttributeError) as e:
+            except (ImportError, AttributeError, ValueError) as e:
                 logger.error(f"Failed to load implementation for {function_name}: {e}")
 
         logger.info(f"Loaded {len(implementations)} function implementations")
         return implementations
 
+    def _get_resilience_policy(
+        self, tool_name: str, resilience_config: Dict[str, Any]
+    ) -> ResiliencePolicy:
+        """Get the process-wide resilience policy for a tool."""
+        if tool_name not in self.resilience_policies:
+            self.resilience_policies[tool_name] = ResiliencePolicy(
+                tool_name, resilience_config, self.retry_budget
+            )
+        return self.resilience_policies[tool_name]
+
+    def get_retrieval_policy(self, tool_name: str) -> RetrievalPolicy:
+        """
+        Get the process-wide retrieval policy for a search tool.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            RetrievalPolicy built from the tool's 'retrieval' section
+        """
+        if tool_name not in self.retrieval_policies:
+            self.retrieval_policies[tool_name] = RetrievalPolicy(
+                tool_name, self.get_tool_config(tool_name).get("retrieval")
+            )
+        return self.retrieval_policies[tool_name]
+
     def get_tool_config(self, tool_name: str) -> Dict[str, Any]:
         """
         Get configuration for a specific tool.
@@ -212,6 +269,81 @@ class ToolConfigLoader:
         tool_config = self.get_tool_config(tool_name)
         return tool_config.get("enabled", True)
 
+    def is_tool_speculative(self, tool_name: str) -> bool:
+        """
+        Check if a tool may run as soon as its arguments are complete.
+
+        Speculative tools start before RESPONSE_DONE; their result is held
+        until the response finishes. Only side-effect free tools should opt in.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            True if speculative execution is enabled, False otherwise
+        """
+        tool_config = self.get_tool_config(tool_name)
+        return tool_config.get("speculative", False)
+
+    def get_tool_filler_after_ms(self, tool_name: str) -> Optional[int]:
+        """
+        Get the delay after which a filler phrase covers a slow tool.
+
+        Args:
+            tool_name: Name of the tool
+
+        Returns:
+            Delay in milliseconds, or None if the tool never uses a filler
+        """
+        tool_config = self.get_tool_config(tool_name)
+        return tool_config.get("filler_after_ms")
+
+    def get_prefetch_tools(self) -> List[Dict[str, Any]]:
+        """
+        Get enabled tools whose results are prefetched at session start.
+
+        Prefetch tools return per-caller data that does not depend on the
+        query, so one result answers every call within its freshness TTL.
+
+        Returns:
+            List of tool configuration dictionaries
+        """
+        return [
+            tool
+            for tool in self.config.get("tools", [])
+            if tool.get("prefetch", False) and self.is_tool_enabled(tool.get("name"))
+        ]
+
+    def get_warm_up_queries(self) -> List[str]:
+        """
+        Get the common questions whose query embeddings are computed at startup.
+
+        Returns:
+            Deduplicated 'warm_up_queries' of all enabled tools
+        """
+        queries = []
+        for tool in self.config.get("tools", []):
+            if self.is_tool_enabled(tool.get("name")):
+                queries.extend(tool.get("warm_up_queries", []))
+        return list(dict.fromkeys(queries))
+
+    async def warm_up_executors(self):
+        """Start process-pool workers and import their tool modules ahead of use."""
+        module_names = sorted(
+            {
+                tool.get("implementation", {}).get("module")
+                for tool in self.config.get("tools", [])
+                if tool.get("executor") == "process"
+                and self.is_tool_enabled(tool.get("name"))
+            }
+            - {None}
+        )
+        await self.executor_pools.warm_up(module_names)
+
+    def shutdown_executors(self):
+        """Shut down the shared tool executor pools."""
+        self.executor_pools.shutdown()
+
     def should_log_function_calls(self) -> bool:
         """Check if function calls should be logged."""
         env_config = self.get_environment_config()
@@ -242,16 +374,35 @@ class ToolConfigLoader:
             "log_function_calls": self.should_log_function_calls(),
             "debug_mode": self.is_debug_mode(),
             "default_timeout": env_config.get("default_timeout_seconds", 10),
+            "single_flight": get_single_flight().get_stats(),
+            "executors": self.executor_pools.get_stats(),
+            "resilience": {
+                name: policy.get_stats()
+                for name, policy in self.resilience_policies.items()
+            },
+            "retrieval": {
+                name: policy.get_stats()
+                for name, policy in self.retrieval_policies.items()
+            },
         }
 
     def reload(self):
         """Reload configuration from file."""
         self._load_config()
+        self.retrieval_policies.clear()
+        # Wrapped tools look their pool up per call, so they pick up new pools
+        self.executor_pools.reconfigure(self.config.get("executors"))
+        # Policies are updated in place for the same reason
+        self.retry_budget.reconfigure(**self.config.get("retry_budget", {}))
+        for tool_name, policy in self.resilience_policies.items():
+            policy.reconfigure(self.get_tool_config(tool_name).get("resilience") or {})
         logger.info("Tool configuration reloaded")
 
 
 # Global instance
 _tool_loader: Optional[ToolConfigLoader] = None
+# Warm-up builds the loader in a worker thread while sessions may ask for it
+_tool_loader_lock = threading.Lock()
 
 
 def get_tool_loader(config_file: str = "tools_config.yaml") -> ToolConfigLoader:
@@ -266,15 +417,18 @@ def get_tool_loader(config_file: str = "tools_config.yaml") -> ToolConfigLoader:
     """
     global _tool_loader
     if _tool_loader is None:
-        _tool_loader = ToolConfigLoader(config_file)
+        with _tool_loader_lock:
+            if _tool_loader is None:
+                _tool_loader = ToolConfigLoader(config_file)
     return _tool_loader
 
 
 def reload_tools():
     """Reload tool configuration."""
     global _tool_loader
-    if _tool_loader is not None:
-        _tool_loader.reload()
-    else:
-        _tool_loader = ToolConfigLoader()
+    with _tool_loader_lock:
+        if _tool_loader is not None:
+            _tool_loader.reload()
+        else:
+            _tool_loader = ToolConfigLoader()
     logger.info("Tool configuration reloaded")
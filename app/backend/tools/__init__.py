@@ -5,6 +5,10 @@ This package contains all function implementations and related utilities for the
 
 Structure:
 - implementations.py: Core function implementations that can be called by the AI
+- search_client.py: Shared Azure AI Search client, warmed up and closed by the app lifespan
+- context_packing.py: Token-budgeted packing of search results returned to the model
+- embeddings.py: Cached query embeddings sent to search as precomputed vectors
+- retrieval.py: Retrieval profiles and the policy that downgrades them under load
 - Future modules can be added here as the system grows
 
 Usage:
@@ -0,0 +1,157 @@
+"""
+Token-budgeted packing of search results for tool outputs
+Deduplicates overlapping chunk text, ranks sentences against the query and
+packs the best spans into a fixed token budget
+"""
+
+import re
+import math
+import logging
+from collections import Counter, defaultdict
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Colons are not boundaries: they tie labels such as "Cartão Gold:" to values
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?;])\s+|\n+")
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate the model token count of a text (about 4 characters per token)."""
+    return math.ceil(len(text) / 4) if text else 0
+
+
+def _normalize(sentence: str) -> str:
+    # Every word and number counts, so "8% ao mês" and "5% ao mês" differ
+    return " ".join(_WORD.findall(sentence.lower()))
+
+
+def _terms(text: str) -> List[str]:
+    # Very short words are mostly Portuguese articles and prepositions
+    return [word for word in _WORD.findall(text.lower()) if len(word) > 2]
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split chunk text into sentences and list items."""
+    return [part.strip() for part in _SENTENCE_SPLIT.split(text) if part.strip()]
+
+
+def pack_search_results(
+    query: str,
+    chunks: List[Tuple[str, str]],
+    max_tokens: Optional[int],
+) -> str:
+    """
+    Pack search result chunks into a token budget.
+
+    Args:
+        query: The user's search query
+        chunks: (chunk_id, text) pairs in search rank order
+        max_tokens: Token budget for the packed result; None disables packing
+
+    Returns:
+        Packed result text, one "[chunk_id]: span ... span" block per chunk
+    """
+    if max_tokens is None:
+        return "".join(f"[{chunk_id}]: {text}\n-----\n" for chunk_id, text in chunks)
+
+    # Sentences repeated by chunk overlap are kept only where first seen
+    seen = set()
+    sentences = []  # (chunk_rank, position, chunk_id, sentence)
+    for chunk_rank, (chunk_id, text) in enumerate(chunks):
+        for position, sentence in enumerate(split_sentences(text)):
+            normalized = _normalize(sentence)
+            if not normalized or normalized in seen:
+                continue
+            seen.add(normalized)
+            sentences.append((chunk_rank, position, chunk_id, sentence))
+
+    if not sentences:
+        return ""
+
+    # Rarer query terms weigh more; search rank breaks ties between chunks
+    query_terms = set(_terms(query))
+    document_frequency = Counter(
+        term for *_, sentence in sentences for term in set(_terms(sentence))
+    )
+
+    def relevance(sentence: str) -> float:
+        terms = _terms(sentence)
+        if not terms:
+            return 0.0
+        counts = Counter(terms)
+        weight = sum(
+            counts[term] * math.log(1 + len(sentences) / document_frequency[term])
+            for term in query_terms
+            if term in counts
+        )
+        return weight / math.sqrt(len(terms))
+
+    # Neighbours of relevant sentences inherit part of their score, so an
+    # answer is kept together with the question it follows
+    own = [relevance(entry[3]) for entry in sentences]
+    scores = []
+    for index, entry in enumerate(sentences):
+        neighbours = [
+            own[other]
+            for other in (index - 1, index + 1)
+            if 0 <= other < len(sentences) and sentences[other][0] == entry[0]
+        ]
+        scores.append(own[index] + 0.5 * max(neighbours, default=0.0))
+
+    # Without any query match, fall back to search rank order
+    if not any(scores):
+        scores = [1.0 / (1 + entry[0]) for entry in sentences]
+
+    ranked = sorted(
+        (
+            (score + 0.1 / (1 + entry[0]), entry)
+            for score, entry in zip(scores, sentences)
+            if score > 0
+        ),
+        key=lambda pair: pair[0],
+        reverse=True,
+    )
+
+    # Every piece of the packed text is charged: the chunk header and
+    # separator with a chunk's first sentence, then a joiner per sentence
+    # (" ... " unless it extends a selected span). Charging the pieces one by
+    # one never undercounts the estimate of the joined text.
+    separator_cost = estimate_tokens("\n-----\n")
+    span_joiner_cost = estimate_tokens(" ... ")
+    sentence_joiner_cost = estimate_tokens(" ")
+    selected = []
+    selected_positions = defaultdict(set)
+    used_tokens = 0
+    for _, entry in ranked:
+        chunk_rank, position, chunk_id, sentence = entry
+        positions = selected_positions[chunk_rank]
+        if not positions:
+            overhead = estimate_tokens(f"[{chunk_id}]: ") + separator_cost
+        elif position - 1 in positions or position + 1 in positions:
+            overhead = sentence_joiner_cost
+        else:
+            overhead = span_joiner_cost
+        cost = estimate_tokens(sentence) + overhead
+        if used_tokens + cost > max_tokens:
+            continue
+        selected.append(entry)
+        positions.add(position)
+        used_tokens += cost
+
+    # Restore reading order and join adjacent sentences into spans
+    packed = ""
+    selected.sort()
+    for chunk_rank in sorted({entry[0] for entry in selected}):
+        entries = [entry for entry in selected if entry[0] == chunk_rank]
+        spans, previous_position = [], None
+        for _, position, _, sentence in entries:
+            if previous_position is not None and position == previous_position + 1:
+                spans[-1] += " " + sentence
+            else:
+                spans.append(sentence)
+            previous_position = position
+        packed += f"[{entries[0][2]}]: {' ... '.join(spans)}\n-----\n"
+
+    return packed
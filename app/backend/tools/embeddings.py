@@ -0,0 +1,334 @@
+"""
+Query embeddings for Azure AI Search vector queries
+Embeds queries locally with an LRU and on-disk cache so repeated questions skip
+the embedding hop that server-side vectorization pays on every search
+"""
+
+import os
+import re
+import time
+import array
+import asyncio
+import hashlib
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import aiofiles
+
+from resilience import LatencyWindow
+from token_cache import AsyncRefreshAheadCredential
+from tracing import get_tracing
+
+logger = logging.getLogger(__name__)
+
+COGNITIVE_SERVICES_SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+def normalize_query(text: str) -> str:
+    """Normalize query text so trivially different phrasings share a cache entry."""
+    text = re.sub(r"[^\w\s]", "", text.lower())
+    return " ".join(text.split())
+
+
+class AzureOpenAIEmbeddingBackend:
+    """Calls an Azure OpenAI embeddings deployment over a pooled HTTP session."""
+
+    def __init__(
+        self,
+        endpoint: str,
+        deployment: str,
+        api_version: str = "2024-10-21",
+        api_key: Optional[str] = None,
+    ):
+        """
+        Initialize the embedding backend.
+
+        Args:
+            endpoint: Azure OpenAI endpoint
+            deployment: Embedding model deployment name
+            api_version: Azure OpenAI REST API version
+            api_key: API key; Entra ID tokens are used when omitted
+        """
+        self.url = (
+            f"{endpoint.rstrip('/')}/openai/deployments/{deployment}"
+            f"/embeddings?api-version={api_version}"
+        )
+        self.api_key = api_key
+        self.credential = None
+        self._session = None
+
+    async def _headers(self) -> Dict[str, str]:
+        if self.api_key:
+            return {"api-key": self.api_key}
+        if self.credential is None:
+            from azure.identity.aio import DefaultAzureCredential
+
+            self.credential = AsyncRefreshAheadCredential(DefaultAzureCredential())
+        token = await self.credential.get_token(COGNITIVE_SERVICES_SCOPE)
+        return {"Authorization": f"Bearer {token.token}"}
+
+    async def embed(self, texts: List[str], dimensions: int) -> List[List[float]]:
+        """Embed a batch of texts in a single request."""
+        if self._session is None:
+            import aiohttp
+
+            self._session = aiohttp.ClientSession(
+                timeout=aiohttp.ClientTimeout(total=10)
+            )
+
+        async with self._session.post(
+            self.url,
+            json={"input": texts, "dimensions": dimensions},
+            headers=await self._headers(),
+        ) as response:
+            response.raise_for_status()
+            body = await response.json()
+
+        data = sorted(body["data"], key=lambda item: item["index"])
+        return [item["embedding"] for item in data]
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.credential is not None:
+            await self.credential.close()
+            self.credential = None
+
+
+class FakeEmbeddingBackend:
+    """
+    Deterministic stand-in for the embeddings endpoint.
+
+    Vectors are derived from a hash of the text, so equal texts embed equally
+    and no network or Azure resource is needed. Counts requests and texts.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.texts_embedded = 0
+
+    async def embed(self, texts: List[str], dimensions: int) -> List[List[float]]:
+        self.requests += 1
+        self.texts_embedded += len(texts)
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+
+        vectors = []
+        for text in texts:
+            seed = hashlib.sha256(text.encode("utf-8")).digest()
+            values = [
+                seed[index % len(seed)] / 127.5 - 1.0 for index in range(dimensions)
+            ]
+            norm = sum(value * value for value in values) ** 0.5 or 1.0
+            vectors.append([value / norm for value in values])
+        return vectors
+
+    async def close(self):
+        pass
+
+
+class EmbeddingClient:
+    """Embeds queries through an in-memory LRU, an on-disk cache and a backend."""
+
+    def __init__(
+        self,
+        backend,
+        model: str,
+        dimensions: int = 3072,
+        cache_dir: Optional[str] = None,
+        memory_size: int = 1024,
+        batch_size: int = 16,
+    ):
+        """
+        Initialize the embedding client.
+
+        Args:
+            backend: Object exposing async embed(texts, dimensions) and close()
+            model: Embedding model or deployment name, part of the cache key
+            dimensions: Vector dimensions, must match the index vector field
+            cache_dir: Directory for persisted vectors
+            memory_size: Maximum vectors kept in the in-memory LRU
+            batch_size: Maximum texts per backend request
+        """
+        self.backend = backend
+        self.model = model
+        self.dimensions = dimensions
+        self.cache_dir = Path(
+            cache_dir
+            or os.getenv("EMBEDDING_CACHE_DIR")
+            or Path(__file__).parent.parent / ".embedding_cache"
+        )
+        self.memory_size = memory_size
+        self.batch_size = batch_size
+        self._memory: "OrderedDict[str, List[float]]" = OrderedDict()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.backend_latency = LatencyWindow()
+
+    def make_key(self, text: str) -> str:
+        """Build the cache key for a query text."""
+        raw = f"{normalize_query(text)}|{self.model}|{self.dimensions}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _path_for(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.f32"
+
+    def _remember(self, key: str, vector: List[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+    async def _read_disk(self, key: str) -> Optional[List[float]]:
+        path = self._path_for(key)
+        if not path.exists():
+            return None
+        try:
+            async with aiofiles.open(path, "rb") as file:
+                vector = array.array("f", await file.read())
+        except Exception as e:
+            logger.error(f"Error reading cached embedding {path}: {e}")
+            return None
+        if len(vector) != self.dimensions:
+            return None
+        return vector.tolist()
+
+    async def _write_disk(self, key: str, vector: List[float]):
+        path = self._path_for(key)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial vector;
+            # the temp name is per process since workers share the cache
+            tmp_path = path.with_suffix(f"{path.suffix}.{os.getpid()}.tmp")
+            async with aiofiles.open(tmp_path, "wb") as file:
+                await file.write(array.array("f", vector).tobytes())
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing cached embedding {path}: {e}")
+
+    async def embed(self, text: str) -> List[float]:
+        """Embed a single query text."""
+        return (await self.embed_many([text]))[0]
+
+    async def embed_many(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed query texts, only sending cache misses to the backend.
+
+        Args:
+            texts: Query texts
+
+        Returns:
+            One vector per text, in input order
+        """
+        keys = [self.make_key(text) for text in texts]
+        vectors: Dict[str, List[float]] = {}
+        missing: Dict[str, str] = {}
+
+        for key, text in zip(keys, texts):
+            if key in vectors or key in missing:
+                continue
+            if key in self._memory:
+                self.memory_hits += 1
+                self._memory.move_to_end(key)
+                vectors[key] = self._memory[key]
+                continue
+            vector = await self._read_disk(key)
+            if vector is not None:
+                self.disk_hits += 1
+                self._remember(key, vector)
+                vectors[key] = vector
+            else:
+                self.misses += 1
+                missing[key] = normalize_query(text) or text
+
+        get_tracing().current_span().set_attribute(
+            "embedding.cache_hit", not missing
+        )
+
+        pending = list(missing.items())
+        for start in range(0, len(pending), self.batch_size):
+            batch = pending[start : start + self.batch_size]
+            start_time = time.perf_counter()
+            embedded = await self.backend.embed(
+                [text for _, text in batch], self.dimensions
+            )
+            self.backend_latency.add((time.perf_counter() - start_time) * 1000)
+            for (key, _), vector in zip(batch, embedded):
+                self._remember(key, vector)
+                vectors[key] = vector
+                await self._write_disk(key, vector)
+
+        return [vectors[key] for key in keys]
+
+    async def warm_up(self, questions: List[str]):
+        """Embed a list of common questions ahead of the first caller."""
+        if not questions:
+            return
+        start_time = time.perf_counter()
+        await self.embed_many(questions)
+        logger.info(
+            f"Embedded {len(questions)} warm-up questions in "
+            f"{(time.perf_counter() - start_time) * 1000:.0f}ms "
+            f"({self.misses} sent to the embedding endpoint)"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit counters and backend latency."""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "model": self.model,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (
+                (self.memory_hits + self.disk_hits) / lookups if lookups else None
+            ),
+            "cached_in_memory": len(self._memory),
+            "backend_p50_ms": self.backend_latency.percentile(50),
+            "backend_p95_ms": self.backend_latency.percentile(95),
+        }
+
+    async def close(self):
+        """Close the backend's connections and credential."""
+        await self.backend.close()
+        logger.info(f"Embedding client closed: {self.get_stats()}")
+
+
+# Global instance
+_embedding_client: Optional[EmbeddingClient] = None
+
+
+def get_embedding_client() -> Optional[EmbeddingClient]:
+    """
+    Get the global embedding client instance.
+
+    Uses AZURE_OPENAI_ENDPOINT and AZURE_OPENAI_EMBEDDING_NAME; set
+    EMBEDDING_BACKEND=fake to use the deterministic stand-in instead.
+
+    Returns:
+        EmbeddingClient instance, or None when query embedding is not configured
+    """
+    global _embedding_client
+    if _embedding_client is None:
+        dimensions = int(os.getenv("AZURE_OPENAI_EMBEDDING_DIMENSIONS", "3072"))
+        deployment = os.getenv("AZURE_OPENAI_EMBEDDING_NAME")
+        endpoint = os.getenv("AZURE_OPENAI_ENDPOINT")
+
+        if os.getenv("EMBEDDING_BACKEND") == "fake":
+            backend = FakeEmbeddingBackend()
+            deployment = "fake"
+        elif endpoint and deployment:
+            backend = AzureOpenAIEmbeddingBackend(
+                endpoint, deployment, api_key=os.getenv("AZURE_OPENAI_API_KEY")
+            )
+        else:
+            return None
+
+        _embedding_client = EmbeddingClient(backend, deployment, dimensions)
+    return _embedding_client
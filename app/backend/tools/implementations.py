@@ -4,30 +4,21 @@ Contains the actual function implementations that can be called by the AI
 """
 
 import random
+import time
+import asyncio
 from datetime import datetime, timedelta
 from typing import Any
-from azure.search.documents.aio import SearchClient
-from azure.search.documents.models import VectorizableTextQuery
-import os
-from azure.identity import DefaultAzureCredential
 import logging
 import json
 
+from tools.context_packing import estimate_tokens, pack_search_results
+from tools.embeddings import get_embedding_client
+from tools.search_client import get_search_client_manager
+from tracing import get_tracing
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize search client only if environment variables are available
-search_client = None
-azure_search_endpoint = os.getenv("AZURE_SEARCH_ENDPOINT")
-azure_search_index = os.getenv("AZURE_SEARCH_INDEX")
-
-if azure_search_endpoint and azure_search_index:
-    search_client = SearchClient(
-        endpoint=azure_search_endpoint,
-        credential=DefaultAzureCredential(),
-        index_name=azure_search_index,
-    )
-
 
 async def get_user_information(args: dict) -> str:
     """Search the knowledge base user credit card due date and amount."""
@@ -62,27 +53,126 @@ async def get_product_information(args: dict) -> str:
         else:
             query = str(args)
 
-    # Check if search client is initialized
+    # The shared client is created and warmed up by the app lifespan
+    search_manager = get_search_client_manager()
+    search_client = await search_manager.get_client()
     if not search_client:
         logger.warning(
             "Azure Search client not initialized. Environment variables missing."
         )
         return f"Unable to search for '{query}' - Azure Search service not configured."
 
-    # Hybrid query using Azure AI Search with Semantic Ranker
-    vector_queries = [
-        VectorizableTextQuery(text=query, k_nearest_neighbors=50, fields="text_vector")
-    ]
-
-    search_results = await search_client.search(
-        search_text=query,
-        query_type="semantic",
-        semantic_configuration_name="default",
-        top=5,
-        vector_queries=vector_queries,
-        select=", ".join(["chunk_id", "chunk"]),
+    # The retrieval profile trades relevance for latency while search is slow
+    retrieval_policy = _get_retrieval_policy("get_product_information")
+    profile = retrieval_policy.select()
+    while True:
+        start_time = time.perf_counter()
+        try:
+            chunks, reranked = await asyncio.wait_for(
+                _search(search_client, query, profile), profile.timeout_seconds
+            )
+        except asyncio.TimeoutError:
+            retrieval_policy.record_timeout(profile)
+            cheaper = retrieval_policy.cheaper_than(profile)
+            if cheaper is None:
+                raise
+            logger.warning(f"{profile.name} search timed out, retrying {cheaper.name}")
+            profile = cheaper
+            continue
+        break
+
+    latency_ms = (time.perf_counter() - start_time) * 1000
+    search_manager.record_query(latency_ms)
+    retrieval_policy.record(profile, latency_ms)
+    if profile.semantic and chunks and not reranked:
+        # Semantic ranking exceeded semantic_max_wait_ms and was skipped
+        retrieval_policy.record_timeout(profile)
+
+    # Overlapping chunks are deduplicated and packed into the tool's token budget
+    max_tokens = _get_max_result_tokens("get_product_information")
+    result = pack_search_results(query, chunks, max_tokens)
+    logger.info(
+        f"Search result ({profile.name}, {latency_ms:.0f}ms) packed from "
+        f"{sum(estimate_tokens(text) for _, text in chunks)} to "
+        f"{estimate_tokens(result)} tokens (budget {max_tokens})"
     )
-    result = ""
-    async for r in search_results:
-        result += f"[{r['chunk_id']}]: {r['chunk']}\n-----\n"
-    return result
+    return f"[retrieval_profile: {profile.name}]\n{result}"
+
+
+async def _search(search_client, query: str, profile):
+    """
+    Run one search with a retrieval profile.
+
+    Returns:
+        (chunk_id, chunk) pairs in rank order, and whether they were reranked
+    """
+    with get_tracing().span(
+        "search.query",
+        {
+            "retrieval.profile": profile.name,
+            "retrieval.mode": profile.mode,
+            "retrieval.semantic": profile.semantic,
+        },
+    ) as span:
+        vector_query = None
+        if profile.uses_vectors:
+            vector_query = await _build_vector_query(query, **profile.vector_options)
+
+        search_results = await search_client.search(
+            **profile.search_kwargs(query, vector_query)
+        )
+        chunks, reranked = [], False
+        async for r in search_results:
+            chunks.append((r["chunk_id"], r["chunk"]))
+            reranked = reranked or r.get("@search.reranker_score") is not None
+        span.set_attributes(
+            {
+                "search.results": len(chunks),
+                "search.bytes": sum(len(text.encode("utf-8")) for _, text in chunks),
+                "search.reranked": reranked,
+            }
+        )
+    return chunks, reranked
+
+
+async def _build_vector_query(query: str, **options):
+    """
+    Build the vector query, embedding the text locally when possible.
+
+    Locally embedded (and cached) vectors spare the search service its own
+    embedding call; without an embedding client, or if embedding fails, the
+    search service vectorizes the text itself.
+
+    Args:
+        query: The user's search query
+        **options: k_nearest_neighbors and compressed-index options
+            (oversampling, exhaustive) from the retrieval profile
+    """
+    from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery
+
+    embedding_client = get_embedding_client()
+    if embedding_client is not None:
+        try:
+            return VectorizedQuery(
+                vector=await embedding_client.embed(query),
+                fields="text_vector",
+                **options,
+            )
+        except Exception as e:
+            logger.warning(f"Query embedding failed, vectorizing in search: {e}")
+
+    return VectorizableTextQuery(text=query, fields="text_vector", **options)
+
+
+def _get_retrieval_policy(tool_name: str):
+    """Get the retrieval policy configured for a tool."""
+    from tool_loader import get_tool_loader
+
+    return get_tool_loader().get_retrieval_policy(tool_name)
+
+
+def _get_max_result_tokens(tool_name: str):
+    """Get the result token budget configured for a tool, if any."""
+    from tool_loader import get_tool_loader
+
+    return get_tool_loader().get_tool_config(tool_name).get("max_result_tokens")
@@ -0,0 +1,185 @@
+"""
+Latency-aware retrieval profiles for Azure AI Search
+Declares how a tool searches (keyword, vector, hybrid, semantic) and downgrades
+to cheaper profiles while the richer ones are too slow
+"""
+
+import time
+import logging
+from typing import Any, Dict, Optional
+
+from resilience import LatencyWindow
+
+logger = logging.getLogger(__name__)
+
+RETRIEVAL_MODES = ("keyword", "vector", "hybrid")
+
+# Matches the search the tools ran before profiles were configurable
+DEFAULT_PROFILES = [
+    {"name": "semantic_hybrid", "mode": "hybrid", "semantic": True, "k": 50}
+]
+
+
+class RetrievalProfile:
+    """One way of querying the index, from the 'retrieval.profiles' list."""
+
+    def __init__(self, config: Dict[str, Any]):
+        self.name = config["name"]
+        self.mode = config.get("mode", "hybrid")
+        if self.mode not in RETRIEVAL_MODES:
+            raise ValueError(f"Unknown retrieval mode '{self.mode}' in {self.name}")
+        self.semantic = config.get("semantic", False)
+        self.k = config.get("k", 50)
+        # Only meaningful on compressed indexes (see scripts/index_profiles.yaml)
+        self.oversampling = config.get("oversampling")
+        self.exhaustive = config.get("exhaustive")
+        self.top = config.get("top", 5)
+        self.select = config.get("select", ["chunk_id", "chunk"])
+        self.semantic_configuration = config.get("semantic_configuration", "default")
+        self.semantic_max_wait_ms = config.get("semantic_max_wait_ms")
+        timeout_ms = config.get("timeout_ms")
+        self.timeout_seconds = timeout_ms / 1000 if timeout_ms else None
+
+    @property
+    def uses_vectors(self) -> bool:
+        return self.mode in ("vector", "hybrid")
+
+    @property
+    def vector_options(self) -> Dict[str, Any]:
+        """Vector query options for this profile, omitting unset ones."""
+        options = {
+            "k_nearest_neighbors": self.k,
+            "oversampling": self.oversampling,
+            "exhaustive": self.exhaustive,
+        }
+        return {key: value for key, value in options.items() if value is not None}
+
+    def search_kwargs(self, query: str, vector_query=None) -> Dict[str, Any]:
+        """
+        Build SearchClient.search keyword arguments for this profile.
+
+        Args:
+            query: The user's search query
+            vector_query: Vector query for vector and hybrid modes
+
+        Returns:
+            Keyword arguments for SearchClient.search
+        """
+        kwargs: Dict[str, Any] = {
+            "search_text": None if self.mode == "vector" else query,
+            "top": self.top,
+            "select": ", ".join(self.select),
+        }
+        if self.uses_vectors:
+            kwargs["vector_queries"] = [vector_query]
+        if self.semantic:
+            kwargs["query_type"] = "semantic"
+            kwargs["semantic_configuration_name"] = self.semantic_configuration
+            kwargs["semantic_query"] = query
+            if self.semantic_max_wait_ms:
+                # The service returns unreranked results instead of waiting longer
+                kwargs["semantic_error_mode"] = "partial"
+                kwargs["semantic_max_wait_in_milliseconds"] = self.semantic_max_wait_ms
+        return kwargs
+
+
+class RetrievalPolicy:
+    """
+    Picks the retrieval profile for each search of a tool.
+
+    Profiles are ordered from most relevant to cheapest. The policy steps down
+    one profile when the current one's recent p95 exceeds the latency budget
+    or its semantic ranking times out, and probes the richer profile again
+    after a recovery period.
+    """
+
+    def __init__(self, tool_name: str, config: Optional[Dict[str, Any]] = None):
+        """
+        Initialize the policy.
+
+        Args:
+            tool_name: Name of the tool
+            config: The tool's 'retrieval' configuration section
+        """
+        config = config or {}
+        self.tool_name = tool_name
+        self.profiles = [
+            RetrievalProfile(profile)
+            for profile in config.get("profiles", DEFAULT_PROFILES)
+        ]
+        self.p95_budget_ms = config.get("p95_budget_ms")
+        self.min_samples = config.get("min_samples", 10)
+        self.recovery_seconds = config.get("recovery_seconds", 60)
+
+        self.level = 0
+        self.changed_at = 0.0
+        self.latencies = {profile.name: LatencyWindow(50) for profile in self.profiles}
+        self.searches = {profile.name: 0 for profile in self.profiles}
+        self.downgrades = 0
+        self.timeouts = 0
+
+    @property
+    def current(self) -> RetrievalProfile:
+        return self.profiles[self.level]
+
+    def select(self) -> RetrievalProfile:
+        """Get the profile for the next search, probing upwards after recovery."""
+        recovered = time.monotonic() - self.changed_at >= self.recovery_seconds
+        if self.level > 0 and recovered:
+            self.level -= 1
+            self.changed_at = time.monotonic()
+            # Latencies from before the downgrade no longer describe this profile
+            self.latencies[self.current.name].samples.clear()
+            logger.info(f"{self.tool_name} retrieval probing {self.current.name}")
+        return self.current
+
+    def cheaper_than(self, profile: RetrievalProfile) -> Optional[RetrievalProfile]:
+        """Get the next cheaper profile, or None for the cheapest."""
+        index = self.profiles.index(profile)
+        return self.profiles[index + 1] if index + 1 < len(self.profiles) else None
+
+    def record(self, profile: RetrievalProfile, latency_ms: float):
+        """Record a completed search and downgrade if it breaks the p95 budget."""
+        self.searches[profile.name] += 1
+        window = self.latencies[profile.name]
+        window.add(latency_ms)
+        if (
+            profile is self.current
+            and self.p95_budget_ms is not None
+            and len(window) >= self.min_samples
+            and window.percentile(95) > self.p95_budget_ms
+        ):
+            self._downgrade(f"p95 {window.percentile(95):.0f}ms")
+
+    def record_timeout(self, profile: RetrievalProfile):
+        """Record a search whose semantic ranking or deadline timed out."""
+        self.timeouts += 1
+        if profile is self.current:
+            self._downgrade("timeout")
+
+    def _downgrade(self, reason: str):
+        if self.level + 1 >= len(self.profiles):
+            return
+        previous = self.current.name
+        self.level += 1
+        self.changed_at = time.monotonic()
+        self.downgrades += 1
+        logger.warning(
+            f"{self.tool_name} retrieval downgraded {previous} -> "
+            f"{self.current.name} ({reason})"
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get the current profile and per-profile latencies."""
+        return {
+            "current_profile": self.current.name,
+            "downgrades": self.downgrades,
+            "timeouts": self.timeouts,
+            "profiles": {
+                name: {
+                    "searches": self.searches[name],
+                    "p95_ms": window.percentile(95),
+                }
+                for name, window in self.latencies.items()
+            },
+        }
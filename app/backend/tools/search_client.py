@@ -0,0 +1,170 @@
+"""
+Azure AI Search client lifecycle for tool implementations
+Owns a shared, pooled SearchClient that is warmed up at startup and closed on shutdown
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from resilience import LatencyWindow
+from token_cache import AsyncRefreshAheadCredential
+
+if TYPE_CHECKING:
+    from azure.search.documents.aio import SearchClient
+
+logger = logging.getLogger(__name__)
+
+SEARCH_SCOPE = "https://search.azure.com/.default"
+
+
+class SearchClientManager:
+    """Creates, warms up and closes the process-wide Azure AI Search client."""
+
+    def __init__(
+        self,
+        endpoint: Optional[str] = None,
+        index_name: Optional[str] = None,
+        pool_size: int = 100,
+        keepalive_seconds: float = 60.0,
+    ):
+        """
+        Initialize the search client manager.
+
+        Args:
+            endpoint: Azure AI Search endpoint, defaults to AZURE_SEARCH_ENDPOINT
+            index_name: Index to query, defaults to AZURE_SEARCH_INDEX
+            pool_size: Maximum pooled connections shared by all sessions
+            keepalive_seconds: How long idle connections stay open for reuse
+        """
+        self.endpoint = endpoint or os.getenv("AZURE_SEARCH_ENDPOINT")
+        self.index_name = index_name or os.getenv("AZURE_SEARCH_INDEX")
+        self.pool_size = pool_size
+        self.keepalive_seconds = keepalive_seconds
+
+        self.client: Optional["SearchClient"] = None
+        self.credential = None
+        self._session = None
+        self._start_lock = asyncio.Lock()
+
+        self.warmup_ms: Dict[str, float] = {}
+        self.first_query_ms: Optional[float] = None
+        self.steady_state = LatencyWindow(size=500)
+
+    @property
+    def is_configured(self) -> bool:
+        return bool(self.endpoint and self.index_name)
+
+    async def start(self):
+        """Create the pooled client. Does nothing when search is not configured."""
+        async with self._start_lock:
+            if self.client is None and self.is_configured:
+                self._create_client()
+
+    def _create_client(self):
+        # SDKs are imported on first use so they never slow down a cold start
+        import aiohttp
+        from azure.core.pipeline.transport import AioHttpTransport
+        from azure.identity.aio import DefaultAzureCredential
+        from azure.search.documents.aio import SearchClient
+
+        # One keep-alive pool for every session avoids per-query TLS handshakes
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=self.pool_size,
+                keepalive_timeout=self.keepalive_seconds,
+                ttl_dns_cache=300,
+            )
+        )
+        # Tokens are cached and refreshed ahead of expiry, never mid-query
+        self.credential = AsyncRefreshAheadCredential(DefaultAzureCredential())
+        self.client = SearchClient(
+            endpoint=self.endpoint,
+            credential=self.credential,
+            index_name=self.index_name,
+            transport=AioHttpTransport(session=self._session, session_owner=False),
+        )
+        logger.info(f"Search client created for index {self.index_name}")
+
+    async def warm_up(self):
+        """Fetch a token and run a trivial query so no caller pays cold-start costs."""
+        await self.start()
+        if self.client is None:
+            logger.info("Azure Search not configured, skipping warm-up")
+            return
+
+        try:
+            start_time = time.perf_counter()
+            await self.credential.get_token(SEARCH_SCOPE)
+            self.warmup_ms["token"] = (time.perf_counter() - start_time) * 1000
+
+            start_time = time.perf_counter()
+            results = await self.client.search(search_text="*", top=1)
+            async for _ in results:
+                pass
+            # Kept out of record_query so the first caller's query is measured
+            self.warmup_ms["query"] = (time.perf_counter() - start_time) * 1000
+
+            logger.info(
+                f"Search client warmed up: token {self.warmup_ms['token']:.0f}ms, "
+                f"query {self.warmup_ms['query']:.0f}ms"
+            )
+        except Exception as e:
+            logger.warning(f"Search client warm-up failed: {e}")
+
+    async def get_client(self) -> Optional["SearchClient"]:
+        """Get the shared client, creating it lazily outside the app lifespan."""
+        if self.client is None:
+            await self.start()
+        return self.client
+
+    def record_query(self, latency_ms: float):
+        """Record a query latency, keeping the process's first query separate."""
+        if self.first_query_ms is None:
+            self.first_query_ms = latency_ms
+            logger.info(f"First search query took {latency_ms:.0f}ms")
+        else:
+            self.steady_state.add(latency_ms)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get warm-up, first-query and steady-state latencies."""
+        return {
+            "warmup_ms": self.warmup_ms,
+            "first_query_ms": self.first_query_ms,
+            "steady_state_p50_ms": self.steady_state.percentile(50),
+            "steady_state_p95_ms": self.steady_state.percentile(95),
+            "steady_state_queries": len(self.steady_state),
+            "token": self.credential.get_stats() if self.credential else None,
+        }
+
+    async def close(self):
+        """Close the client, its credential and the connection pool."""
+        if self.client is not None:
+            await self.client.close()
+            self.client = None
+        if self.credential is not None:
+            await self.credential.close()
+            self.credential = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        logger.info(f"Search client closed: {self.get_stats()}")
+
+
+# Global instance
+_search_client_manager: Optional[SearchClientManager] = None
+
+
+def get_search_client_manager() -> SearchClientManager:
+    """
+    Get the global search client manager instance.
+
+    Returns:
+        SearchClientManager instance
+    """
+    global _search_client_manager
+    if _search_client_manager is None:
+        _search_client_manager = SearchClientManager()
+    return _search_client_manager
@@ -0,0 +1,250 @@
+"""
+OpenTelemetry tracing for Voice Assistant
+Spans for sessions, turns, tool calls and searches, exported in sampled batches.
+OpenTelemetry is optional: without the SDK every span is a no-op
+"""
+
+import os
+import logging
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+TRACING_EXPORTERS = ("none", "memory", "console", "otlp", "azure_monitor")
+
+
+class _NoOpSpan:
+    """Stand-in span used when tracing is disabled or unavailable."""
+
+    def set_attribute(self, key: str, value: Any):
+        pass
+
+    def set_attributes(self, attributes: Dict[str, Any]):
+        pass
+
+    def add_event(self, name: str, attributes: Optional[Dict[str, Any]] = None):
+        pass
+
+    def record_exception(self, exception: BaseException):
+        pass
+
+    def is_recording(self) -> bool:
+        return False
+
+    def end(self):
+        pass
+
+
+NO_OP_SPAN = _NoOpSpan()
+
+
+class TracingManager:
+    """Creates spans through an OpenTelemetry tracer provider, when configured."""
+
+    def __init__(
+        self,
+        exporter: str = "none",
+        sample_ratio: float = 0.1,
+        service_name: str = "voice-assistant-backend",
+        max_queue_size: int = 2048,
+        max_export_batch_size: int = 512,
+        schedule_delay_ms: int = 5000,
+    ):
+        """
+        Initialize the tracing manager and its exporter.
+
+        Args:
+            exporter: One of 'none', 'memory', 'console', 'otlp' or 'azure_monitor'
+            sample_ratio: Fraction of sessions traced; child spans follow their root
+            service_name: service.name resource attribute
+            max_queue_size: Spans buffered for export before new ones are dropped
+            max_export_batch_size: Spans sent per export call
+            schedule_delay_ms: Longest time a span waits in the export queue
+        """
+        if exporter not in TRACING_EXPORTERS:
+            raise ValueError(f"Unknown tracing exporter: {exporter}")
+        self.exporter = exporter
+        self.sample_ratio = sample_ratio
+        self.provider = None
+        self.memory_exporter = None
+        self._tracer = None
+        self._trace_api = None
+
+        if exporter == "none":
+            return
+        try:
+            self._configure(
+                service_name, max_queue_size, max_export_batch_size, schedule_delay_ms
+            )
+        except ImportError as e:
+            logger.warning(f"Tracing disabled, OpenTelemetry SDK not installed: {e}")
+            self.exporter = "none"
+
+    def _configure(
+        self,
+        service_name: str,
+        max_queue_size: int,
+        max_export_batch_size: int,
+        schedule_delay_ms: int,
+    ):
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import (
+            BatchSpanProcessor,
+            SimpleSpanProcessor,
+        )
+        from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+        self.provider = TracerProvider(
+            resource=Resource.create({"service.name": service_name}),
+            sampler=ParentBased(TraceIdRatioBased(self.sample_ratio)),
+        )
+
+        if self.exporter == "memory":
+            from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+                InMemorySpanExporter,
+            )
+
+            # Exported synchronously so tests can read spans as soon as they end
+            self.memory_exporter = InMemorySpanExporter()
+            self.provider.add_span_processor(
+                SimpleSpanProcessor(self.memory_exporter)
+            )
+        else:
+            self.provider.add_span_processor(
+                BatchSpanProcessor(
+                    self._create_exporter(),
+                    max_queue_size=max_queue_size,
+                    max_export_batch_size=max_export_batch_size,
+                    schedule_delay_millis=schedule_delay_ms,
+                )
+            )
+
+        self._trace_api = trace
+        self._tracer = self.provider.get_tracer("voice-assistant")
+        logger.info(
+            f"Tracing enabled ({self.exporter} exporter, "
+            f"{self.sample_ratio:.0%} of sessions sampled)"
+        )
+
+    def _create_exporter(self):
+        if self.exporter == "console":
+            from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+            return ConsoleSpanExporter()
+        if self.exporter == "otlp":
+            # Endpoint and headers come from the standard OTEL_EXPORTER_OTLP_* vars
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+                OTLPSpanExporter,
+            )
+
+            return OTLPSpanExporter()
+
+        from azure.monitor.opentelemetry.exporter import AzureMonitorTraceExporter
+
+        return AzureMonitorTraceExporter.from_connection_string(
+            os.environ["APPLICATIONINSIGHTS_CONNECTION_STRING"]
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self._tracer is not None
+
+    def _parent_context(self, parent):
+        if parent is None or parent is NO_OP_SPAN:
+            return None
+        return self._trace_api.set_span_in_context(parent)
+
+    def start_span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent=None,
+    ):
+        """
+        Start a span that the caller ends, for work spread across events.
+
+        The span is not made current, so it does not parent work started
+        elsewhere unless passed explicitly as a parent.
+
+        Args:
+            name: Span name
+            attributes: Span attributes
+            parent: Parent span; defaults to the current span
+
+        Returns:
+            The started span (a no-op span when tracing is disabled)
+        """
+        if self._tracer is None:
+            return NO_OP_SPAN
+        return self._tracer.start_span(
+            name, context=self._parent_context(parent), attributes=attributes
+        )
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        parent=None,
+    ) -> Iterator[Any]:
+        """
+        Run a block inside a current span.
+
+        Tasks created inside the block inherit the span through their context,
+        so background work is parented to it.
+
+        Args:
+            name: Span name
+            attributes: Span attributes
+            parent: Parent span; defaults to the current span
+        """
+        if self._tracer is None:
+            yield NO_OP_SPAN
+            return
+        with self._tracer.start_as_current_span(
+            name, context=self._parent_context(parent), attributes=attributes
+        ) as span:
+            yield span
+
+    def current_span(self):
+        """Get the current span, to add attributes from deeper layers."""
+        if self._tracer is None:
+            return NO_OP_SPAN
+        return self._trace_api.get_current_span()
+
+    def shutdown(self):
+        """Flush queued spans and stop the exporter."""
+        if self.provider is not None:
+            self.provider.shutdown()
+
+
+# Global instance
+_tracing_manager: Optional[TracingManager] = None
+
+
+def get_tracing() -> TracingManager:
+    """
+    Get the global tracing manager instance.
+
+    TRACING_EXPORTER selects the exporter; it defaults to azure_monitor when
+    APPLICATIONINSIGHTS_CONNECTION_STRING is set and to none otherwise.
+    TRACING_SAMPLE_RATIO sets the fraction of sessions traced.
+
+    Returns:
+        TracingManager instance
+    """
+    global _tracing_manager
+    if _tracing_manager is None:
+        default_exporter = (
+            "azure_monitor"
+            if os.getenv("APPLICATIONINSIGHTS_CONNECTION_STRING")
+            else "none"
+        )
+        _tracing_manager = TracingManager(
+            exporter=os.getenv("TRACING_EXPORTER", default_exporter).lower(),
+            sample_ratio=float(os.getenv("TRACING_SAMPLE_RATIO", "0.1")),
+        )
+    return _tracing_manager
@@ -9,7 +9,7 @@ import json
 import logging
 import base64
 import os
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, List, Any, Optional, Callable
 from azure.core.credentials import AzureKeyCredential
 from azure.ai.voicelive.aio import connect
 from azure.ai.voicelive.models import (
@@ -29,11 +29,36 @@ from azure.ai.voicelive.models import (
     AzureSemanticVad,
     MessageItem,
     ResponseCreateParams,
+    ResponseStatus,
+    AssistantMessageItem,
+    OutputTextContentPart,
 )
-from fastapi import WebSocket
+from bridge import VoiceAssistantBridge
+from audio_cache import AUDIO_CHUNK_SIZE, get_phrase_audio_cache, normalize_phrase
+from session_recorder import create_session_recorder
+from session_store import SessionToolStore
+from single_flight import normalize_arguments
+from structured_logging import get_sampled_logger
+from task_context import set_task_context
+from tracing import NO_OP_SPAN, get_tracing
 
 # Set up logging
 logger = logging.getLogger(__name__)
+# Per-frame audio logs, sampled by the logging pipeline
+audio_logger = get_sampled_logger("voice.audio")
+
+# Instructions for the holding phrase spoken while a slow tool runs
+FILLER_INSTRUCTIONS = (
+    "Diga apenas uma frase curta para o cliente aguardar, por exemplo "
+    "'Só mais um instante, estou finalizando a consulta'. "
+    "Não responda à pergunta ainda e não chame nenhuma função."
+)
+
+# Instructions for generating a cacheable phrase word for word
+PHRASE_INSTRUCTIONS = (
+    'Diga exatamente a frase a seguir, sem acrescentar nada: "{text}". '
+    "Não chame nenhuma função."
+)
 
 
 class WebSocketAudioProcessor:
@@ -65,7 +90,7 @@ class WebSocketAudioProcessor:
         """Process audio input received from frontend."""
         try:
             await connection.input_audio_buffer.append(audio=audio_base64)
-            logger.debug("Audio input processed from frontend")
+            audio_logger.debug("Audio input processed from frontend")
         except Exception as e:
             logger.error(f"Error processing input audio: {e}")
 
@@ -95,45 +120,6 @@ class WebSocketAudioProcessor:
                 logger.error(f"Error stopping playback: {e}")
         logger.info("Audio playback stopped")
 
-class VoiceAssistantBridge:
-    """Bridge between frontend WebSocket and Azure VoiceLive API"""
-
-    def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.voice_clients: Dict[str, WebSocketVoiceClient] = {}
-
-    async def connect(self, websocket: WebSocket, client_id: str):
-        """Accept a new WebSocket connection"""
-        await websocket.accept()
-        self.active_connections[client_id] = websocket
-        logger.info(f"Client {client_id} connected")
-
-    async def disconnect(self, client_id: str):
-        """Handle WebSocket disconnection"""
-        if client_id in self.active_connections:
-            del self.active_connections[client_id]
-        if client_id in self.voice_clients:
-            # Cleanup voice client
-            voice_client = self.voice_clients[client_id]
-            await voice_client.cleanup()
-            del self.voice_clients[client_id]
-        logger.info(f"Client {client_id} disconnected")
-
-    async def send_message(self, client_id: str, message: dict):
-        """Send message to specific client"""
-        if client_id in self.active_connections:
-            websocket = self.active_connections[client_id]
-            try:
-                await websocket.send_text(json.dumps(message))
-            except Exception as e:
-                logger.error(f"Error sending message to {client_id}: {e}")
-                await self.disconnect(client_id)
-
-    async def broadcast(self, message: dict):
-        """Broadcast message to all connected clients"""
-        for client_id in list(self.active_connections.keys()):
-            await self.send_message(client_id, message)
-
 
 class WebSocketVoiceClient:
     """
@@ -152,6 +138,7 @@ class WebSocketVoiceClient:
         instructions: str = "",
         tools: list = None,
         websocket_callback: Optional[Callable] = None,
+        connection_factory: Optional[Callable] = None,
     ):
         self.client_id = client_id
         self.endpoint = endpoint
@@ -162,6 +149,8 @@ class WebSocketVoiceClient:
         self.tools = tools or []
         self.websocket_callback = websocket_callback
         self.bridge = bridge
+        # VoiceLive connect(); replaced by a fake connection for replays
+        self.connection_factory = connection_factory or connect
 
         # Initialize audio processor
         self.audio_processor = WebSocketAudioProcessor()
@@ -174,8 +163,34 @@ class WebSocketVoiceClient:
         self.is_running = False
         self.function_call_in_progress = False
         self.active_call_id = None
+        self.pending_function_calls: Dict[str, Dict[str, Any]] = {}
+        self.function_call_tasks: set = set()
+        # Bumped when the caller starts speaking; tool batches started before
+        # a barge-in submit their outputs but do not start a reply
+        self.interruption_count = 0
+        self.speculative_saved_ms_total = 0.0
+        self.filler_response_done: Optional[asyncio.Event] = None
+        self.tool_response_metrics: Optional[Dict[str, Any]] = None
+
+        # Fixed phrases served from the local audio cache
+        self.phrase_cache = get_phrase_audio_cache()
+        self.phrase_capture: Optional[Dict[str, Any]] = None
+
+        # Prefetched per-caller tool results
+        self.tool_store = SessionToolStore()
+
+        # Trace spans; a turn runs from end of speech to the last response
+        self.tracing = get_tracing()
+        self.turn_span = NO_OP_SPAN
+        self.turn_count = 0
+        self.turn_audio_bytes = 0
+        self.turn_tool_calls = 0
+
+        # Opt-in recording of upstream events and frontend messages
+        self.recorder = None
 
         # Available functions - load from YAML configuration
+        self.tool_loader = None
         self.available_functions = {}
         self._register_functions()
 
@@ -186,8 +201,8 @@ class WebSocketVoiceClient:
         try:
             from tool_loader import get_tool_loader
 
-            tool_loader = get_tool_loader()
-            self.available_functions = tool_loader.get_function_implementations()
+            self.tool_loader = get_tool_loader()
+            self.available_functions = self.tool_loader.get_function_implementations()
             logger.info(
                 f"Registered {len(self.available_functions)} functions from YAML config"
             )
@@ -199,32 +214,49 @@ class WebSocketVoiceClient:
 
     async def run(self):
         """Start the voice client session."""
+        set_task_context(session_id=self.client_id, phase="event_dispatch")
         try:
-            self.is_running = True
-            logger.info(f"Connecting to VoiceLive API with model {self.model}")
+            # Tasks started in the session (tools, prefetch) inherit its span
+            with self.tracing.span(
+                "voice.session",
+                {"session.id": self.client_id, "voice.model": self.model},
+            ):
+                self.is_running = True
+                self.recorder = create_session_recorder(self.client_id)
+                if self.recorder is not None:
+                    self.recorder.record_session(
+                        client_id=self.client_id, model=self.model, voice=self.voice
+                    )
+
+                # Prefetch per-caller tool data while the connection is set up
+                self._start_prefetch()
+
+                logger.info(f"Connecting to VoiceLive API with model {self.model}")
+
+                async with self.connection_factory(
+                    endpoint=self.endpoint,
+                    credential=self.credential,
+                    model=self.model,
+                    connection_options={
+                        "max_msg_size": 10 * 1024 * 1024,
+                        "heartbeat": 20,
+                        "timeout": 20,
+                    },
+                ) as connection:
+                    self.connection = connection
 
-            async with connect(
-                endpoint=self.endpoint,
-                credential=self.credential,
-                model=self.model,
-                connection_options={
-                    "max_msg_size": 10 * 1024 * 1024,
-                    "heartbeat": 20,
-                    "timeout": 20,
-                },
-            ) as connection:
-                self.connection = connection
+                    # Start audio processor
+                    await self.audio_processor.start()
 
-                # Start audio processor
-                await self.audio_processor.start()
+                    # Configure session
+                    await self._setup_session(connection)
 
-                # Configure session
-                await self._setup_session(connection)
+                    logger.info("🎤 Voice assistant ready! Start speaking...")
 
-                logger.info("🎤 Voice assistant ready! Start speaking...")
+                    await self._speak_greeting(connection)
 
-                # Process events
-                await self._process_events(connection)
+                    # Process events
+                    await self._process_events(connection)
 
         except Exception as e:
             logger.error(f"Voice client error: {e}")
@@ -296,6 +328,8 @@ class WebSocketVoiceClient:
                 if not self.is_running:
                     break
 
+                if self.recorder is not None:
+                    self.recorder.record_server_event(event)
                 await self._handle_event(event, connection)
 
         except Exception as e:
@@ -311,17 +345,32 @@ class WebSocketVoiceClient:
             if event_type == ServerEventType.RESPONSE_AUDIO_DELTA:
                 if hasattr(event, "delta") and event.delta:
                     await self.audio_processor.queue_audio(event.delta)
+                    self.turn_audio_bytes += len(event.delta)
+                    audio_logger.debug("Audio delta: %d bytes", len(event.delta))
+                    if self.phrase_capture is not None:
+                        self.phrase_capture["audio"].extend(event.delta)
+                    metrics = self.tool_response_metrics
+                    if metrics is not None and metrics["first_audio_ms"] is None:
+                        metrics["first_audio_ms"] = (
+                            asyncio.get_event_loop().time() - metrics["requested_at"]
+                        ) * 1000
 
             elif event_type == ServerEventType.RESPONSE_AUDIO_DONE:
                 logger.info("🔊 Audio response complete")
 
+            elif event_type == ServerEventType.RESPONSE_AUDIO_TRANSCRIPT_DONE:
+                await self._handle_audio_transcript_done(event)
+
             # Speech detection events
             elif event_type == ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STARTED:
                 logger.info("🎤 User started speaking")
+                self.interruption_count += 1
+                self._end_turn(interrupted=True)
                 await self._handle_user_interruption(connection)
 
             elif event_type == ServerEventType.INPUT_AUDIO_BUFFER_SPEECH_STOPPED:
                 logger.info("🎤 User stopped speaking")
+                self._start_turn()
                 await self._handle_user_speech_end()
 
             # Response events
@@ -330,11 +379,29 @@ class WebSocketVoiceClient:
 
             elif event_type == ServerEventType.RESPONSE_DONE:
                 logger.info("✅ Response complete")
+                if self.filler_response_done is not None:
+                    self.filler_response_done.set()
+                self.phrase_capture = None
+                self._report_tool_response_metrics(event)
+                status = getattr(getattr(event, "response", None), "status", None)
+                cancelled = status == ResponseStatus.CANCELLED
+                if cancelled:
+                    # A barged-in response's calls are stale; never answer them
+                    self._drop_function_calls()
+                else:
+                    self._flush_function_calls(connection)
+                # Audio often comes before the tool calls of the same response;
+                # the turn lasts until a response needs no tool follow-up
+                if not self.function_call_tasks:
+                    self._end_turn(interrupted=cancelled)
 
             # Function call events
             elif event_type == ServerEventType.CONVERSATION_ITEM_CREATED:
                 await self._handle_conversation_item_created(event, connection)
 
+            elif event_type == ServerEventType.RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE:
+                await self._handle_function_call_arguments_done(event)
+
             # Text transcription events
             elif (
                 event_type
@@ -376,12 +443,12 @@ class WebSocketVoiceClient:
     async def _handle_function_call_with_improved_pattern(
         self, conversation_created_event, connection
     ):
-        """Enhanced function call handler with WebSocket events"""
-        # Validate the event structure
-        if not isinstance(conversation_created_event, type(conversation_created_event)):
-            logger.error("Expected ServerEventConversationItemCreated")
-            return
+        """
+        Register a function call item for the current response.
 
+        Calls are collected until RESPONSE_DONE so that every function call
+        emitted in a single response can be executed together.
+        """
         if not hasattr(conversation_created_event.item, "call_id"):
             logger.error("Expected ResponseFunctionCallItem")
             return
@@ -389,10 +456,19 @@ class WebSocketVoiceClient:
         function_call_item = conversation_created_event.item
         function_name = function_call_item.name
         call_id = function_call_item.call_id
-        previous_item_id = function_call_item.id
 
         logger.info(f"Function call detected: {function_name} with call_id: {call_id}")
 
+        self.pending_function_calls[call_id] = {
+            "function_name": function_name,
+            "call_id": call_id,
+            "previous_item_id": function_call_item.id,
+            "arguments": None,
+            "task": None,
+            "started_at": None,
+            "completed_at": None,
+        }
+
         # Send function call started event
         await self.bridge.send_message(
             self.client_id,
@@ -404,142 +480,505 @@ class WebSocketVoiceClient:
             },
         )
 
+    async def _handle_function_call_arguments_done(self, event):
+        """Attach completed arguments to a pending function call."""
+        call_id = getattr(event, "call_id", None)
+        pending_call = self.pending_function_calls.get(call_id)
+        if pending_call is None:
+            logger.warning(f"Arguments received for unknown call_id: {call_id}")
+            return
+
+        pending_call["arguments"] = event.arguments
+        logger.info(f"Function arguments received: {event.arguments}")
+
+        # Send function arguments received event
+        await self.bridge.send_message(
+            self.client_id,
+            {
+                "type": "tool_call_arguments",
+                "function_name": pending_call["function_name"],
+                "call_id": call_id,
+                "arguments": event.arguments,
+                "timestamp": asyncio.get_event_loop().time(),
+            },
+        )
+
+        # Speculative tools start now; their result is held until RESPONSE_DONE
+        if self._is_function_speculative(pending_call["function_name"]):
+            logger.info(
+                f"Starting speculative execution: {pending_call['function_name']}"
+            )
+            pending_call["task"] = asyncio.create_task(
+                self._execute_function_call(pending_call)
+            )
+
+    def _flush_function_calls(self, connection):
+        """Dispatch every function call collected for the finished response."""
+        ready_calls = [
+            call
+            for call in self.pending_function_calls.values()
+            if call["arguments"] is not None
+        ]
+        self.pending_function_calls.clear()
+
+        if not ready_calls:
+            return
+        self.turn_tool_calls += len(ready_calls)
+
+        # Run in the background so audio and events keep flowing meanwhile
+        response_done_at = asyncio.get_event_loop().time()
+        task = asyncio.create_task(
+            self._execute_function_calls(
+                ready_calls, connection, response_done_at, self.interruption_count
+            )
+        )
+        self.function_call_tasks.add(task)
+        task.add_done_callback(self.function_call_tasks.discard)
+
+    def _drop_function_calls(self):
+        """Discard the calls collected for a response, stopping speculative ones."""
+        for call in self.pending_function_calls.values():
+            if call["task"]:
+                call["task"].cancel()
+        if self.pending_function_calls:
+            logger.info(
+                f"Dropped {len(self.pending_function_calls)} pending function call(s)"
+            )
+        self.pending_function_calls.clear()
+
+    async def _execute_function_calls(
+        self,
+        calls: List[Dict[str, Any]],
+        connection,
+        response_done_at: float,
+        interruptions: int,
+    ):
+        """
+        Execute function calls concurrently and submit all outputs at once.
+
+        Args:
+            calls: The function calls of one finished response
+            connection: The VoiceLive connection
+            response_done_at: Loop time the response finished
+            interruptions: Barge-in count when the response finished
+        """
+        submitted = set()
         try:
-            # Set tracking variables
             self.function_call_in_progress = True
-            self.active_call_id = call_id
+            self.active_call_id = calls[0]["call_id"] if len(calls) == 1 else None
 
-            # Wait for the function arguments to be complete
-            function_done = await self._wait_for_event(
-                connection, {ServerEventType.RESPONSE_FUNCTION_CALL_ARGUMENTS_DONE}
+            start_time = asyncio.get_event_loop().time()
+            results = asyncio.gather(
+                *(
+                    call["task"] if call["task"] else self._execute_function_call(call)
+                    for call in calls
+                )
             )
 
-            if function_done.call_id != call_id:
-                logger.warning(
-                    f"Call ID mismatch: expected {call_id}, got {function_done.call_id}"
-                )
-                return
+            # Fill dead air if the tools outlast their configured deadline
+            filler_after_ms = self._get_filler_deadline_ms(calls)
+            if filler_after_ms is not None:
+                done, _ = await asyncio.wait({results}, timeout=filler_after_ms / 1000)
+                if not done and self.interruption_count == interruptions:
+                    await self._request_filler_response(connection)
 
-            arguments = function_done.arguments
-            logger.info(f"Function arguments received: {arguments}")
-
-            # Send function arguments received event
-            await self.bridge.send_message(
-                self.client_id,
-                {
-                    "type": "tool_call_arguments",
-                    "function_name": function_name,
-                    "call_id": call_id,
-                    "arguments": arguments,
-                    "timestamp": asyncio.get_event_loop().time(),
-                },
+            outputs = await results
+            elapsed = asyncio.get_event_loop().time() - start_time
+            logger.info(
+                f"Executed {len(calls)} function call(s) in {elapsed * 1000:.0f}ms"
             )
+            self._report_speculative_savings(calls, response_done_at)
 
-            # Wait for response to be done before proceeding
-            await self._wait_for_event(connection, {ServerEventType.RESPONSE_DONE})
-
-            # Execute the function if we have it
-            if function_name in self.available_functions:
-                logger.info(f"Executing function: {function_name}")
-
-                # Send function executing event
-                await self.bridge.send_message(
-                    self.client_id,
-                    {
-                        "type": "tool_call_executing",
-                        "function_name": function_name,
-                        "call_id": call_id,
-                        "timestamp": asyncio.get_event_loop().time(),
-                    },
-                )
+            for call, output in zip(calls, outputs):
+                await self._submit_function_output(call, output, connection)
+                submitted.add(call["call_id"])
 
-                # Execute the function
-                start_time = asyncio.get_event_loop().time()
-                result = await self.available_functions[function_name](arguments)
-                end_time = asyncio.get_event_loop().time()
-
-                # Send function completed event
-                await self.bridge.send_message(
-                    self.client_id,
-                    {
-                        "type": "tool_call_completed",
-                        "function_name": function_name,
-                        "call_id": call_id,
-                        "result": result,
-                        "execution_time": end_time - start_time,
-                        "timestamp": end_time,
-                    },
-                )
+            # A single response covers every function result of the turn
+            await self._wait_for_filler_response()
+            await self._request_tool_response(connection, interruptions)
+
+        except Exception as e:
+            logger.error(f"Error submitting function results: {e}")
+            await self._recover_function_calls(
+                calls, submitted, connection, interruptions, str(e)
+            )
 
-                # Create function call output item
-                from azure.ai.voicelive.models import FunctionCallOutputItem
+        finally:
+            self.function_call_in_progress = False
+            self.active_call_id = None
 
-                function_output = FunctionCallOutputItem(
-                    call_id=call_id, output=json.dumps(result)
-                )
+    async def _submit_function_output(
+        self, call: Dict[str, Any], output: Any, connection
+    ):
+        """Send a function result back to the conversation after its call item."""
+        function_output = FunctionCallOutputItem(
+            call_id=call["call_id"], output=json.dumps(output)
+        )
+        await connection.conversation.item.create(
+            previous_item_id=call["previous_item_id"], item=function_output
+        )
+
+    async def _request_tool_response(self, connection, interruptions: int):
+        """Ask the model to answer the tool outputs unless the caller barged in."""
+        if self.interruption_count != interruptions:
+            # The caller's new turn gets its own response; outputs stay as context
+            logger.info("Caller spoke while tools ran, tool reply skipped")
+            return
+
+        self.tool_response_metrics = {
+            "requested_at": asyncio.get_event_loop().time(),
+            "first_audio_ms": None,
+        }
+        await connection.response.create()
+
+    async def _recover_function_calls(
+        self,
+        calls: List[Dict[str, Any]],
+        submitted: set,
+        connection,
+        interruptions: int,
+        error: str,
+    ):
+        """Close every call left without output so the model is not kept waiting."""
+        try:
+            for call in calls:
+                if call["call_id"] not in submitted:
+                    await self._submit_function_output(
+                        call, {"error": error}, connection
+                    )
+            await self._request_tool_response(connection, interruptions)
+        except Exception as e:
+            logger.error(f"Error submitting function error outputs: {e}")
+
+    async def _execute_function_call(self, call: Dict[str, Any]) -> Any:
+        """
+        Execute a single function call with its configured timeout.
+
+        Returns:
+            The function result, or an error payload for the model so that
+            every call gets an output
+        """
+        function_name = call["function_name"]
+        call_id = call["call_id"]
+
+        if function_name not in self.available_functions:
+            error_msg = f"Unknown function: {function_name}"
+            logger.error(error_msg)
+            await self._send_function_error(function_name, call_id, error_msg)
+            return {"error": error_msg}
+
+        logger.info(f"Executing function: {function_name}")
+
+        # Send function executing event
+        await self.bridge.send_message(
+            self.client_id,
+            {
+                "type": "tool_call_executing",
+                "function_name": function_name,
+                "call_id": call_id,
+                "timestamp": asyncio.get_event_loop().time(),
+            },
+        )
 
-                # Send the result back to the conversation with proper previous_item_id
-                await connection.conversation.item.create(
-                    previous_item_id=previous_item_id, item=function_output
+        timeout_s = self._get_function_timeout(function_name)
+        start_time = asyncio.get_event_loop().time()
+        call["started_at"] = start_time
+        with self.tracing.span(
+            "voice.tool",
+            {
+                "tool.name": function_name,
+                "tool.call_id": call_id,
+                "tool.speculative": self._is_function_speculative(function_name),
+            },
+            parent=self.turn_span,
+        ) as span:
+            try:
+                result = await asyncio.wait_for(
+                    self._invoke_function(function_name, call["arguments"]),
+                    timeout=timeout_s,
                 )
+                span.set_attribute("tool.result_bytes", len(str(result)))
+            except asyncio.TimeoutError:
+                error_msg = f"Function {function_name} timed out after {timeout_s}s"
+                logger.error(error_msg)
+                span.set_attribute("tool.timed_out", True)
+                await self._send_function_error(function_name, call_id, error_msg)
+                return {"error": error_msg}
+            except Exception as e:
+                logger.error(f"Error executing function {function_name}: {e}")
+                span.record_exception(e)
+                await self._send_function_error(function_name, call_id, str(e))
+                return {"error": str(e)}
+            finally:
+                call["completed_at"] = asyncio.get_event_loop().time()
+
+        end_time = call["completed_at"]
+
+        # Send function completed event
+        await self.bridge.send_message(
+            self.client_id,
+            {
+                "type": "tool_call_completed",
+                "function_name": function_name,
+                "call_id": call_id,
+                "result": result,
+                "execution_time": end_time - start_time,
+                "timestamp": end_time,
+            },
+        )
+
+        logger.info(f"Function result ready: {result}")
+        return result
 
-                logger.info(f"Function result sent: {result}")
+    def _start_prefetch(self):
+        """Start background execution of tools flagged for prefetch."""
+        if self.tool_loader is None:
+            return
+
+        for tool in self.tool_loader.get_prefetch_tools():
+            function_name = tool.get("name")
+            if function_name not in self.available_functions:
+                continue
 
-                # Create a new response to process the function result
-                await connection.response.create()
+            arguments = tool.get("prefetch_arguments", {})
+            task = asyncio.create_task(
+                asyncio.wait_for(
+                    self.available_functions[function_name](arguments),
+                    timeout=self._get_function_timeout(function_name),
+                )
+            )
+            self.tool_store.put(
+                self._prefetch_key(function_name, arguments),
+                task,
+                tool.get("prefetch_ttl_seconds"),
+            )
+            logger.info(f"Prefetching tool data: {function_name}")
+
+    @staticmethod
+    def _prefetch_key(function_name: str, arguments) -> str:
+        """Key prefetched results by tool and arguments, so only a match reuses one."""
+        return f"{function_name}:{normalize_arguments(arguments)}"
+
+    async def _invoke_function(self, function_name: str, arguments) -> Any:
+        """Invoke a function, answering from prefetched results when fresh."""
+        set_task_context(phase="tool_execution", tool=function_name)
+        prefetch_key = self._prefetch_key(function_name, arguments)
+        prefetched = self.tool_store.get(prefetch_key)
+        if prefetched is not None:
+            try:
+                # Shield so a call timeout never cancels the stored result
+                result = await asyncio.shield(prefetched)
+                logger.info(f"Answered {function_name} from prefetched result")
+                self.tracing.current_span().set_attribute("tool.cache_hit", True)
+                return result
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"Prefetched {function_name} failed, retrying: {e}")
+                self.tool_store.evict(prefetch_key)
+
+        self.tracing.current_span().set_attribute("tool.cache_hit", False)
+        return await self.available_functions[function_name](arguments)
+
+    def _get_filler_deadline_ms(self, calls: List[Dict[str, Any]]) -> Optional[int]:
+        """Get the earliest filler deadline among calls that are still running."""
+        if self.tool_loader is None:
+            return None
+
+        deadlines = [
+            self.tool_loader.get_tool_filler_after_ms(call["function_name"])
+            for call in calls
+            # Speculative calls that already finished need no filler
+            if not (call["task"] and call["task"].done())
+        ]
+        deadlines = [deadline for deadline in deadlines if deadline is not None]
+        return min(deadlines) if deadlines else None
+
+    async def _request_filler_response(self, connection):
+        """Cover a slow tool with a holding phrase, cached audio when available."""
+        try:
+            text = self.phrase_cache.get_phrase("filler")
+            if text and await self._play_cached_phrase(text, connection):
+                logger.info("⏳ Cached filler played while tools run")
+                return
 
+            self.filler_response_done = asyncio.Event()
+            if text:
+                await self._generate_phrase(text, connection)
             else:
-                logger.error(f"Unknown function: {function_name}")
-
-                # Send function error event
-                await self.bridge.send_message(
-                    self.client_id,
-                    {
-                        "type": "tool_call_error",
-                        "function_name": function_name,
-                        "call_id": call_id,
-                        "error": f"Unknown function: {function_name}",
-                        "timestamp": asyncio.get_event_loop().time(),
-                    },
+                await connection.response.create(
+                    response=ResponseCreateParams(instructions=FILLER_INSTRUCTIONS)
                 )
+            logger.info("⏳ Filler response requested while tools run")
+        except Exception as e:
+            self.filler_response_done = None
+            logger.error(f"Error requesting filler response: {e}")
 
+    async def _wait_for_filler_response(self, timeout_s: float = 5.0):
+        """Wait for a pending filler to finish so it is never spoken over."""
+        if self.filler_response_done is None:
+            return
+        try:
+            await asyncio.wait_for(self.filler_response_done.wait(), timeout_s)
         except asyncio.TimeoutError:
-            error_msg = (
-                f"Timeout waiting for function call completion for {function_name}"
-            )
-            logger.error(error_msg)
+            logger.warning("Timeout waiting for filler response to finish")
+        finally:
+            self.filler_response_done = None
 
-            # Send timeout event
-            await self.bridge.send_message(
-                self.client_id,
-                {
-                    "type": "tool_call_error",
-                    "function_name": function_name,
-                    "call_id": call_id,
-                    "error": error_msg,
-                    "timestamp": asyncio.get_event_loop().time(),
-                },
-            )
+    async def _speak_greeting(self, connection):
+        """Greet the caller with the configured greeting phrase, if enabled."""
+        # Off by default: an unprompted greeting changes the caller experience
+        if os.getenv("GREETING_ENABLED", "false").lower() != "true":
+            return
+
+        text = self.phrase_cache.get_phrase("greeting")
+        if not text:
+            return
 
+        try:
+            if not await self._play_cached_phrase(text, connection):
+                await self._generate_phrase(text, connection)
         except Exception as e:
-            error_msg = f"Error executing function {function_name}: {e}"
-            logger.error(error_msg)
+            logger.error(f"Error speaking greeting: {e}")
+
+    async def _play_cached_phrase(self, text: str, connection) -> bool:
+        """
+        Play a phrase from the local audio cache.
+
+        The phrase text is added to the conversation as an assistant message so
+        the model's context matches what the caller heard.
 
-            # Send error event
-            await self.bridge.send_message(
-                self.client_id,
-                {
-                    "type": "tool_call_error",
-                    "function_name": function_name,
-                    "call_id": call_id,
-                    "error": str(e),
-                    "timestamp": asyncio.get_event_loop().time(),
-                },
+        Returns:
+            True if the phrase was served locally, False on a cache miss
+        """
+        audio = await self.phrase_cache.get(text, self.voice)
+        if audio is None:
+            return False
+
+        for offset in range(0, len(audio), AUDIO_CHUNK_SIZE):
+            await self.audio_processor.queue_audio(
+                audio[offset : offset + AUDIO_CHUNK_SIZE]
             )
 
-        finally:
-            self.function_call_in_progress = False
-            self.active_call_id = None
+        await connection.conversation.item.create(
+            item=AssistantMessageItem(content=[OutputTextContentPart(text=text)])
+        )
+        logger.info(f"🔊 Served cached phrase audio: {text}")
+        return True
+
+    async def _generate_phrase(self, text: str, connection):
+        """Ask the model to speak a phrase and capture its audio for the cache."""
+        self.phrase_capture = {"text": text, "audio": bytearray()}
+        await connection.response.create(
+            response=ResponseCreateParams(
+                instructions=PHRASE_INSTRUCTIONS.format(text=text)
+            )
+        )
+
+    async def _handle_audio_transcript_done(self, event):
+        """Store captured phrase audio once the model has spoken it verbatim."""
+        capture = self.phrase_capture
+        if capture is None:
+            return
+
+        self.phrase_capture = None
+        transcript = getattr(event, "transcript", "") or ""
+        if normalize_phrase(transcript) != normalize_phrase(capture["text"]):
+            logger.info(f"Phrase not cached, transcript differs: {transcript}")
+            return
+
+        await self.phrase_cache.put(
+            capture["text"], self.voice, bytes(capture["audio"])
+        )
+
+    def _report_tool_response_metrics(self, event):
+        """Log prompt tokens and time to first audio of a tool-result response."""
+        metrics = self.tool_response_metrics
+        if metrics is None:
+            return
+
+        self.tool_response_metrics = None
+        usage = getattr(getattr(event, "response", None), "usage", None)
+        input_tokens = getattr(usage, "input_tokens", None)
+        first_audio_ms = metrics["first_audio_ms"]
+        logger.info(
+            f"Tool result response: {input_tokens} input tokens, first audio "
+            + (f"after {first_audio_ms:.0f}ms" if first_audio_ms else "not received")
+        )
+
+    def _report_speculative_savings(
+        self, calls: List[Dict[str, Any]], response_done_at: float
+    ):
+        """Log the time speculative execution saved for this tool turn."""
+        if not any(call["task"] for call in calls):
+            return
+        if any(call["completed_at"] is None for call in calls):
+            return
+
+        # Without speculation every call would start at RESPONSE_DONE
+        slowest_duration = max(
+            call["completed_at"] - call["started_at"] for call in calls
+        )
+        baseline_end = response_done_at + slowest_duration
+        actual_end = max(call["completed_at"] for call in calls)
+        saved_ms = max(0.0, (baseline_end - actual_end) * 1000)
+
+        self.speculative_saved_ms_total += saved_ms
+        logger.info(
+            f"Speculative execution saved {saved_ms:.0f}ms this tool turn "
+            f"({self.speculative_saved_ms_total:.0f}ms total for session)"
+        )
+
+    def _start_turn(self):
+        """Open the trace span for the turn that starts when the caller stops."""
+        self._end_turn()
+        self.turn_count += 1
+        set_task_context(turn_id=self.turn_count)
+        self.turn_audio_bytes = 0
+        self.turn_tool_calls = 0
+        self.turn_span = self.tracing.start_span(
+            "voice.turn",
+            {"session.id": self.client_id, "turn.index": self.turn_count},
+        )
+
+    def _end_turn(self, interrupted: bool = False):
+        """Close the open turn span, if any, with what the turn produced."""
+        if self.turn_span is NO_OP_SPAN:
+            return
+        self.turn_span.set_attributes(
+            {
+                "turn.audio_bytes": self.turn_audio_bytes,
+                "turn.tool_calls": self.turn_tool_calls,
+                "turn.interrupted": interrupted,
+            }
+        )
+        self.turn_span.end()
+        self.turn_span = NO_OP_SPAN
+
+    def _get_function_timeout(self, function_name: str) -> float:
+        """Get the configured timeout for a function in seconds."""
+        if self.tool_loader is None:
+            return 10
+        return self.tool_loader.get_tool_timeout(function_name)
+
+    def _is_function_speculative(self, function_name: str) -> bool:
+        """Check if a function may start before its response is done."""
+        if self.tool_loader is None:
+            return False
+        return self.tool_loader.is_tool_speculative(function_name)
+
+    async def _send_function_error(self, function_name: str, call_id: str, error: str):
+        """Send a tool call error event to the frontend."""
+        await self.bridge.send_message(
+            self.client_id,
+            {
+                "type": "tool_call_error",
+                "function_name": function_name,
+                "call_id": call_id,
+                "error": error,
+                "timestamp": asyncio.get_event_loop().time(),
+            },
+        )
 
     async def _wait_for_event(
         self, connection, wanted_types: set, timeout_s: float = 10.0
@@ -548,6 +987,9 @@ class WebSocketVoiceClient:
 
         async def _next():
             async for event in connection:
+                if self.recorder is not None:
+                    self.recorder.record_server_event(event)
+
                 # Keep essential error logging
                 if hasattr(event, "error"):
                     logger.error(f"Event has error: {event.error}")
@@ -569,6 +1011,11 @@ class WebSocketVoiceClient:
             logger.error(f"Error waiting for event: {e}")
             raise
 
+    def record_client_message(self, message: Dict[str, Any]):
+        """Record a frontend message when the session is being recorded."""
+        if self.recorder is not None:
+            self.recorder.record_client_message(message)
+
     async def process_audio_input(self, audio_base64: str):
         """Process audio input from frontend."""
         if self.connection:
@@ -597,6 +1044,14 @@ class WebSocketVoiceClient:
     async def cleanup(self):
         """Clean up resources."""
         self.is_running = False
+        self._end_turn()
+        for task in list(self.function_call_tasks):
+            task.cancel()
+        self._drop_function_calls()
+        self.tool_store.clear()
+        if self.recorder is not None:
+            recorder, self.recorder = self.recorder, None
+            await recorder.close()
         if self.audio_processor:
             await self.audio_processor.cleanup()
         self.connection = None
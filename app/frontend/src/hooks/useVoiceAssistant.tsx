@@ -33,6 +33,8 @@ interface SessionEvent {
   status?: string;
   message?: string;
   error?: string;
+  retryable?: boolean;
+  retry_after_seconds?: number;
   config?: {
     model: string;
     voice: string;
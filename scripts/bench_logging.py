@@ -0,0 +1,112 @@
+"""
+Microbenchmark of logging overhead on the event-loop thread.
+
+Measures the per-call cost seen by the caller for the logging styles used on
+the audio hot path:
+
+    disabled f-string   logger.debug(f"...") below the logger's level
+    disabled lazy       logger.debug("... %s", arg) below the logger's level
+    sync handler        logger.info(...) formatted and written by the caller
+    queue handler       logger.info(...) through the backend logging pipeline
+    filter 1/1000       plain logger on a category sampled 1 in 1000
+    sampled 1/1000      get_sampled_logger() on the same category
+
+The background writer drains the queue between cases so its work is reported
+separately. Output goes to a null device so only logging itself is measured.
+
+Usage:
+    python scripts/bench_logging.py --calls 200000 --json
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+# The backend logging pipeline under test
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "backend"))
+from structured_logging import LoggingPipeline, SampledLogger, TEXT_FORMAT
+
+CLIENT_ID = "client-123"
+CHUNK_BYTES = 4800
+
+
+def _time_per_call(emit, calls: int) -> float:
+    """Get the mean cost of one emit() call in microseconds."""
+    start_time = time.perf_counter()
+    for index in range(calls):
+        emit(index)
+    return (time.perf_counter() - start_time) / calls * 1e6
+
+
+def _lazy(log):
+    return lambda i: log("Audio chunk for %s (%d bytes) #%d", CLIENT_ID, CHUNK_BYTES, i)
+
+
+def run(calls: int, json_format: bool):
+    root = logging.getLogger()
+    logger = logging.getLogger("bench.audio")
+    sampled = logging.getLogger("bench.sampled")
+    results = []
+
+    with open(os.devnull, "w") as null_stream:
+        sync_handler = logging.StreamHandler(null_stream)
+        sync_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        root.handlers = [sync_handler]
+        root.setLevel(logging.INFO)
+
+        cases = [
+            (
+                "disabled f-string",
+                lambda i: logger.debug(
+                    f"Audio chunk for {CLIENT_ID} ({CHUNK_BYTES} bytes) #{i}"
+                ),
+            ),
+            ("disabled lazy", _lazy(logger.debug)),
+            ("sync handler", _lazy(logger.info)),
+        ]
+        for name, emit in cases:
+            results.append((name, _time_per_call(emit, calls)))
+
+        pipeline = LoggingPipeline(
+            json_format=json_format,
+            sample_rates={"bench.sampled": 1000},
+            queue_size=calls + 1,
+            stream=null_stream,
+        )
+        pipeline.start()
+        cases = [
+            ("queue handler", _lazy(logger.info)),
+            ("filter 1/1000", _lazy(sampled.info)),
+            ("sampled 1/1000", _lazy(SampledLogger(sampled, pipeline.sampling).info)),
+        ]
+        drain_seconds = 0.0
+        for name, emit in cases:
+            results.append((name, _time_per_call(emit, calls)))
+            drain_start = time.perf_counter()
+            pipeline.handler.queue.join()
+            drain_seconds += time.perf_counter() - drain_start
+        pipeline.stop()
+        stats = pipeline.get_stats()
+
+    print(f"\n{'style':<20} {'us/call':>8}")
+    for name, micros in results:
+        print(f"{name:<20} {micros:>8.2f}")
+    print(
+        f"\nBackground writer needed {drain_seconds:.2f}s more to drain "
+        f"({stats['dropped']} dropped, "
+        f"{sum(stats['sampled_out'].values())} sampled out)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--calls", type=int, default=100000)
+    parser.add_argument("--json", action="store_true", help="JSON output format")
+    args = parser.parse_args()
+    run(args.calls, args.json)
+
+
+if __name__ == "__main__":
+    main()
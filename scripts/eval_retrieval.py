@@ -0,0 +1,335 @@
+"""
+Retrieval quality-vs-latency evaluation over the Q/A pairs in data/faq.md.
+
+Every FAQ section is one answer; its heading and "**Pergunta:**" lines are
+the questions. A retrieved chunk is relevant when most of its word trigrams
+come from the question's answer section, or it contains most of the answer,
+so any chunking can be judged.
+
+Backends:
+    local  In-process BM25 over locally chunked documents; one configuration
+           per --chunk-tokens x --overlap-tokens x --k combination
+    azure  Azure AI Search, one configuration per retrieval profile of
+           get_product_information in tools_config.yaml and per --k
+    tool   The full get_product_information path (retrieval policy, search,
+           packing); --stand-in serves it from the local engine instead of
+           Azure, so it runs offline (pair with EMBEDDING_BACKEND=fake)
+
+For each configuration the table reports recall@k (questions with an answer
+chunk in the top k), MRR, packed tokens sent to the model and p50/p99 query
+latency.
+
+Usage:
+    python scripts/eval_retrieval.py --backend local --chunk-tokens 200,500
+    python scripts/eval_retrieval.py --backend azure --k 3,5
+    EMBEDDING_BACKEND=fake python scripts/eval_retrieval.py --backend tool --stand-in
+"""
+
+import argparse
+import asyncio
+import copy
+import math
+import os
+import re
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Dict, List, Tuple
+
+from ingest_local import chunk_documents, extract_documents
+
+# Shared backend helpers (packing, retrieval profiles, the tool itself)
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "backend"))
+from tools.context_packing import estimate_tokens, pack_search_results
+
+FAQ_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "faq.md")
+TOOL_NAME = "get_product_information"
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+_PACKED_CHUNK = re.compile(r"^\[(?P<id>[^\]]+)\]: (?P<text>.*?)\n-----$", re.M | re.S)
+
+
+def _words(text: str) -> List[str]:
+    return _WORD.findall(text.lower())
+
+
+def _trigrams(text: str) -> set:
+    words = _words(text)
+    return {tuple(words[i : i + 3]) for i in range(len(words) - 2)}
+
+
+def load_faq(path: str = FAQ_PATH) -> Tuple[List[Tuple[str, int]], List[str]]:
+    """
+    Build the question set from the FAQ.
+
+    Returns:
+        (question, answer section index) pairs, and the answer section texts
+    """
+    with open(path, "r", encoding="utf-8") as opened_file:
+        sections = re.split(r"^## ", opened_file.read(), flags=re.M)[1:]
+
+    questions, answers = [], []
+    for index, section in enumerate(sections):
+        heading, _, body = section.partition("\n")
+        questions.append((heading.strip(), index))
+        for match in re.finditer(r"\*\*Pergunta:\*\*\s*(.+)", body):
+            questions.append((match.group(1).strip(), index))
+        answers.append(section)
+    return questions, answers
+
+
+def is_relevant(chunk: str, answer: str, threshold: float = 0.5) -> bool:
+    """Check if most of a chunk comes from the answer, or it holds most of it."""
+    chunk_trigrams = _trigrams(chunk)
+    if not chunk_trigrams:
+        return bool(chunk.strip()) and chunk.strip().lower() in answer.lower()
+    answer_trigrams = _trigrams(answer)
+    overlap = len(chunk_trigrams & answer_trigrams)
+    return (
+        overlap / len(chunk_trigrams) >= threshold
+        or overlap / len(answer_trigrams) >= threshold
+    )
+
+
+class LocalSearchEngine:
+    """BM25 over locally chunked documents, also usable as a SearchClient stand-in."""
+
+    def __init__(self, data_dir: str, chunk_tokens: int, overlap_tokens: int):
+        self.chunks = list(
+            chunk_documents(extract_documents(data_dir), chunk_tokens, overlap_tokens)
+        )
+        self.term_counts = [Counter(_words(c["chunk"])) for c in self.chunks]
+        self.lengths = [sum(counts.values()) for counts in self.term_counts]
+        self.average_length = sum(self.lengths) / max(1, len(self.lengths))
+        self.document_frequency = Counter(
+            term for counts in self.term_counts for term in counts
+        )
+
+    def _scored(self, query: str, top: int) -> List[Tuple[float, Dict[str, str]]]:
+        n = len(self.chunks)
+        scores = []
+        for index, counts in enumerate(self.term_counts):
+            score = 0.0
+            for term in set(_words(query)):
+                if term not in counts:
+                    continue
+                df = self.document_frequency[term]
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+                tf = counts[term]
+                norm = 1.2 * (0.25 + 0.75 * self.lengths[index] / self.average_length)
+                score += idf * tf * 2.2 / (tf + norm)
+            scores.append((score, index))
+        ranked = sorted(scores, key=lambda pair: pair[0], reverse=True)[:top]
+        return [(score, self.chunks[index]) for score, index in ranked if score > 0]
+
+    def rank(self, query: str, top: int) -> List[Dict[str, str]]:
+        """Get the top chunks for a query by BM25 score."""
+        return [chunk for _, chunk in self._scored(query, top)]
+
+    async def search(self, search_text=None, top=5, **kwargs):
+        """Mimic SearchClient.search so the tool path can run against it."""
+        query = search_text or kwargs.get("semantic_query") or ""
+        semantic = kwargs.get("query_type") == "semantic"
+        results = [
+            dict(chunk, **({"@search.reranker_score": score} if semantic else {}))
+            for score, chunk in self._scored(query, top)
+        ]
+
+        async def iterate():
+            for result in results:
+                yield result
+
+        return iterate()
+
+    async def close(self):
+        pass
+
+
+def score_configuration(
+    name: str,
+    runs: List[Tuple[List[str], int, float, int]],
+    answers: List[str],
+    k: int,
+) -> Dict[str, object]:
+    """
+    Compute metrics for one configuration.
+
+    Args:
+        name: Configuration label
+        runs: (ranked chunk texts, answer index, latency ms, packed tokens)
+        answers: Answer section texts
+        k: Cut-off for recall@k
+    """
+    hits, reciprocal_ranks = 0, []
+    for chunks, answer_index, _, _ in runs:
+        rank = next(
+            (
+                position
+                for position, chunk in enumerate(chunks, start=1)
+                if is_relevant(chunk, answers[answer_index])
+            ),
+            None,
+        )
+        hits += rank is not None and rank <= k
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+
+    latencies = sorted(run[2] for run in runs)
+    return {
+        "configuration": name,
+        "recall@k": hits / len(runs),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "packed_tokens": statistics.mean(run[3] for run in runs),
+        "p50_ms": latencies[int(0.50 * (len(latencies) - 1))],
+        "p99_ms": latencies[int(0.99 * (len(latencies) - 1))],
+    }
+
+
+def _max_result_tokens():
+    from tool_loader import get_tool_loader
+
+    return get_tool_loader().get_tool_config(TOOL_NAME).get("max_result_tokens")
+
+
+def evaluate_local(args, questions, answers) -> List[Dict]:
+    rows = []
+    max_tokens = _max_result_tokens()
+    for chunk_tokens in args.chunk_tokens:
+        for overlap_tokens in args.overlap_tokens:
+            engine = LocalSearchEngine(args.data, chunk_tokens, overlap_tokens)
+            for k in args.k:
+                runs = []
+                for question, answer_index in questions:
+                    start_time = time.perf_counter()
+                    results = engine.rank(question, k)
+                    latency_ms = (time.perf_counter() - start_time) * 1000
+                    packed = pack_search_results(
+                        question,
+                        [(r["chunk_id"], r["chunk"]) for r in results],
+                        max_tokens,
+                    )
+                    runs.append(
+                        (
+                            [r["chunk"] for r in results],
+                            answer_index,
+                            latency_ms,
+                            estimate_tokens(packed),
+                        )
+                    )
+                name = f"local bm25 chunk={chunk_tokens} overlap={overlap_tokens}"
+                rows.append(score_configuration(f"{name} k={k}", runs, answers, k))
+    return rows
+
+
+async def evaluate_azure(args, questions, answers) -> List[Dict]:
+    from tool_loader import get_tool_loader
+    from tools.implementations import _search
+    from tools.search_client import get_search_client_manager
+
+    manager = get_search_client_manager()
+    search_client = await manager.get_client()
+    if search_client is None:
+        raise SystemExit("AZURE_SEARCH_ENDPOINT and AZURE_SEARCH_INDEX must be set")
+
+    policy = get_tool_loader().get_retrieval_policy(TOOL_NAME)
+    max_tokens = _max_result_tokens()
+    rows = []
+    try:
+        for base_profile in policy.profiles:
+            for k in args.k:
+                profile = copy.copy(base_profile)
+                profile.top = k
+                runs = []
+                for question, answer_index in questions:
+                    start_time = time.perf_counter()
+                    chunks, _ = await _search(search_client, question, profile)
+                    latency_ms = (time.perf_counter() - start_time) * 1000
+                    packed = pack_search_results(question, chunks, max_tokens)
+                    runs.append(
+                        (
+                            [text for _, text in chunks],
+                            answer_index,
+                            latency_ms,
+                            estimate_tokens(packed),
+                        )
+                    )
+                name = f"azure {profile.name} k={k}"
+                rows.append(score_configuration(name, runs, answers, k))
+    finally:
+        await manager.close()
+    return rows
+
+
+async def evaluate_tool(args, questions, answers) -> List[Dict]:
+    from tools.implementations import get_product_information
+    from tools.search_client import get_search_client_manager
+
+    manager = get_search_client_manager()
+    if args.stand_in:
+        manager.client = LocalSearchEngine(
+            args.data, args.chunk_tokens[0], args.overlap_tokens[0]
+        )
+
+    runs = []
+    try:
+        for question, answer_index in questions:
+            start_time = time.perf_counter()
+            result = await get_product_information({"query": question})
+            latency_ms = (time.perf_counter() - start_time) * 1000
+            chunks = [m.group("text") for m in _PACKED_CHUNK.finditer(result)]
+            runs.append((chunks, answer_index, latency_ms, estimate_tokens(result)))
+    finally:
+        await manager.close()
+
+    source = "local stand-in" if args.stand_in else "azure"
+    k = max(len(run[0]) for run in runs) or 1
+    return [score_configuration(f"tool path ({source})", runs, answers, k)]
+
+
+def print_table(rows: List[Dict]):
+    width = max(len("configuration"), *(len(row["configuration"]) for row in rows))
+    print(
+        f"\n{'configuration':<{width}}  recall@k    MRR  tokens   p50 ms   p99 ms"
+    )
+    for row in rows:
+        print(
+            f"{row['configuration']:<{width}}  {row['recall@k']:>8.2f} "
+            f"{row['mrr']:>6.2f} {row['packed_tokens']:>7.0f} "
+            f"{row['p50_ms']:>8.1f} {row['p99_ms']:>8.1f}"
+        )
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(part) for part in value.split(",")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--backend", choices=["local", "azure", "tool"], default="local"
+    )
+    parser.add_argument("--data", default="data", help="folder with documents")
+    parser.add_argument("--chunk-tokens", type=_int_list, default=[500])
+    parser.add_argument("--overlap-tokens", type=_int_list, default=[100])
+    parser.add_argument("--k", type=_int_list, default=[5])
+    parser.add_argument(
+        "--stand-in",
+        action="store_true",
+        help="serve the tool path from the local engine instead of Azure",
+    )
+    args = parser.parse_args()
+
+    questions, answers = load_faq()
+    print(f"{len(questions)} questions over {len(answers)} FAQ answers")
+
+    if args.backend == "local":
+        rows = evaluate_local(args, questions, answers)
+    elif args.backend == "azure":
+        rows = asyncio.run(evaluate_azure(args, questions, answers))
+    else:
+        rows = asyncio.run(evaluate_tool(args, questions, answers))
+    print_table(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Search index definitions for setup_intvect.py, built from index_profiles.yaml.
+
+Building a definition needs no Azure access, so this script doubles as an
+offline generator that writes each profile's index definition as JSON.
+tests/test_index_definition.py checks the definitions.
+
+Usage:
+    python scripts/index_definition.py --output index_definitions
+    python scripts/index_definition.py --profile scalar
+"""
+
+import argparse
+import json
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import yaml
+from azure.search.documents.indexes.models import (
+    AzureOpenAIVectorizer,
+    AzureOpenAIVectorizerParameters,
+    BinaryQuantizationCompression,
+    HnswAlgorithmConfiguration,
+    HnswParameters,
+    RescoringOptions,
+    ScalarQuantizationCompression,
+    ScalarQuantizationParameters,
+    SearchableField,
+    SearchField,
+    SearchFieldDataType,
+    SearchIndex,
+    SemanticConfiguration,
+    SemanticField,
+    SemanticPrioritizedFields,
+    SemanticSearch,
+    SimpleField,
+    VectorSearch,
+    VectorSearchAlgorithmMetric,
+    VectorSearchProfile,
+)
+
+PROFILES_FILE = os.path.join(os.path.dirname(__file__), "index_profiles.yaml")
+
+COMPRESSION_KINDS = {
+    "scalar": "scalarQuantization",
+    "binary": "binaryQuantization",
+}
+
+
+def load_index_profiles(path: str = PROFILES_FILE) -> Tuple[Dict[str, Any], str]:
+    """
+    Load vector index profiles.
+
+    Returns:
+        Profiles by name, and the name of the default profile
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        config = yaml.safe_load(file)
+    return config["profiles"], config.get("default_profile", "full")
+
+
+def get_index_profile(name: Optional[str] = None) -> Dict[str, Any]:
+    """Get a profile by name, or the default profile."""
+    profiles, default_profile = load_index_profiles()
+    name = name or default_profile
+    if name not in profiles:
+        raise ValueError(f"Unknown index profile '{name}', use one of {list(profiles)}")
+    return {"name": name, **profiles[name]}
+
+
+def _build_compression(compression: Dict[str, Any]):
+    kind = compression["kind"]
+    if kind not in COMPRESSION_KINDS:
+        raise ValueError(f"Unknown compression kind '{kind}'")
+
+    options = {
+        "compression_name": f"{kind}_compression",
+        "truncation_dimension": compression.get("truncation_dimension"),
+        "rescoring_options": RescoringOptions(
+            enable_rescoring=compression.get("rescoring", True),
+            default_oversampling=compression.get("default_oversampling"),
+            rescore_storage_method=compression.get("rescore_storage_method"),
+        ),
+    }
+    if kind == "scalar":
+        return ScalarQuantizationCompression(
+            parameters=ScalarQuantizationParameters(quantized_data_type="int8"),
+            **options,
+        )
+    return BinaryQuantizationCompression(**options)
+
+
+def build_index(
+    index_name: str,
+    azure_openai_embedding_endpoint: str,
+    azure_openai_embedding_deployment: str,
+    azure_openai_embedding_model: str,
+    profile: Dict[str, Any],
+) -> SearchIndex:
+    """Build the search index definition for a vector index profile."""
+    hnsw = profile.get("hnsw", {})
+    compression = profile.get("compression")
+    compressions = [_build_compression(compression)] if compression else []
+
+    return SearchIndex(
+        name=index_name,
+        fields=[
+            SearchableField(
+                name="chunk_id",
+                key=True,
+                analyzer_name="keyword",
+                sortable=True,
+            ),
+            SimpleField(
+                name="parent_id",
+                type=SearchFieldDataType.String,
+                filterable=True,
+            ),
+            SearchableField(name="title"),
+            SearchableField(name="chunk"),
+            SearchField(
+                name="text_vector",
+                type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
+                vector_search_dimensions=profile["dimensions"],
+                vector_search_profile_name="vp",
+                stored=True,
+                hidden=False,
+            ),
+        ],
+        vector_search=VectorSearch(
+            algorithms=[
+                HnswAlgorithmConfiguration(
+                    name="algo",
+                    parameters=HnswParameters(
+                        m=hnsw.get("m", 4),
+                        ef_construction=hnsw.get("ef_construction", 400),
+                        ef_search=hnsw.get("ef_search", 500),
+                        metric=VectorSearchAlgorithmMetric.COSINE,
+                    ),
+                )
+            ],
+            compressions=compressions,
+            vectorizers=[
+                AzureOpenAIVectorizer(
+                    vectorizer_name="openai_vectorizer",
+                    parameters=AzureOpenAIVectorizerParameters(
+                        resource_url=azure_openai_embedding_endpoint,
+                        deployment_name=azure_openai_embedding_deployment,
+                        model_name=azure_openai_embedding_model,
+                    ),
+                )
+            ],
+            profiles=[
+                VectorSearchProfile(
+                    name="vp",
+                    algorithm_configuration_name="algo",
+                    vectorizer_name="openai_vectorizer",
+                    compression_name=(
+                        compressions[0].compression_name if compressions else None
+                    ),
+                )
+            ],
+        ),
+        semantic_search=SemanticSearch(
+            configurations=[
+                SemanticConfiguration(
+                    name="default",
+                    prioritized_fields=SemanticPrioritizedFields(
+                        title_field=SemanticField(field_name="title"),
+                        content_fields=[SemanticField(field_name="chunk")],
+                    ),
+                )
+            ],
+            default_configuration_name="default",
+        ),
+    )
+
+
+def index_to_dict(index: SearchIndex) -> Dict[str, Any]:
+    """Serialize an index definition to its REST API JSON form."""
+    return index._to_generated().serialize()  # pylint: disable=protected-access
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--profile", help="only generate this profile")
+    parser.add_argument("--output", help="directory for <profile>.json files")
+    parser.add_argument("--index-name", default="voicerag-intvect")
+    args = parser.parse_args()
+
+    profiles, _ = load_index_profiles()
+    names = [args.profile] if args.profile else list(profiles)
+
+    # Placeholders keep the generator usable without any Azure environment
+    endpoint = os.environ.get(
+        "AZURE_OPENAI_ENDPOINT", "https://example.openai.azure.com"
+    )
+    deployment = os.environ.get("AZURE_OPENAI_EMBEDDING_NAME", "text-embedding-3-large")
+
+    for name in names:
+        profile = get_index_profile(name)
+        definition = index_to_dict(
+            build_index(args.index_name, endpoint, deployment, deployment, profile)
+        )
+        print(f"{name}: {profile.get('description', '')}")
+
+        if args.output:
+            os.makedirs(args.output, exist_ok=True)
+            with open(os.path.join(args.output, f"{name}.json"), "w") as file:
+                json.dump(definition, file, indent=2)
+        elif args.profile:
+            print(json.dumps(definition, indent=2))
+
+
+if __name__ == "__main__":
+    main()
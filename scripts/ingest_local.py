@@ -0,0 +1,407 @@
+"""
+Local push-mode ingestion of data/*.md and data/*.pdf into Azure AI Search.
+
+Replaces the remote indexer, SplitSkill and embedding skill with a streaming
+pipeline run on this machine:
+
+    extract -> chunk -> embed (batched, concurrent, retried) -> index
+
+Every stage is a generator, so memory stays flat however large the corpus
+is, and each stage reports its throughput at the end. Documents are pushed
+with merge_or_upload, so re-running the pipeline updates chunks in place;
+chunks a shrunken document no longer produces are deleted afterwards.
+
+PDF extraction needs `pip install pypdf`; token counts use tiktoken when it
+is installed and a character estimate otherwise.
+
+Usage:
+    python scripts/ingest_local.py
+    python scripts/ingest_local.py --dry-run --batch-size 32 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import hashlib
+import importlib.util
+import logging
+import os
+import random
+import sys
+import time
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Set, Tuple
+
+from dotenv import load_dotenv
+
+from index_definition import get_index_profile
+
+# Shared backend helpers (embedding client, token estimate, sentence splitting)
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "backend"))
+from token_cache import AsyncRefreshAheadCredential
+from tools.context_packing import estimate_tokens, split_sentences
+from tools.embeddings import AzureOpenAIEmbeddingBackend, FakeEmbeddingBackend
+
+load_dotenv(override=True)
+
+logger = logging.getLogger("voicerag")
+
+SUPPORTED_EXTENSIONS = (".md", ".pdf")
+
+
+class StageMeter:
+    """Counts items and busy time for one pipeline stage."""
+
+    def __init__(self, name: str, unit: str):
+        self.name = name
+        self.unit = unit
+        self.items = 0
+        self.busy_seconds = 0.0
+        self._active = 0
+        self._busy_since = 0.0
+
+    def start(self):
+        # Overlapping concurrent work counts once towards busy time
+        if self._active == 0:
+            self._busy_since = time.perf_counter()
+        self._active += 1
+
+    def stop(self, items: int):
+        self._active -= 1
+        self.items += items
+        if self._active == 0:
+            self.busy_seconds += time.perf_counter() - self._busy_since
+
+    def report(self, wall_seconds: float) -> str:
+        rate = self.items / self.busy_seconds if self.busy_seconds else 0.0
+        return (
+            f"{self.name:<8} {self.items:>7} {self.unit:<9} "
+            f"busy {self.busy_seconds:6.2f}s  {rate:9.1f} {self.unit}/s "
+            f"({self.busy_seconds / wall_seconds:.0%} of wall time)"
+        )
+
+
+def _timed(items: Iterator, meter: StageMeter, weight=lambda item: 1) -> Iterator:
+    """Yield from a generator, charging the time spent producing items to meter."""
+    while True:
+        meter.start()
+        try:
+            item = next(items)
+        except StopIteration:
+            meter.stop(0)
+            return
+        meter.stop(weight(item))
+        yield item
+
+
+def _count_tokens():
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        return estimate_tokens
+
+
+def extract_blocks(path: str) -> Iterator[str]:
+    """Yield a document's text block by block (markdown paragraphs, PDF pages)."""
+    if path.endswith(".pdf"):
+        from pypdf import PdfReader
+
+        for page in PdfReader(path).pages:
+            text = page.extract_text() or ""
+            if text.strip():
+                yield text
+        return
+
+    paragraph: List[str] = []
+    with open(path, "r", encoding="utf-8") as opened_file:
+        for line in opened_file:
+            if line.strip():
+                paragraph.append(line.rstrip())
+            elif paragraph:
+                yield "\n".join(paragraph)
+                paragraph = []
+    if paragraph:
+        yield "\n".join(paragraph)
+
+
+def extract_documents(data_dir: str) -> Iterator[Tuple[str, Iterator[str]]]:
+    """Yield (file name, block generator) for every supported file in data_dir."""
+    for entry in sorted(os.scandir(data_dir), key=lambda entry: entry.name):
+        if not entry.is_file() or not entry.name.endswith(SUPPORTED_EXTENSIONS):
+            continue
+        if entry.name.endswith(".pdf") and importlib.util.find_spec("pypdf") is None:
+            logger.warning("pypdf not installed, skipping %s", entry.name)
+            continue
+        yield entry.name, extract_blocks(entry.path)
+
+
+def chunk_documents(
+    documents: Iterable[Tuple[str, Iterator[str]]],
+    max_tokens: int,
+    overlap_tokens: int,
+) -> Iterator[Dict[str, str]]:
+    """
+    Split documents into token-bounded chunks on sentence boundaries.
+
+    Args:
+        documents: (file name, block generator) pairs
+        max_tokens: Maximum tokens per chunk
+        overlap_tokens: Tokens of trailing sentences repeated in the next chunk
+
+    Yields:
+        Index documents without vectors
+    """
+    count_tokens = _count_tokens()
+
+    for title, blocks in documents:
+        parent_id = hashlib.sha256(title.encode("utf-8")).hexdigest()[:32]
+        sentences: List[Tuple[str, int]] = []
+        size = 0
+        index = 0
+
+        def make_chunk():
+            return {
+                "chunk_id": f"{parent_id}_local_{index}",
+                "parent_id": parent_id,
+                "title": title,
+                "chunk": " ".join(sentence for sentence, _ in sentences),
+            }
+
+        for block in blocks:
+            for sentence in split_sentences(block):
+                tokens = count_tokens(sentence)
+                if sentences and size + tokens > max_tokens:
+                    yield make_chunk()
+                    index += 1
+                    # Carry trailing sentences over so context spans the cut,
+                    # never more than the overlap or what leaves room for this one
+                    carried: List[Tuple[str, int]] = []
+                    carried_tokens = 0
+                    while sentences and (
+                        carried_tokens + sentences[-1][1]
+                        <= min(overlap_tokens, max_tokens - tokens)
+                    ):
+                        carried.insert(0, sentences.pop())
+                        carried_tokens += carried[0][1]
+                    sentences = carried
+                    size = carried_tokens
+                sentences.append((sentence, tokens))
+                size += tokens
+        if sentences:
+            yield make_chunk()
+
+
+def batched(items: Iterable, size: int) -> Iterator[List]:
+    """Group items into lists of at most size items."""
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def embed_batches(
+    batches: Iterator[List[Dict[str, str]]],
+    backend,
+    dimensions: int,
+    concurrency: int,
+    max_retries: int,
+    meter: StageMeter,
+) -> AsyncIterator[List[Dict]]:
+    """
+    Embed chunk batches with at most `concurrency` requests in flight.
+
+    Batches are yielded in input order; only `concurrency` batches are held
+    in memory at a time. Failed requests are retried with exponential backoff.
+    """
+
+    async def embed(batch):
+        texts = [chunk["chunk"] for chunk in batch]
+        for attempt in range(max_retries + 1):
+            meter.start()
+            try:
+                vectors = await backend.embed(texts, dimensions)
+                meter.stop(len(batch))
+                break
+            except Exception as e:
+                meter.stop(0)
+                if attempt == max_retries:
+                    raise
+                delay = min(30.0, 2**attempt) * (0.5 + random.random())
+                logger.warning("Embedding failed (%s), retrying in %.1fs", e, delay)
+                await asyncio.sleep(delay)
+        return [
+            dict(chunk, text_vector=vector) for chunk, vector in zip(batch, vectors)
+        ]
+
+    in_flight: List[asyncio.Task] = []
+    for batch in batches:
+        in_flight.append(asyncio.create_task(embed(batch)))
+        if len(in_flight) >= concurrency:
+            yield await in_flight.pop(0)
+    for task in in_flight:
+        yield await task
+
+
+async def index_documents(
+    embedded: AsyncIterator[List[Dict]],
+    search_client,
+    batch_size: int,
+    meter: StageMeter,
+    emitted: Dict[str, Set[str]],
+) -> int:
+    """
+    Push embedded chunks to the index with merge_or_upload in large batches.
+
+    Args:
+        emitted: Filled with the chunk IDs pushed for each parent document
+
+    Returns:
+        Number of documents that failed to index
+    """
+    pending: List[Dict] = []
+    failed = 0
+
+    async def flush():
+        nonlocal failed
+        meter.start()
+        if search_client is not None:
+            results = await search_client.merge_or_upload_documents(documents=pending)
+            failed += sum(1 for result in results if not result.succeeded)
+        meter.stop(len(pending))
+        pending.clear()
+
+    async for batch in embedded:
+        for chunk in batch:
+            emitted.setdefault(chunk["parent_id"], set()).add(chunk["chunk_id"])
+        pending.extend(batch)
+        if len(pending) >= batch_size:
+            await flush()
+    if pending:
+        await flush()
+    return failed
+
+
+async def delete_stale_chunks(search_client, emitted: Dict[str, Set[str]]) -> int:
+    """
+    Delete indexed chunks of the given documents that were not pushed again.
+
+    A document that shrank produces fewer chunks than before, and merge_or_upload
+    leaves its old trailing chunks behind.
+
+    Returns:
+        Number of chunks deleted
+    """
+    stale: List[Dict[str, str]] = []
+    for parent_id, chunk_ids in emitted.items():
+        results = await search_client.search(
+            search_text="*",
+            filter=f"parent_id eq '{parent_id}'",
+            select=["chunk_id"],
+        )
+        async for result in results:
+            if result["chunk_id"] not in chunk_ids:
+                stale.append({"chunk_id": result["chunk_id"]})
+    if stale:
+        await search_client.delete_documents(documents=stale)
+    return len(stale)
+
+
+async def run_pipeline(args) -> Dict[str, StageMeter]:
+    profile = get_index_profile(os.environ.get("AZURE_SEARCH_INDEX_PROFILE"))
+    meters = {
+        "extract": StageMeter("extract", "blocks"),
+        "chunk": StageMeter("chunk", "chunks"),
+        "embed": StageMeter("embed", "chunks"),
+        "index": StageMeter("index", "documents"),
+    }
+
+    search_client, credential = None, None
+    if args.dry_run:
+        backend = FakeEmbeddingBackend()
+    else:
+        from azure.identity.aio import DefaultAzureCredential
+        from azure.search.documents.aio import SearchClient
+
+        credential = AsyncRefreshAheadCredential(DefaultAzureCredential())
+        backend = AzureOpenAIEmbeddingBackend(
+            os.environ["AZURE_OPENAI_ENDPOINT"],
+            os.environ["AZURE_OPENAI_EMBEDDING_NAME"],
+        )
+        search_client = SearchClient(
+            os.environ["AZURE_SEARCH_ENDPOINT"],
+            os.environ["AZURE_SEARCH_INDEX"],
+            credential,
+        )
+
+    documents = (
+        (title, _timed(blocks, meters["extract"]))
+        for title, blocks in extract_documents(args.data)
+    )
+    chunks = _timed(
+        chunk_documents(documents, args.max_tokens, args.overlap_tokens),
+        meters["chunk"],
+    )
+    embedded = embed_batches(
+        batched(chunks, args.batch_size),
+        backend,
+        profile["dimensions"],
+        args.concurrency,
+        args.max_retries,
+        meters["embed"],
+    )
+
+    try:
+        emitted: Dict[str, Set[str]] = {}
+        failed = await index_documents(
+            embedded, search_client, args.index_batch_size, meters["index"], emitted
+        )
+        if failed:
+            logger.error("%d documents failed to index", failed)
+        if search_client is not None:
+            deleted = await delete_stale_chunks(search_client, emitted)
+            logger.info("Deleted %d stale chunks", deleted)
+        # Chunking pulls blocks from extraction, so its time includes extract's
+        meters["chunk"].busy_seconds -= meters["extract"].busy_seconds
+    finally:
+        await backend.close()
+        if search_client is not None:
+            await search_client.close()
+        if credential is not None:
+            await credential.close()
+    return meters
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--data", default="data", help="folder with documents")
+    parser.add_argument("--max-tokens", type=int, default=500)
+    parser.add_argument("--overlap-tokens", type=int, default=100)
+    parser.add_argument("--batch-size", type=int, default=16, help="texts/request")
+    parser.add_argument("--concurrency", type=int, default=4, help="requests")
+    parser.add_argument("--max-retries", type=int, default=5)
+    parser.add_argument("--index-batch-size", type=int, default=500)
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="use deterministic fake embeddings and skip indexing",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    start_time = time.perf_counter()
+    meters = asyncio.run(run_pipeline(args))
+    wall_seconds = time.perf_counter() - start_time
+
+    print(f"\nIngestion finished in {wall_seconds:.2f}s")
+    for meter in meters.values():
+        print(meter.report(wall_seconds))
+
+
+if __name__ == "__main__":
+    main()
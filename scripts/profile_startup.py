@@ -0,0 +1,121 @@
+"""
+Cold-start profiler and regression benchmark for the backend.
+
+Reports the slowest imports of `app` (python -X importtime) and the time from
+process launch to the first 200 from /health. With --max-seconds it exits
+non-zero when the median time to healthy regresses past the budget.
+
+Usage:
+    python scripts/profile_startup.py --runs 5 --max-seconds 3
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.join(os.path.dirname(__file__), "..", "app", "backend")
+
+
+def importtime_report(top: int):
+    """Print the modules with the highest cumulative import time."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+    )
+
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:") :].split("|")
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # Header line
+        rows.append((cumulative_us, self_us, parts[2].rstrip()))
+
+    total_us = next((row[0] for row in rows if row[2].strip() == "app"), 0)
+    print(f"\nImport of app: {total_us / 1000:.0f}ms")
+    print(f"{'cumulative':>12} {'self':>10}  module")
+    for cumulative_us, self_us, name in sorted(rows, reverse=True)[:top]:
+        print(f"{cumulative_us / 1000:>10.1f}ms {self_us / 1000:>8.1f}ms {name}")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def time_to_healthy(timeout_s: float) -> float:
+    """Launch the server and measure seconds until /health first answers 200."""
+    port = _free_port()
+    start_time = time.perf_counter()
+    server = subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "app:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=BACKEND_DIR,
+    )
+    try:
+        while time.perf_counter() - start_time < timeout_s:
+            try:
+                url = f"http://127.0.0.1:{port}/health"
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start_time
+            except OSError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError("Server exited before becoming healthy")
+            time.sleep(0.02)
+        raise TimeoutError(f"/health not ready after {timeout_s}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to time")
+    parser.add_argument("--top", type=int, default=15, help="imports to list")
+    parser.add_argument(
+        "--max-seconds",
+        type=float,
+        help="fail when the median time to healthy exceeds this budget",
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    args = parser.parse_args()
+
+    importtime_report(args.top)
+
+    timings = [time_to_healthy(args.timeout) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(
+        f"\nTime to first /health 200 over {args.runs} run(s): "
+        f"median {median:.2f}s, min {min(timings):.2f}s, max {max(timings):.2f}s"
+    )
+
+    if args.max_seconds is not None and median > args.max_seconds:
+        print(f"❌ Cold start regression: {median:.2f}s > {args.max_seconds:.2f}s")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
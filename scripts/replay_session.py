@@ -0,0 +1,254 @@
+"""
+Deterministic replay of a recorded voice session.
+
+Feeds the upstream VoiceLive events of a recording (SESSION_RECORDING_DIR)
+into WebSocketVoiceClient through a fake connection, and plays the recorded
+frontend messages back at their original offsets. With --speed 1 the session
+runs in real time; with --speed 0 it runs as fast as the client consumes
+events, for reproducible performance runs shaped by production traffic.
+
+Tools run for real; --stand-in serves product search from the local BM25
+engine of eval_retrieval.py so a replay runs offline (pair with
+EMBEDDING_BACKEND=fake).
+
+Usage:
+    python scripts/replay_session.py recordings/client-20260101T120000.vlrec
+    EMBEDDING_BACKEND=fake python scripts/replay_session.py rec.vlrec --speed 0 \
+        --stand-in
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, List
+
+# The voice client under test
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "backend"))
+from session_recorder import (
+    KIND_CLIENT_MESSAGE,
+    KIND_SERVER_EVENT,
+    KIND_SESSION,
+    read_recording,
+    restore_payload,
+)
+
+
+class _FakeEndpoint:
+    """Accepts any VoiceLive resource call (session.update, response.create...)."""
+
+    def __init__(self, connection: "FakeConnection", path: str):
+        self._connection = connection
+        self._path = path
+
+    def __getattr__(self, name: str) -> "_FakeEndpoint":
+        return _FakeEndpoint(self._connection, f"{self._path}.{name}")
+
+    async def __call__(self, *args, **kwargs):
+        self._connection.calls[self._path] += 1
+
+
+class FakeConnection:
+    """Stands in for a VoiceLive connection, serving events fed by the driver."""
+
+    def __init__(self):
+        # One slot, so the driver cannot run ahead of the client
+        self._events: asyncio.Queue = asyncio.Queue(maxsize=1)
+        self.calls: Counter = Counter()
+
+    def __getattr__(self, name: str) -> _FakeEndpoint:
+        return _FakeEndpoint(self, name)
+
+    async def feed(self, event, consumer: asyncio.Task) -> bool:
+        """Hand an event to the client; False if the client stopped instead."""
+        put = asyncio.ensure_future(self._events.put(event))
+        await asyncio.wait({put, consumer}, return_when=asyncio.FIRST_COMPLETED)
+        if put.done():
+            return True
+        put.cancel()
+        return False
+
+    async def close(self):
+        await self._events.put(None)
+
+    async def __aiter__(self):
+        while True:
+            event = await self._events.get()
+            if event is None:
+                # Let later iterations see the end of the stream as well
+                self._events.put_nowait(None)
+                return
+            yield event
+
+    def factory(self, **kwargs):
+        """Replacement for azure.ai.voicelive.aio.connect."""
+        connection = self
+
+        class _Connect:
+            async def __aenter__(self):
+                return connection
+
+            async def __aexit__(self, *exc_info):
+                return False
+
+        return _Connect()
+
+
+class NullBridge:
+    """Counts the messages the client would send to the frontend."""
+
+    def __init__(self):
+        self.messages: Counter = Counter()
+
+    async def send_message(self, client_id: str, message: Dict[str, Any]):
+        self.messages[message.get("type")] += 1
+
+
+async def apply_client_message(voice_client, payload: Dict[str, Any]) -> bool:
+    """Replay one frontend message; returns False when the session stops."""
+    message_type = payload.get("type")
+    if message_type == "audio_chunk":
+        await voice_client.process_audio_input(payload.get("data"))
+    elif message_type == "send_audio":
+        await voice_client.process_audio_input(payload.get("audio"))
+    elif message_type == "interrupt":
+        await voice_client.interrupt_response()
+    elif message_type == "stop_session":
+        return False
+    return True
+
+
+async def replay(path: str, speed: float) -> Dict[str, Any]:
+    from azure.ai.voicelive.models import ServerEvent
+    from web_handler import WebSocketVoiceClient
+
+    records = list(read_recording(path))
+    session = next((meta for kind, _, meta, _ in records if kind == KIND_SESSION), {})
+
+    connection = FakeConnection()
+    bridge = NullBridge()
+    audio = {"bytes": 0, "chunks": 0}
+
+    async def websocket_callback(data: bytes):
+        audio["bytes"] += len(data)
+        audio["chunks"] += 1
+
+    voice_client = WebSocketVoiceClient(
+        client_id=f"replay-{session.get('client_id', 'session')}",
+        endpoint="replay",
+        credential=None,
+        bridge=bridge,
+        model=session.get("model", "gpt-4o-realtime"),
+        voice=session.get("voice", "pt-BR-FranciscaNeural"),
+        websocket_callback=websocket_callback,
+        connection_factory=connection.factory,
+    )
+
+    # Time every event the client handles
+    handle_ms: List[float] = []
+    handle_event = voice_client._handle_event
+
+    async def timed_handle_event(event, event_connection):
+        start_time = time.perf_counter()
+        await handle_event(event, event_connection)
+        handle_ms.append((time.perf_counter() - start_time) * 1000)
+
+    voice_client._handle_event = timed_handle_event
+
+    start_time = time.perf_counter()
+    client_task = asyncio.create_task(voice_client.run())
+    loop = asyncio.get_running_loop()
+    replay_start = loop.time()
+    server_events = client_messages = 0
+
+    for kind, offset, meta, raw in records:
+        if speed > 0:
+            delay = replay_start + offset / speed - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        if kind == KIND_SERVER_EVENT:
+            event = ServerEvent.deserialize(restore_payload(meta, raw))
+            if not await connection.feed(event, client_task):
+                break
+            server_events += 1
+        elif kind == KIND_CLIENT_MESSAGE:
+            client_messages += 1
+            if not await apply_client_message(
+                voice_client, restore_payload(meta, raw)
+            ):
+                break
+
+    # Let tool calls started by the last events finish before the session ends
+    await asyncio.gather(*voice_client.function_call_tasks, return_exceptions=True)
+    if not client_task.done():
+        await connection.close()
+    await client_task
+    wall_seconds = time.perf_counter() - start_time
+
+    recorded_seconds = records[-1][1] if records else 0.0
+    handle_ms = sorted(handle_ms) or [0.0]
+    return {
+        "recording": path,
+        "recorded_seconds": recorded_seconds,
+        "wall_seconds": wall_seconds,
+        "server_events": server_events,
+        "client_messages": client_messages,
+        "events_per_second": server_events / wall_seconds if wall_seconds else 0.0,
+        "handle_p50_ms": statistics.median(handle_ms),
+        "handle_p99_ms": handle_ms[int(0.99 * (len(handle_ms) - 1))],
+        "audio_bytes_to_frontend": audio["bytes"],
+        "frontend_messages": dict(bridge.messages),
+        "voicelive_calls": dict(connection.calls),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("recording", help="session recording (.vlrec)")
+    parser.add_argument(
+        "--speed",
+        type=float,
+        default=1.0,
+        help="playback speed; 0 replays as fast as possible",
+    )
+    parser.add_argument(
+        "--stand-in",
+        action="store_true",
+        help="serve product search from the local engine instead of Azure",
+    )
+    parser.add_argument("--data", default="data", help="folder for --stand-in")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(message)s")
+    # A replay must never record itself
+    os.environ.pop("SESSION_RECORDING_DIR", None)
+
+    if args.stand_in:
+        from eval_retrieval import LocalSearchEngine
+        from tools.search_client import get_search_client_manager
+
+        engine = LocalSearchEngine(args.data, 500, 100)
+        get_search_client_manager().client = engine
+
+    report = asyncio.run(replay(args.recording, args.speed))
+    print(
+        f"\nReplayed {report['server_events']} events and "
+        f"{report['client_messages']} frontend messages in "
+        f"{report['wall_seconds']:.2f}s (recorded {report['recorded_seconds']:.2f}s)"
+    )
+    print(f"Events/s:           {report['events_per_second']:.0f}")
+    print(
+        f"Event handling:     p50 {report['handle_p50_ms']:.2f}ms, "
+        f"p99 {report['handle_p99_ms']:.2f}ms"
+    )
+    print(f"Audio to frontend:  {report['audio_bytes_to_frontend']} bytes")
+    print(f"Frontend messages:  {report['frontend_messages']}")
+    print(f"VoiceLive calls:    {report['voicelive_calls']}")
+
+
+if __name__ == "__main__":
+    main()
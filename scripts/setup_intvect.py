@@ -1,25 +1,21 @@
+import asyncio
+import hashlib
 import json
 import logging
 import os
 import subprocess
+import sys
+import time
 
 from azure.core.exceptions import ResourceExistsError
 from azure.identity import DefaultAzureCredential
 from azure.search.documents.indexes import SearchIndexClient, SearchIndexerClient
 from azure.search.documents.indexes.models import (
     AzureOpenAIEmbeddingSkill,
-    AzureOpenAIVectorizerParameters,
-    AzureOpenAIVectorizer,
     FieldMapping,
-    HnswAlgorithmConfiguration,
-    HnswParameters,
     IndexProjectionMode,
     InputFieldMappingEntry,
     OutputFieldMappingEntry,
-    SearchableField,
-    SearchField,
-    SearchFieldDataType,
-    SearchIndex,
     SearchIndexer,
     SearchIndexerDataContainer,
     SearchIndexerDataSourceConnection,
@@ -28,22 +24,26 @@ from azure.search.documents.indexes.models import (
     SearchIndexerIndexProjectionSelector,
     SearchIndexerIndexProjectionsParameters,
     SearchIndexerSkillset,
-    SemanticConfiguration,
-    SemanticField,
-    SemanticPrioritizedFields,
-    SemanticSearch,
-    SimpleField,
     SplitSkill,
-    VectorSearch,
-    VectorSearchAlgorithmMetric,
-    VectorSearchProfile,
 )
-from azure.storage.blob import BlobServiceClient
 from dotenv import load_dotenv
 from rich.logging import RichHandler
 
+from index_definition import build_index, get_index_profile
+
+# Shared backend helpers (refresh-ahead token cache)
+sys.path.append(os.path.join(os.path.dirname(__file__), "..", "app", "backend"))
+from token_cache import AsyncRefreshAheadCredential, RefreshAheadCredential
+
 load_dotenv(override=True)
 
+logger = logging.getLogger("voicerag")
+
+# Blob metadata key holding the SHA-256 of the uploaded file content
+CONTENT_HASH_METADATA = "content_sha256"
+# Parallel block uploads per large file
+BLOCK_UPLOAD_CONCURRENCY = 4
+
 
 def setup_index(
     azure_credential,
@@ -54,7 +54,7 @@ def setup_index(
     azure_openai_embedding_endpoint,
     azure_openai_embedding_deployment,
     azure_openai_embedding_model,
-    azure_openai_embeddings_dimensions,
+    index_profile,
 ):
     index_client = SearchIndexClient(azure_search_endpoint, azure_credential)
     indexer_client = SearchIndexerClient(azure_search_endpoint, azure_credential)
@@ -79,72 +79,14 @@ def setup_index(
     if index_name in index_names:
         logger.info(f"Index {index_name} already exists, not re-creating")
     else:
-        logger.info(f"Creating index: {index_name}")
+        logger.info(f"Creating index: {index_name} ({index_profile['name']} profile)")
         index_client.create_index(
-            SearchIndex(
-                name=index_name,
-                fields=[
-                    SearchableField(
-                        name="chunk_id",
-                        key=True,
-                        analyzer_name="keyword",
-                        sortable=True,
-                    ),
-                    SimpleField(
-                        name="parent_id",
-                        type=SearchFieldDataType.String,
-                        filterable=True,
-                    ),
-                    SearchableField(name="title"),
-                    SearchableField(name="chunk"),
-                    SearchField(
-                        name="text_vector",
-                        type=SearchFieldDataType.Collection(SearchFieldDataType.Single),
-                        vector_search_dimensions=EMBEDDINGS_DIMENSIONS,
-                        vector_search_profile_name="vp",
-                        stored=True,
-                        hidden=False,
-                    ),
-                ],
-                vector_search=VectorSearch(
-                    algorithms=[
-                        HnswAlgorithmConfiguration(
-                            name="algo",
-                            parameters=HnswParameters(
-                                metric=VectorSearchAlgorithmMetric.COSINE
-                            ),
-                        )
-                    ],
-                    vectorizers=[
-                        AzureOpenAIVectorizer(
-                            vectorizer_name="openai_vectorizer",
-                            parameters=AzureOpenAIVectorizerParameters(
-                                resource_url=azure_openai_embedding_endpoint,
-                                deployment_name=azure_openai_embedding_deployment,
-                                model_name=azure_openai_embedding_model,
-                            ),
-                        )
-                    ],
-                    profiles=[
-                        VectorSearchProfile(
-                            name="vp",
-                            algorithm_configuration_name="algo",
-                            vectorizer_name="openai_vectorizer",
-                        )
-                    ],
-                ),
-                semantic_search=SemanticSearch(
-                    configurations=[
-                        SemanticConfiguration(
-                            name="default",
-                            prioritized_fields=SemanticPrioritizedFields(
-                                title_field=SemanticField(field_name="title"),
-                                content_fields=[SemanticField(field_name="chunk")],
-                            ),
-                        )
-                    ],
-                    default_configuration_name="default",
-                ),
+            build_index(
+                index_name,
+                azure_openai_embedding_endpoint,
+                azure_openai_embedding_deployment,
+                azure_openai_embedding_model,
+                index_profile,
             )
         )
 
@@ -179,7 +121,7 @@ def setup_index(
                         api_key=None,
                         deployment_name=azure_openai_embedding_deployment,
                         model_name=azure_openai_embedding_model,
-                        dimensions=azure_openai_embeddings_dimensions,
+                        dimensions=index_profile["dimensions"],
                         inputs=[
                             InputFieldMappingEntry(
                                 name="text", source="/document/pages/*"
@@ -240,6 +182,105 @@ def setup_index(
         )
 
 
+def file_sha256(path, block_size=4 * 1024 * 1024):
+    """Hash a file's content in blocks so large PDFs never load into memory."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as opened_file:
+        for block in iter(lambda: opened_file.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+async def sync_blobs(container_client, data_dir="data", max_concurrency=8):
+    """
+    Upload new and edited files in data_dir to a blob container.
+
+    Files are compared by the content hash stored in each blob's metadata, so
+    unchanged files are skipped and edited files are re-uploaded even when
+    their name already exists. Works against Azure Storage or Azurite.
+
+    Args:
+        container_client: azure.storage.blob.aio.ContainerClient
+        data_dir: Folder with the documents to upload
+        max_concurrency: Maximum files uploaded at the same time
+
+    Returns:
+        Names of the blobs that were uploaded
+    """
+    if not await container_client.exists():
+        await container_client.create_container()
+
+    remote_hashes = {}
+    async for blob in container_client.list_blobs(include=["metadata"]):
+        remote_hashes[blob.name] = (blob.metadata or {}).get(CONTENT_HASH_METADATA)
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def upload_if_changed(file):
+        async with semaphore:
+            content_hash = await asyncio.to_thread(file_sha256, file.path)
+            if remote_hashes.get(file.name) == content_hash:
+                logger.info("Blob unchanged, skipping file: %s", file.name)
+                return None
+
+            logger.info("Uploading blob for file: %s", file.name)
+            start_time = time.perf_counter()
+            with open(file.path, "rb") as opened_file:
+                # Files above max_single_put_size go up as blocks in parallel
+                await container_client.upload_blob(
+                    file.name,
+                    opened_file,
+                    length=file.stat().st_size,
+                    overwrite=True,
+                    metadata={CONTENT_HASH_METADATA: content_hash},
+                    max_concurrency=BLOCK_UPLOAD_CONCURRENCY,
+                )
+            logger.info(
+                "Uploaded %s (%d bytes) in %.1fs",
+                file.name,
+                file.stat().st_size,
+                time.perf_counter() - start_time,
+            )
+            return file.name
+
+    files = [file for file in os.scandir(data_dir) if file.is_file()]
+    uploaded = await asyncio.gather(*(upload_if_changed(file) for file in files))
+    return [name for name in uploaded if name]
+
+
+async def _upload_blobs(azure_storage_endpoint, azure_storage_container):
+    from azure.identity.aio import DefaultAzureCredential as AsyncDefaultCredential
+    from azure.storage.blob.aio import BlobServiceClient
+
+    blob_options = {
+        "max_single_put_size": 4 * 1024 * 1024,
+        "max_block_size": 4 * 1024 * 1024,
+    }
+    # A connection string (e.g. "UseDevelopmentStorage=true" for Azurite)
+    # replaces the storage endpoint and Entra ID credential
+    connection_string = os.environ.get("AZURE_STORAGE_UPLOAD_CONNECTION_STRING")
+    if connection_string:
+        credential = None
+        blob_service_client = BlobServiceClient.from_connection_string(
+            connection_string, **blob_options
+        )
+    else:
+        credential = AsyncRefreshAheadCredential(AsyncDefaultCredential())
+        blob_service_client = BlobServiceClient(
+            account_url=azure_storage_endpoint, credential=credential, **blob_options
+        )
+
+    try:
+        async with blob_service_client:
+            container_client = blob_service_client.get_container_client(
+                azure_storage_container
+            )
+            return await sync_blobs(container_client)
+    finally:
+        if credential is not None:
+            await credential.close()
+
+
 def upload_documents(
     azure_credential,
     indexer_name,
@@ -247,35 +288,22 @@ def upload_documents(
     azure_storage_endpoint,
     azure_storage_container,
 ):
-    indexer_client = SearchIndexerClient(azure_search_endpoint, azure_credential)
-    # Upload the documents in /data folder to the blob storage container
-    blob_client = BlobServiceClient(
-        account_url=azure_storage_endpoint,
-        credential=azure_credential,
-        max_single_put_size=4 * 1024 * 1024,
+    # Upload new or edited documents in /data folder to the blob storage container
+    start_time = time.perf_counter()
+    uploaded = asyncio.run(
+        _upload_blobs(azure_storage_endpoint, azure_storage_container)
     )
-
-    # insert code to verify blob client
-    # List all containers to verify connection
-    container_client = blob_client.get_container_client(azure_storage_container)
-    if not container_client.exists():
-        container_client.create_container()
-    existing_blobs = [blob.name for blob in container_client.list_blobs()]
-
-    # Open each file in /data folder
-    for file in os.scandir("data"):
-        with open(file.path, "rb") as opened_file:
-            filename = os.path.basename(file.path)
-            # Check if blob already exists
-            if filename in existing_blobs:
-                logger.info("Blob already exists, skipping file: %s", filename)
-            else:
-                logger.info("Uploading blob for file: %s", filename)
-                blob_client = container_client.upload_blob(
-                    filename, opened_file, overwrite=True
-                )
+    logger.info(
+        "Uploaded %d changed file(s) in %.1fs",
+        len(uploaded),
+        time.perf_counter() - start_time,
+    )
+    if not uploaded:
+        logger.info("No documents changed, not running the indexer")
+        return
 
     # Start the indexer
+    indexer_client = SearchIndexerClient(azure_search_endpoint, azure_credential)
     try:
         indexer_client.run_indexer(indexer_name)
         logger.info(
@@ -292,11 +320,8 @@ if __name__ == "__main__":
         datefmt="[%X]",
         handlers=[RichHandler(rich_tracebacks=True)],
     )
-    logger = logging.getLogger("voicerag")
     logger.setLevel(logging.INFO)
 
-    logger = logging.getLogger("voicerag")
-
     logger.info("Checking if we need to set up Azure AI Search index...")
     if os.environ.get("AZURE_SEARCH_REUSE_EXISTING") == "true":
         logger.info(
@@ -311,13 +336,14 @@ if __name__ == "__main__":
     AZURE_OPENAI_EMBEDDING_ENDPOINT = os.environ["AZURE_OPENAI_ENDPOINT"]
     AZURE_OPENAI_EMBEDDING_DEPLOYMENT = os.environ["AZURE_OPENAI_EMBEDDING_NAME"]
     AZURE_OPENAI_EMBEDDING_MODEL = os.environ["AZURE_OPENAI_EMBEDDING_NAME"]
-    EMBEDDINGS_DIMENSIONS = 3072
+    # Vector dimensions, compression and HNSW parameters (index_profiles.yaml)
+    INDEX_PROFILE = get_index_profile(os.environ.get("AZURE_SEARCH_INDEX_PROFILE"))
     AZURE_SEARCH_ENDPOINT = os.environ["AZURE_SEARCH_ENDPOINT"]
     AZURE_STORAGE_ENDPOINT = os.environ["AZURE_STORAGE_ENDPOINT"]
     AZURE_STORAGE_CONNECTION_STRING = os.environ["AZURE_STORAGE_CONNECTION_STRING"]
     AZURE_STORAGE_CONTAINER = os.environ["AZURE_STORAGE_CONTAINER"]
 
-    azure_credential = DefaultAzureCredential()
+    azure_credential = RefreshAheadCredential(DefaultAzureCredential())
 
     setup_index(
         azure_credential,
@@ -328,7 +354,7 @@ if __name__ == "__main__":
         azure_openai_embedding_endpoint=AZURE_OPENAI_EMBEDDING_ENDPOINT,
         azure_openai_embedding_deployment=AZURE_OPENAI_EMBEDDING_DEPLOYMENT,
         azure_openai_embedding_model=AZURE_OPENAI_EMBEDDING_MODEL,
-        azure_openai_embeddings_dimensions=EMBEDDINGS_DIMENSIONS,
+        index_profile=INDEX_PROFILE,
     )
 
     upload_documents(
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Backend modules and scripts are imported the way the app and scripts do
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.append(os.path.join(ROOT, "app", "backend"))
+sys.path.append(os.path.join(ROOT, "scripts"))
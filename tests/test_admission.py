@@ -0,0 +1,55 @@
+import asyncio
+import time
+
+from admission import AdmissionController, EventLoopLagMonitor
+
+
+class FakeMonitor:
+    def __init__(self, lag_ms=0.0):
+        self.lag = lag_ms
+        self.max_lag_ms = lag_ms
+
+    def lag_ms(self, percentile=95):
+        return self.lag
+
+
+def test_sessions_are_admitted_below_the_limits():
+    controller = AdmissionController(FakeMonitor(20), max_sessions=2, max_lag_ms=100)
+
+    assert controller.admit(0) is None
+    assert controller.admit(1) is None
+    assert controller.get_stats(2)["admitted"] == 2
+
+
+def test_session_limit_rejects_new_sessions():
+    controller = AdmissionController(FakeMonitor(), max_sessions=2)
+
+    assert controller.admit(2) == "session limit reached (2/2)"
+    assert controller.rejected == 1
+
+
+def test_event_loop_lag_rejects_new_sessions():
+    monitor = FakeMonitor(250)
+    controller = AdmissionController(monitor, max_sessions=50, max_lag_ms=100)
+
+    assert controller.admit(3) == "event loop lag 250ms over 100ms"
+    monitor.lag = 40
+    # Readiness recovers as soon as the lag drops back under the limit
+    assert controller.check(3) is None
+
+
+def test_monitor_measures_a_blocked_event_loop():
+    async def main():
+        monitor = EventLoopLagMonitor(interval_ms=10, window_size=5)
+        monitor.start()
+        await asyncio.sleep(0.03)
+        # Block the loop the way a synchronous call in a coroutine would
+        time.sleep(0.1)
+        await asyncio.sleep(0.03)
+        await monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(main())
+
+    assert monitor.max_lag_ms >= 50
+    assert monitor.lag_ms() >= 50
@@ -0,0 +1,60 @@
+import pytest
+
+from tools.context_packing import (
+    estimate_tokens,
+    pack_search_results,
+    split_sentences,
+)
+
+RATES = (
+    "Cartão Gold: a taxa de juros é de 8% ao mês. "
+    "Cartão Platinum: a taxa de juros é de 5% ao mês."
+)
+
+CHUNKS = [
+    (
+        f"manual-de-vendas-parceladas-{index}_pages_{index * 7}",
+        f"Na antecipação do plano {index} o lojista recebe o valor das vendas "
+        "parceladas em até dois dias úteis, descontada a taxa combinada no "
+        f"contrato. Seção {index} trata de outro tema sem relação alguma. "
+        f"Na antecipação do plano {index}b a taxa muda conforme o volume "
+        "mensal de vendas parceladas do lojista.",
+    )
+    for index in range(8)
+]
+
+
+def test_colon_does_not_split_a_label_from_its_value():
+    assert split_sentences(RATES) == [
+        "Cartão Gold: a taxa de juros é de 8% ao mês.",
+        "Cartão Platinum: a taxa de juros é de 5% ao mês.",
+    ]
+
+
+def test_sentences_differing_in_a_short_number_are_both_kept():
+    packed = pack_search_results("taxa de juros", [("c1", RATES)], 600)
+
+    assert "8% ao mês" in packed
+    assert "5% ao mês" in packed
+
+
+def test_repeated_sentences_are_kept_once():
+    sentence = "A taxa de juros é de 8% ao mês."
+    chunks = [("c1", f"Intro. {sentence}"), ("c2", f"{sentence} Outro.")]
+
+    packed = pack_search_results("taxa de juros", chunks, 600)
+
+    assert packed.count(sentence) == 1
+
+
+@pytest.mark.parametrize("max_tokens", range(20, 400, 10))
+def test_packed_result_fits_the_budget(max_tokens):
+    packed = pack_search_results("antecipação vendas parceladas", CHUNKS, max_tokens)
+
+    assert estimate_tokens(packed) <= max_tokens
+
+
+def test_no_budget_returns_every_chunk():
+    packed = pack_search_results("taxa", [("c1", "a"), ("c2", "b")], None)
+
+    assert packed == "[c1]: a\n-----\n[c2]: b\n-----\n"
@@ -0,0 +1,94 @@
+import asyncio
+
+from azure.search.documents.models import VectorizableTextQuery, VectorizedQuery
+
+import tools.implementations as implementations
+from tools.embeddings import EmbeddingClient, FakeEmbeddingBackend
+
+DIMENSIONS = 8
+
+
+def _client(tmp_path, backend=None, **kwargs):
+    return EmbeddingClient(
+        backend or FakeEmbeddingBackend(),
+        "text-embedding-3-large",
+        DIMENSIONS,
+        cache_dir=str(tmp_path),
+        **kwargs,
+    )
+
+
+def test_repeated_question_is_served_from_memory(tmp_path):
+    client = _client(tmp_path)
+
+    async def main():
+        first = await client.embed("Qual a taxa de juros?")
+        # Case and punctuation differences share the cache entry
+        second = await client.embed("qual a taxa de juros")
+        return first, second
+
+    first, second = asyncio.run(main())
+
+    assert first == second
+    assert client.backend.requests == 1
+    assert (client.memory_hits, client.misses) == (1, 1)
+
+
+def test_cached_vector_survives_a_restart_on_disk(tmp_path):
+    first_backend = FakeEmbeddingBackend()
+    first = asyncio.run(_client(tmp_path, first_backend).embed("prazo de entrega"))
+
+    # A new process starts with an empty LRU but the same cache directory
+    restarted = _client(tmp_path)
+    second = asyncio.run(restarted.embed("prazo de entrega"))
+
+    assert restarted.backend.requests == 0
+    assert restarted.disk_hits == 1
+    assert len(list(tmp_path.glob("*.f32"))) == 1
+    # Vectors are persisted as float32, so compare at that precision
+    assert [round(value, 5) for value in second] == [
+        round(value, 5) for value in first
+    ]
+
+
+def test_cache_misses_are_embedded_in_batches(tmp_path):
+    client = _client(tmp_path, batch_size=2)
+    texts = ["um", "dois", "três", "dois", "quatro", "cinco"]
+
+    vectors = asyncio.run(client.embed_many(texts))
+
+    assert len(vectors) == len(texts)
+    assert vectors[1] == vectors[3]
+    # Five distinct texts in batches of two, duplicates sent once
+    assert client.backend.texts_embedded == 5
+    assert client.backend.requests == 3
+
+
+class FailingBackend:
+    async def embed(self, texts, dimensions):
+        raise ConnectionError("embedding endpoint unreachable")
+
+    async def close(self):
+        pass
+
+
+def test_vector_query_uses_the_local_embedding(tmp_path, monkeypatch):
+    client = _client(tmp_path)
+    monkeypatch.setattr(implementations, "get_embedding_client", lambda: client)
+
+    build = implementations._build_vector_query("taxa", k_nearest_neighbors=5)
+    query = asyncio.run(build)
+
+    assert isinstance(query, VectorizedQuery)
+    assert len(query.vector) == DIMENSIONS
+
+
+def test_vector_query_falls_back_to_search_vectorization(tmp_path, monkeypatch):
+    client = _client(tmp_path, FailingBackend())
+    monkeypatch.setattr(implementations, "get_embedding_client", lambda: client)
+
+    build = implementations._build_vector_query("taxa", k_nearest_neighbors=5)
+    query = asyncio.run(build)
+
+    assert isinstance(query, VectorizableTextQuery)
+    assert query.text == "taxa"
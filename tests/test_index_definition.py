@@ -0,0 +1,153 @@
+import asyncio
+
+import pytest
+from azure.search.documents.indexes.models import SearchIndex
+
+from index_definition import (
+    build_index,
+    get_index_profile,
+    index_to_dict,
+    load_index_profiles,
+)
+from tools.embeddings import FakeEmbeddingBackend
+
+ENDPOINT = "https://example.openai.azure.com"
+DEPLOYMENT = "text-embedding-3-large"
+MODEL = "text-embedding-3-large"
+
+# Largest output of the embedding model deployed by infra/main.bicepparam
+MODEL_DIMENSIONS = 3072
+
+HNSW_DEFAULT = {"m": 4, "efConstruction": 400, "efSearch": 500, "metric": "cosine"}
+HNSW_BINARY = {"m": 8, "efConstruction": 400, "efSearch": 200, "metric": "cosine"}
+
+EXPECTED = {
+    "full": {"dimensions": 3072, "hnsw": HNSW_DEFAULT, "compression": None},
+    "scalar": {
+        "dimensions": 3072,
+        "hnsw": HNSW_DEFAULT,
+        "compression": {
+            "name": "scalar_compression",
+            "kind": "scalarQuantization",
+            "scalarQuantizationParameters": {"quantizedDataType": "int8"},
+            "rescoringOptions": {
+                "enableRescoring": True,
+                "defaultOversampling": 4.0,
+                "rescoreStorageMethod": "preserveOriginals",
+            },
+        },
+    },
+    "binary_1024": {
+        "dimensions": 1024,
+        "hnsw": HNSW_BINARY,
+        "compression": {
+            "name": "binary_compression",
+            "kind": "binaryQuantization",
+            "rescoringOptions": {
+                "enableRescoring": True,
+                "defaultOversampling": 10.0,
+                "rescoreStorageMethod": "preserveOriginals",
+            },
+        },
+    },
+    "binary_truncated": {
+        "dimensions": 3072,
+        "hnsw": HNSW_BINARY,
+        "compression": {
+            "name": "binary_compression",
+            "kind": "binaryQuantization",
+            "truncationDimension": 512,
+            "rescoringOptions": {
+                "enableRescoring": True,
+                "defaultOversampling": 10.0,
+                "rescoreStorageMethod": "preserveOriginals",
+            },
+        },
+    },
+}
+
+
+def _definition(name):
+    profile = get_index_profile(name)
+    index = build_index("voicerag-intvect", ENDPOINT, DEPLOYMENT, MODEL, profile)
+    return index_to_dict(index)
+
+
+def _vector_field(definition):
+    (field,) = [f for f in definition["fields"] if f["name"] == "text_vector"]
+    return field
+
+
+def test_every_profile_has_expectations():
+    profiles, default_profile = load_index_profiles()
+
+    assert set(profiles) == set(EXPECTED)
+    assert default_profile == "full"
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_vector_field_matches_the_embedding_model(name):
+    field = _vector_field(_definition(name))
+
+    assert field["dimensions"] == EXPECTED[name]["dimensions"]
+    assert field["dimensions"] <= MODEL_DIMENSIONS
+    assert field["vectorSearchProfile"] == "vp"
+    # Query vectors requested at the profile's dimensions fit the field
+    vectors = asyncio.run(FakeEmbeddingBackend().embed(["taxa"], field["dimensions"]))
+    assert len(vectors[0]) == field["dimensions"]
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_semantic_configuration_ranks_the_chunk(name):
+    semantic = _definition(name)["semantic"]
+
+    assert semantic["defaultConfiguration"] == "default"
+    (configuration,) = semantic["configurations"]
+    fields = configuration["prioritizedFields"]
+    assert fields["titleField"] == {"fieldName": "title"}
+    assert fields["prioritizedContentFields"] == [{"fieldName": "chunk"}]
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_vectorizer_uses_the_embedding_deployment(name):
+    (vectorizer,) = _definition(name)["vectorSearch"]["vectorizers"]
+
+    assert vectorizer == {
+        "name": "openai_vectorizer",
+        "kind": "azureOpenAI",
+        "azureOpenAIParameters": {
+            "resourceUri": ENDPOINT,
+            "deploymentId": DEPLOYMENT,
+            "modelName": MODEL,
+        },
+    }
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_compression_and_hnsw_settings(name):
+    vector_search = _definition(name)["vectorSearch"]
+    expected = EXPECTED[name]
+
+    (algorithm,) = vector_search["algorithms"]
+    assert algorithm["kind"] == "hnsw"
+    assert algorithm["hnswParameters"] == expected["hnsw"]
+
+    (profile,) = vector_search["profiles"]
+    assert profile["algorithm"] == "algo"
+    assert profile["vectorizer"] == "openai_vectorizer"
+    if expected["compression"] is None:
+        assert not vector_search.get("compressions")
+        assert profile.get("compression") is None
+    else:
+        assert vector_search["compressions"] == [expected["compression"]]
+        assert profile["compression"] == expected["compression"]["name"]
+        truncation = expected["compression"].get("truncationDimension")
+        if truncation is not None:
+            assert truncation < expected["dimensions"]
+
+
+@pytest.mark.parametrize("name", sorted(EXPECTED))
+def test_definition_round_trips(name):
+    definition = _definition(name)
+
+    assert index_to_dict(SearchIndex.deserialize(definition)) == definition
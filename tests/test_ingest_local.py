@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import ingest_local
+from ingest_local import chunk_documents, delete_stale_chunks
+
+
+@pytest.fixture(autouse=True)
+def count_words(monkeypatch):
+    # One token per word keeps chunk sizes easy to reason about
+    monkeypatch.setattr(
+        ingest_local, "_count_tokens", lambda: lambda text: len(text.split())
+    )
+
+
+def _sentence(label, words):
+    return " ".join([label] + ["palavra"] * (words - 2) + ["fim."])
+
+
+def _chunks(sentences, max_tokens, overlap_tokens):
+    document = ("doc.md", iter([" ".join(sentences)]))
+    return [
+        chunk["chunk"]
+        for chunk in chunk_documents([document], max_tokens, overlap_tokens)
+    ]
+
+
+def test_overlap_never_exceeds_overlap_tokens():
+    sentences = [_sentence(f"s{index}", 30) for index in range(6)]
+
+    chunks = _chunks(sentences, max_tokens=100, overlap_tokens=20)
+
+    # Each sentence is longer than the overlap, so none is carried over
+    assert chunks == [" ".join(sentences[:3]), " ".join(sentences[3:])]
+
+
+def test_short_trailing_sentences_are_carried():
+    sentences = [_sentence(f"s{index}", 10) for index in range(6)]
+
+    chunks = _chunks(sentences, max_tokens=40, overlap_tokens=20)
+
+    assert chunks[0] == " ".join(sentences[:4])
+    assert chunks[1].startswith(" ".join(sentences[2:4]))
+
+
+def test_oversized_sentence_is_not_repeated():
+    long_sentence = _sentence("longa", 150)
+    sentences = [_sentence("s0", 10), long_sentence] + [
+        _sentence(f"s{index}", 10) for index in range(1, 4)
+    ]
+
+    chunks = _chunks(sentences, max_tokens=100, overlap_tokens=20)
+
+    assert sum(chunk.count(long_sentence) for chunk in chunks) == 1
+    assert all(
+        len(chunk.split()) <= 100 for chunk in chunks if long_sentence not in chunk
+    )
+
+
+class _Results:
+    def __init__(self, items):
+        self._items = items
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for item in self._items:
+            yield item
+
+
+class FakeSearchClient:
+    def __init__(self, indexed):
+        self.indexed = indexed
+        self.deleted = []
+
+    async def search(self, search_text, filter, select):
+        parent_id = filter.split("'")[1]
+        return _Results(
+            [
+                {"chunk_id": chunk_id}
+                for chunk_id, parent in self.indexed.items()
+                if parent == parent_id
+            ]
+        )
+
+    async def delete_documents(self, documents):
+        self.deleted.extend(document["chunk_id"] for document in documents)
+
+
+def test_chunks_a_document_no_longer_produces_are_deleted():
+    client = FakeSearchClient(
+        {"a_local_0": "a", "a_local_1": "a", "a_local_2": "a", "b_local_0": "b"}
+    )
+
+    deleted = asyncio.run(
+        delete_stale_chunks(client, {"a": {"a_local_0"}, "b": {"b_local_0"}})
+    )
+
+    assert deleted == 2
+    assert sorted(client.deleted) == ["a_local_1", "a_local_2"]
@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, ResiliencePolicy, RetryBudget
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(resilience, "time", clock)
+    return clock
+
+
+class FakeTool:
+    """Answers from a script of results; exceptions in the script are raised."""
+
+    def __init__(self, *script, delays=()):
+        self.script = list(script)
+        self.delays = list(delays)
+        self.calls = 0
+
+    async def __call__(self, args):
+        self.calls += 1
+        delay = self.delays.pop(0) if self.delays else 0
+        result = self.script.pop(0) if len(self.script) > 1 else self.script[0]
+        if delay:
+            await asyncio.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def _policy(config, budget=None):
+    return ResiliencePolicy("lookup", config, budget or RetryBudget())
+
+
+def _breaker_config(**overrides):
+    config = {"window_size": 4, "min_calls": 2, "open_seconds": 30.0}
+    config.update(overrides)
+    return {"circuit_breaker": config, "fallback_message": "indisponível"}
+
+
+def test_breaker_opens_serves_fallback_and_recovers(clock):
+    policy = _policy(_breaker_config())
+    failing = FakeTool(RuntimeError("down"))
+    healthy = FakeTool({"answer": "ok"})
+
+    async def main():
+        for _ in range(2):
+            await policy.call(failing, {"q": "a"})
+        assert policy.breaker.state == CircuitBreaker.OPEN
+        # While open the tool is not called at all
+        assert await policy.call(healthy, {"q": "a"}) == "indisponível"
+        assert healthy.calls == 0
+
+        clock.now += 31
+        return await policy.call(healthy, {"q": "a"})
+
+    assert asyncio.run(main()) == {"answer": "ok"}
+    assert policy.breaker.state == CircuitBreaker.CLOSED
+    assert policy.fallbacks == 3
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(window_size=4, min_calls=2, open_seconds=30.0)
+    breaker.record(False, 10)
+    breaker.record(False, 10)
+
+    clock.now += 31
+    assert breaker.allow()
+    # Only one trial call is admitted while half-open
+    assert not breaker.allow()
+    breaker.record(False, 10, breaker.generation)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_late_result_of_a_closed_call_does_not_decide_the_trial(clock):
+    breaker = CircuitBreaker(window_size=4, min_calls=2, open_seconds=30.0)
+    assert breaker.allow()
+    slow_call = breaker.generation
+    breaker.record(False, 10, breaker.generation)
+    breaker.record(False, 10, breaker.generation)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 31
+    assert breaker.allow()
+    trial = breaker.generation
+    # The slow call admitted while closed finishes during the trial
+    breaker.record(True, 10, slow_call)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.record(False, 10, trial)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_p95_latency_opens_the_breaker(clock):
+    breaker = CircuitBreaker(
+        window_size=4, min_calls=4, p95_latency_ms=500, open_seconds=30.0
+    )
+    for latency_ms in (100, 120, 900, 950):
+        breaker.record(True, latency_ms)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_slow_call_is_hedged_and_the_hedge_wins():
+    policy = _policy({"hedge": {"percentile": 95, "min_delay_ms": 10}})
+    for _ in range(10):
+        policy.latencies.add(20)
+    # The first attempt stalls; the hedge fired after 20ms answers quickly
+    tool = FakeTool("slow", "fast", delays=[1.0, 0])
+
+    result = asyncio.run(policy.call(tool, {"q": "a"}))
+
+    assert result == "fast"
+    assert tool.calls == 2
+    assert policy.hedges_fired == 1
+    assert policy.hedges_won == 1
+
+
+def test_retry_budget_caps_retries_across_calls():
+    budget = RetryBudget(ratio=0.0, max_tokens=1.0)
+    policy = _policy({"max_retries": 3, "fallback_message": "indisponível"}, budget)
+
+    async def main():
+        first = FakeTool(RuntimeError("flaky"), {"answer": "ok"})
+        second = FakeTool(RuntimeError("flaky"), {"answer": "ok"})
+        return (
+            await policy.call(first, {"q": "a"}),
+            await policy.call(second, {"q": "b"}),
+            first.calls,
+            second.calls,
+        )
+
+    first, second, first_calls, second_calls = asyncio.run(main())
+
+    assert (first, first_calls) == ({"answer": "ok"}, 2)
+    # The budget is spent, so the second call falls back instead of retrying
+    assert (second, second_calls) == ("indisponível", 1)
+    assert budget.denied == 1
+
+
+def test_fallback_prefers_the_last_good_answer_for_the_same_query():
+    policy = _policy({"fallback_message": "indisponível"})
+
+    async def main():
+        await policy.call(FakeTool({"answer": "8%"}), {"q": "taxa"})
+        failing = FakeTool(RuntimeError("down"))
+        return (
+            await policy.call(failing, {"q": "taxa"}),
+            await policy.call(failing, {"q": "prazo"}),
+        )
+
+    assert asyncio.run(main()) == ({"answer": "8%"}, "indisponível")
+
+
+def test_error_without_fallback_is_raised():
+    policy = _policy({})
+
+    with pytest.raises(RuntimeError, match="down"):
+        asyncio.run(policy.call(FakeTool(RuntimeError("down")), {"q": "a"}))
+
+
+def test_reconfigure_applies_new_settings_to_wrapped_tools():
+    policy = _policy({"max_retries": 0})
+    tool = FakeTool(RuntimeError("flaky"), {"answer": "ok"})
+    wrapped = policy.wrap(tool)
+
+    policy.reconfigure({"max_retries": 1, "circuit_breaker": {"min_calls": 3}})
+
+    assert asyncio.run(wrapped({"q": "a"})) == {"answer": "ok"}
+    assert policy.breaker.min_calls == 3
+
+
+def test_reconfigure_keeps_an_unchanged_breaker():
+    config = _breaker_config()
+    policy = _policy(config)
+    breaker = policy.breaker
+
+    policy.reconfigure(dict(config, max_retries=2))
+
+    assert policy.breaker is breaker
+    policy.reconfigure({})
+    assert policy.breaker is None
@@ -0,0 +1,101 @@
+import pytest
+
+import tools.retrieval as retrieval
+from tools.retrieval import RetrievalPolicy, RetrievalProfile
+
+PROFILES = [
+    {"name": "semantic_hybrid", "mode": "hybrid", "semantic": True},
+    {"name": "hybrid", "mode": "hybrid"},
+    {"name": "keyword", "mode": "keyword"},
+]
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(retrieval, "time", clock)
+    return clock
+
+
+def _policy(**overrides):
+    config = {
+        "profiles": PROFILES,
+        "p95_budget_ms": 300,
+        "min_samples": 3,
+        "recovery_seconds": 60,
+    }
+    config.update(overrides)
+    return RetrievalPolicy("get_product_information", config)
+
+
+def test_slow_profile_is_downgraded_once_enough_samples_break_the_budget(clock):
+    policy = _policy()
+    profile = policy.select()
+
+    policy.record(profile, 900)
+    policy.record(profile, 900)
+    assert policy.current.name == "semantic_hybrid"
+    policy.record(profile, 900)
+
+    assert policy.select().name == "hybrid"
+    assert policy.downgrades == 1
+
+
+def test_timeout_downgrades_immediately_but_not_past_the_cheapest(clock):
+    policy = _policy()
+
+    for _ in range(4):
+        policy.record_timeout(policy.select())
+
+    assert policy.current.name == "keyword"
+    assert (policy.timeouts, policy.downgrades) == (4, 2)
+
+
+def test_late_result_of_a_previous_profile_does_not_downgrade_again(clock):
+    policy = _policy(min_samples=1)
+    richest = policy.select()
+    policy.record_timeout(richest)
+
+    # A search started before the downgrade finishes slowly afterwards
+    policy.record(richest, 2000)
+
+    assert policy.current.name == "hybrid"
+
+
+def test_richer_profile_is_probed_after_the_recovery_period(clock):
+    policy = _policy()
+    policy.record_timeout(policy.select())
+
+    clock.now += 30
+    assert policy.select().name == "hybrid"
+    clock.now += 31
+    assert policy.select().name == "semantic_hybrid"
+    # The probe starts from fresh latencies, not those that caused the downgrade
+    assert len(policy.latencies["semantic_hybrid"]) == 0
+
+
+def test_profile_search_arguments():
+    semantic = RetrievalProfile(
+        {"name": "s", "mode": "hybrid", "semantic": True, "semantic_max_wait_ms": 700}
+    )
+    vector = RetrievalProfile({"name": "v", "mode": "vector", "oversampling": 4.0})
+
+    kwargs = semantic.search_kwargs("taxa", vector_query="vq")
+    assert kwargs["search_text"] == "taxa"
+    assert kwargs["vector_queries"] == ["vq"]
+    assert kwargs["query_type"] == "semantic"
+    assert kwargs["semantic_error_mode"] == "partial"
+    assert kwargs["semantic_max_wait_in_milliseconds"] == 700
+
+    assert vector.search_kwargs("taxa", "vq")["search_text"] is None
+    assert vector.vector_options == {"k_nearest_neighbors": 50, "oversampling": 4.0}
+    with pytest.raises(ValueError):
+        RetrievalProfile({"name": "x", "mode": "fuzzy"})
@@ -0,0 +1,43 @@
+import asyncio
+
+from tools.search_client import SearchClientManager
+
+
+class _Results:
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        yield {"chunk_id": "c1"}
+
+
+class FakeSearchClient:
+    async def search(self, **kwargs):
+        return _Results()
+
+
+class FakeCredential:
+    async def get_token(self, *scopes):
+        return None
+
+    def get_stats(self):
+        return {}
+
+
+def test_warm_up_query_is_not_the_first_query():
+    manager = SearchClientManager("https://example.search.windows.net", "index")
+    manager.client = FakeSearchClient()
+    manager.credential = FakeCredential()
+
+    asyncio.run(manager.warm_up())
+    stats = manager.get_stats()
+
+    assert set(stats["warmup_ms"]) == {"token", "query"}
+    assert stats["first_query_ms"] is None
+
+    manager.record_query(120.0)
+    manager.record_query(40.0)
+    stats = manager.get_stats()
+
+    assert stats["first_query_ms"] == 120.0
+    assert stats["steady_state_queries"] == 1
@@ -0,0 +1,107 @@
+import asyncio
+import base64
+
+from azure.ai.voicelive.models import ServerEvent
+
+from session_recorder import (
+    KIND_CLIENT_MESSAGE,
+    KIND_SERVER_EVENT,
+    KIND_SESSION,
+    SessionRecorder,
+    read_recording,
+    restore_payload,
+)
+
+AUDIO = bytes(range(256)) * 4
+
+
+def _audio_delta():
+    return ServerEvent.deserialize(
+        {
+            "type": "response.audio.delta",
+            "event_id": "event-2",
+            "response_id": "response-1",
+            "item_id": "item-1",
+            "output_index": 0,
+            "content_index": 0,
+            "delta": base64.b64encode(AUDIO).decode("ascii"),
+        }
+    )
+
+
+def _record(path, **kwargs):
+    async def main():
+        recorder = SessionRecorder(str(path), **kwargs)
+        recorder.record_session(client_id="client-1", model="gpt-4o-realtime")
+        recorder.record_server_event(
+            ServerEvent.deserialize(
+                {"type": "response.created", "event_id": "event-1", "response": {}}
+            )
+        )
+        recorder.record_server_event(_audio_delta())
+        recorder.record_client_message(
+            {"type": "audio_chunk", "data": base64.b64encode(AUDIO).decode("ascii")}
+        )
+        recorder.record_client_message({"type": "interrupt"})
+        await recorder.close()
+        return recorder
+
+    return asyncio.run(main())
+
+
+def test_recording_round_trips(tmp_path):
+    path = tmp_path / "session.vlrec"
+    recorder = _record(path)
+
+    records = list(read_recording(str(path)))
+
+    assert recorder.records == 5
+    assert recorder.bytes_written == path.stat().st_size
+    assert [kind for kind, _, _, _ in records] == [
+        KIND_SESSION,
+        KIND_SERVER_EVENT,
+        KIND_SERVER_EVENT,
+        KIND_CLIENT_MESSAGE,
+        KIND_CLIENT_MESSAGE,
+    ]
+    offsets = [offset for _, offset, _, _ in records]
+    assert offsets == sorted(offsets)
+
+    _, _, session, _ = records[0]
+    assert session["client_id"] == "client-1"
+
+    # Audio is stored raw and restored as the original base64 payload
+    _, _, delta_meta, delta_raw = records[2]
+    assert delta_raw == AUDIO
+    restored = ServerEvent.deserialize(restore_payload(delta_meta, delta_raw))
+    assert restored.delta == AUDIO
+    assert restored.item_id == "item-1"
+
+    _, _, chunk_meta, chunk_raw = records[3]
+    assert restore_payload(chunk_meta, chunk_raw) == {
+        "type": "audio_chunk",
+        "data": base64.b64encode(AUDIO).decode("ascii"),
+    }
+    assert restore_payload(*records[4][2:]) == {"type": "interrupt"}
+
+
+def test_truncated_tail_keeps_the_complete_records(tmp_path):
+    path = tmp_path / "session.vlrec"
+    _record(path)
+    data = path.read_bytes()
+    # A crash mid-write leaves part of the last record behind
+    path.write_bytes(data[:-5])
+
+    records = list(read_recording(str(path)))
+
+    assert len(records) == 4
+    assert records[-1][3] == AUDIO
+
+
+def test_records_past_the_buffer_limit_are_dropped(tmp_path):
+    path = tmp_path / "session.vlrec"
+
+    recorder = _record(path, max_buffer_bytes=600, flush_interval_ms=10_000)
+
+    assert recorder.dropped == 2
+    assert len(list(read_recording(str(path)))) == recorder.records == 3
@@ -0,0 +1,82 @@
+import asyncio
+
+from session_registry import LocalSessionRegistry
+
+
+async def _noop(client_id, message):
+    pass
+
+
+async def _started(path, count):
+    registries = [
+        LocalSessionRegistry(str(path), worker_id=f"worker-{index}")
+        for index in range(count)
+    ]
+    for registry in registries:
+        await registry.start(_noop)
+    return registries
+
+
+def test_concurrent_claims_report_each_takeover_once(tmp_path):
+    async def main():
+        registries = await _started(tmp_path / "sessions.db", 8)
+        results = []
+        for attempt in range(10):
+            client_id = f"client-{attempt}"
+            previous = await asyncio.gather(
+                *(registry.claim(client_id) for registry in registries)
+            )
+            owner = await registries[0].owner(client_id)
+            results.append((previous, owner))
+        for registry in registries:
+            await registry.stop()
+        return results
+
+    for previous, owner in asyncio.run(main()):
+        # Claims form one chain: the first saw no owner, every other claim
+        # saw a distinct predecessor, and the last claimant owns the session
+        assert previous.count(None) == 1
+        predecessors = [worker for worker in previous if worker is not None]
+        assert len(set(predecessors)) == len(predecessors)
+        assert owner not in predecessors
+
+
+def test_release_keeps_a_newer_owner(tmp_path):
+    async def main():
+        first, second = await _started(tmp_path / "sessions.db", 2)
+        await first.claim("client")
+        previous = await second.claim("client")
+        await first.release("client")
+        owner = await first.owner("client")
+        await first.stop()
+        await second.stop()
+        return previous, owner
+
+    assert asyncio.run(main()) == ("worker-0", "worker-1")
+
+
+def test_control_messages_reach_the_owner(tmp_path):
+    async def main():
+        received = []
+
+        async def handler(client_id, message):
+            received.append((client_id, message["type"]))
+
+        owner = LocalSessionRegistry(
+            str(tmp_path / "sessions.db"), worker_id="owner", poll_interval_ms=5
+        )
+        other = LocalSessionRegistry(str(tmp_path / "sessions.db"), worker_id="other")
+        await owner.start(handler)
+        await other.start(_noop)
+        await owner.claim("client")
+        routed_to = await other.route("client", {"type": "interrupt"})
+        missing = await other.route("unknown", {"type": "interrupt"})
+        for _ in range(100):
+            if received:
+                break
+            await asyncio.sleep(0.01)
+        await owner.stop()
+        await other.stop()
+        return routed_to, missing, received
+
+    assert asyncio.run(main()) == ("owner", None, [("client", "interrupt")])
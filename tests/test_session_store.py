@@ -0,0 +1,81 @@
+import asyncio
+
+import session_store
+from session_store import SessionToolStore
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+
+async def _done(value):
+    return value
+
+
+async def _failing():
+    raise ConnectionError("upstream unavailable")
+
+
+def test_fresh_result_is_returned_until_its_ttl_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(session_store, "time", clock)
+
+    async def main():
+        store = SessionToolStore(default_ttl_seconds=60)
+        task = asyncio.create_task(_done({"fatura": 120}))
+        store.put("fatura", task)
+        await task
+        fresh = store.get("fatura")
+        clock.now += 61
+        return fresh is task, store.get("fatura"), len(store)
+
+    assert asyncio.run(main()) == (True, None, 0)
+
+
+def test_failed_result_is_not_served():
+    async def main():
+        store = SessionToolStore()
+        task = asyncio.create_task(_failing())
+        store.put("fatura", task)
+        await asyncio.gather(task, return_exceptions=True)
+        return store.get("fatura")
+
+    assert asyncio.run(main()) is None
+
+
+def test_oldest_entry_is_evicted_and_cancelled():
+    async def main():
+        store = SessionToolStore(max_entries=2)
+        tasks = [asyncio.create_task(asyncio.sleep(10)) for _ in range(3)]
+        for index, task in enumerate(tasks):
+            store.put(f"tool-{index}", task)
+        await asyncio.sleep(0)
+        kept = [store.get(f"tool-{index}") for index in range(3)]
+        store.clear()
+        await asyncio.sleep(0)
+        return tasks, kept
+
+    tasks, kept = asyncio.run(main())
+
+    assert kept == [None, tasks[1], tasks[2]]
+    assert tasks[0].cancelled()
+    # Clearing the store cancels results nobody used
+    assert all(task.cancelled() for task in tasks)
+
+
+def test_recently_used_entry_survives_eviction():
+    async def main():
+        store = SessionToolStore(max_entries=2)
+        first = asyncio.create_task(_done(1))
+        store.put("first", first)
+        store.put("second", asyncio.create_task(_done(2)))
+        store.get("first")
+        store.put("third", asyncio.create_task(_done(3)))
+        await asyncio.sleep(0)
+        return store.get("first") is first, store.get("second")
+
+    assert asyncio.run(main()) == (True, None)
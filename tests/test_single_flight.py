@@ -0,0 +1,123 @@
+import asyncio
+
+from single_flight import SingleFlight, normalize_arguments
+
+
+class CountingTool:
+    def __init__(self, error=None):
+        self.error = error
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+
+    async def __call__(self, args):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return {"query": args["query"], "run": self.calls}
+
+
+async def _settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_arguments_normalize_across_case_spacing_and_key_order():
+    assert normalize_arguments('{"query": "Taxa  de Juros", "top": 3}') == (
+        normalize_arguments({"top": 3, "query": "taxa de juros"})
+    )
+    assert normalize_arguments({"query": "taxa"}) != normalize_arguments(
+        {"query": "prazo"}
+    )
+
+
+def test_identical_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+
+    async def main():
+        tool = CountingTool()
+        lookup = flight.wrap("lookup", tool)
+        calls = [
+            asyncio.ensure_future(lookup({"query": query}))
+            for query in ("Taxa", "taxa ", "TAXA", "prazo")
+        ]
+        await _settle()
+        tool.release.set()
+        return await asyncio.gather(*calls), tool.calls
+
+    results, executions = asyncio.run(main())
+
+    assert executions == 2
+    assert results[0] is results[1] is results[2]
+    assert results[3]["query"] == "prazo"
+    assert flight.get_stats() == {
+        "calls": 4,
+        "executions": 2,
+        "in_flight": 0,
+        "reduction_percent": 50.0,
+    }
+
+
+def test_a_cancelled_caller_leaves_the_others_waiting():
+    flight = SingleFlight()
+
+    async def main():
+        tool = CountingTool()
+        lookup = flight.wrap("lookup", tool)
+        first = asyncio.ensure_future(lookup({"query": "taxa"}))
+        second = asyncio.ensure_future(lookup({"query": "taxa"}))
+        await _settle()
+        first.cancel()
+        await _settle()
+        tool.release.set()
+        return first.cancelled(), await second, tool.cancelled
+
+    first_cancelled, result, execution_cancelled = asyncio.run(main())
+
+    assert first_cancelled
+    assert result["run"] == 1
+    assert not execution_cancelled
+
+
+def test_execution_is_cancelled_with_its_last_caller():
+    flight = SingleFlight()
+
+    async def main():
+        tool = CountingTool()
+        lookup = flight.wrap("lookup", tool)
+        call = asyncio.ensure_future(lookup({"query": "taxa"}))
+        await _settle()
+        call.cancel()
+        await _settle()
+        # A new caller starts a fresh execution instead of joining a dead one
+        again = asyncio.ensure_future(lookup({"query": "taxa"}))
+        await _settle()
+        tool.release.set()
+        return await again, tool.cancelled
+
+    result, execution_cancelled = asyncio.run(main())
+
+    assert execution_cancelled
+    assert result["run"] == 2
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def main():
+        tool = CountingTool(error=ConnectionError("search unavailable"))
+        lookup = flight.wrap("lookup", tool)
+        calls = [asyncio.ensure_future(lookup({"query": "taxa"})) for _ in range(3)]
+        await _settle()
+        tool.release.set()
+        return await asyncio.gather(*calls, return_exceptions=True), tool.calls
+
+    results, executions = asyncio.run(main())
+
+    assert executions == 1
+    assert all(isinstance(result, ConnectionError) for result in results)
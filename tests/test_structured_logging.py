@@ -0,0 +1,107 @@
+import asyncio
+import json
+import logging
+
+import pytest
+
+from structured_logging import (
+    JsonFormatter,
+    LoggingPipeline,
+    SampledLogger,
+    SamplingFilter,
+)
+from task_context import set_task_context
+
+
+@pytest.fixture
+def pipeline_logger():
+    """A logger wired to a fresh pipeline's queue handler, not to the root."""
+    pipelines = []
+
+    def make(name, **kwargs):
+        pipeline = LoggingPipeline(**kwargs)
+        logger = logging.getLogger(name)
+        logger.setLevel(logging.DEBUG)
+        logger.propagate = False
+        logger.addHandler(pipeline.handler)
+        pipelines.append((logger, pipeline))
+        return logger, pipeline
+
+    yield make
+    for logger, pipeline in pipelines:
+        logger.removeHandler(pipeline.handler)
+
+
+def _queued(pipeline):
+    records = []
+    while not pipeline.handler.queue.empty():
+        records.append(pipeline.handler.queue.get_nowait())
+    return records
+
+
+def test_sampling_keeps_one_record_in_n_per_category():
+    sampling = SamplingFilter({"voice.audio": 3})
+
+    kept = [sampling.keep("voice.audio.delta", logging.DEBUG) for _ in range(7)]
+
+    assert kept == [True, False, False, True, False, False, True]
+    assert sampling.sampled_out == {"voice.audio": 4}
+    # Other categories and warnings are never sampled
+    assert sampling.keep("voice.tools", logging.DEBUG)
+    assert sampling.keep("voice.audio", logging.WARNING)
+
+
+def test_sampled_logger_samples_before_creating_records(pipeline_logger):
+    logger, pipeline = pipeline_logger("voice.audio", sample_rates={"voice.audio": 4})
+    sampled = SampledLogger(logger, pipeline.sampling)
+
+    for index in range(8):
+        sampled.debug("Audio delta: %d bytes", index)
+
+    records = _queued(pipeline)
+    assert [record.getMessage() for record in records] == [
+        "Audio delta: 0 bytes",
+        "Audio delta: 4 bytes",
+    ]
+    # Kept records are not counted a second time by the handler's filter
+    assert pipeline.get_stats()["sampled_out"] == {"voice.audio": 6}
+
+
+def test_full_queue_drops_records_instead_of_blocking(pipeline_logger):
+    logger, pipeline = pipeline_logger("voice.test.queue", queue_size=2)
+
+    for index in range(5):
+        logger.info("record %d", index)
+
+    stats = pipeline.get_stats()
+    assert (stats["queue_depth"], stats["dropped"]) == (2, 3)
+    assert [record.getMessage() for record in _queued(pipeline)] == [
+        "record 0",
+        "record 1",
+    ]
+
+
+def test_records_carry_the_session_context_as_json(pipeline_logger):
+    logger, pipeline = pipeline_logger("voice.test.context")
+
+    async def session():
+        set_task_context(session_id="client-1", turn_id=3, phase="tool_execution")
+        logger.info("Executing %s", "lookup")
+
+    asyncio.run(session())
+    (record,) = _queued(pipeline)
+    entry = json.loads(JsonFormatter().format(record))
+
+    assert entry["message"] == "Executing lookup"
+    assert (entry["session_id"], entry["turn_id"], entry["phase"]) == (
+        "client-1",
+        3,
+        "tool_execution",
+    )
+
+
+def test_sample_rate_must_keep_something():
+    pipeline = LoggingPipeline()
+
+    with pytest.raises(ValueError):
+        pipeline.set_sample_rate("voice.audio", 0)
@@ -0,0 +1,32 @@
+import asyncio
+import contextvars
+
+from task_context import get_task_context, install_task_factory, set_task_context
+
+
+def test_child_tasks_inherit_context():
+    async def main():
+        install_task_factory(asyncio.get_running_loop())
+        set_task_context(session_id="client-1")
+        child = asyncio.create_task(asyncio.sleep(0))
+        await child
+        return get_task_context(child)
+
+    assert asyncio.run(main()) == {"session_id": "client-1"}
+
+
+def test_factory_accepts_the_python_310_call_without_context():
+    async def main():
+        loop = asyncio.get_running_loop()
+        install_task_factory(loop)
+        set_task_context(phase="audio_relay")
+        # Python 3.10 loops call the factory as factory(loop, coro)
+        task = loop.get_task_factory()(loop, asyncio.sleep(0))
+        await task
+        explicit = loop.get_task_factory()(
+            loop, asyncio.sleep(0), context=contextvars.copy_context()
+        )
+        await explicit
+        return get_task_context(task), get_task_context(explicit)
+
+    assert asyncio.run(main()) == ({"phase": "audio_relay"}, {"phase": "audio_relay"})
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from azure.core.credentials import AccessToken
+
+import token_cache
+from token_cache import AsyncRefreshAheadCredential, RefreshAheadCredential
+
+SCOPE = "https://cognitiveservices.azure.com/.default"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(token_cache, "time", clock)
+    return clock
+
+
+class FakeCredential:
+    """Issues numbered tokens; `gate` holds acquisitions until it is set."""
+
+    def __init__(self, lifetime, now=time.time, error=None):
+        self.lifetime = lifetime
+        self.now = now
+        self.error = error
+        self.calls = 0
+        self.entered = threading.Event()
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        self.entered.set()
+        self.gate.wait()
+        if self.error is not None:
+            raise self.error
+        return AccessToken(f"token-{self.calls}", int(self.now() + self.lifetime))
+
+
+class FakeAsyncCredential(FakeCredential):
+    async def get_token(self, *scopes, **kwargs):
+        self.calls += 1
+        # Yield so concurrent callers pile up behind the first acquisition
+        await asyncio.sleep(0.01)
+        if self.error is not None:
+            raise self.error
+        return AccessToken(f"token-{self.calls}", int(self.now() + self.lifetime))
+
+
+def _wait_for(condition, timeout_s=2.0):
+    deadline = time.monotonic() + timeout_s
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_sync_cache_hit_skips_the_credential(clock):
+    inner = FakeCredential(3600, now=clock.time)
+    credential = RefreshAheadCredential(inner)
+
+    first = credential.get_token(SCOPE)
+    second = credential.get_token(SCOPE)
+
+    assert first is second
+    assert inner.calls == 1
+    assert credential.get_stats()["cache_hits"] == 1
+
+
+def test_sync_token_is_refreshed_ahead_of_expiry(clock):
+    inner = FakeCredential(3600, now=clock.time)
+    credential = RefreshAheadCredential(inner, refresh_margin_seconds=300)
+    first = credential.get_token(SCOPE)
+
+    clock.now += 3400
+    # Inside the refresh margin the cached token is still served at once
+    assert credential.get_token(SCOPE) is first
+    _wait_for(lambda: credential.get_stats()["acquisitions"] == 2)
+
+    assert credential.get_token(SCOPE).token == "token-2"
+    assert credential.get_stats()["background_refreshes"] == 1
+
+
+def test_sync_concurrent_callers_share_one_refresh(clock):
+    inner = FakeCredential(3600, now=clock.time)
+    inner.gate.clear()
+    credential = RefreshAheadCredential(inner)
+    tokens = []
+    threads = [
+        threading.Thread(target=lambda: tokens.append(credential.get_token(SCOPE)))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    inner.entered.wait(2)
+    time.sleep(0.05)
+    inner.gate.set()
+    for thread in threads:
+        thread.join()
+
+    assert inner.calls == 1
+    assert [token.token for token in tokens] == ["token-1"] * 8
+
+
+def test_sync_waiters_get_the_refresh_error_once_the_token_expired(clock):
+    inner = FakeCredential(60, now=clock.time)
+    credential = RefreshAheadCredential(inner, min_validity_seconds=30)
+    credential.get_token(SCOPE)
+    clock.now += 120
+
+    inner.error = PermissionError("credential revoked")
+    inner.entered.clear()
+    inner.gate.clear()
+    errors = []
+
+    def call():
+        try:
+            credential.get_token(SCOPE)
+        except Exception as e:
+            errors.append(e)
+
+    owner = threading.Thread(target=call)
+    owner.start()
+    inner.entered.wait(2)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    time.sleep(0.05)
+    inner.gate.set()
+    owner.join()
+    waiter.join()
+
+    assert inner.calls == 2
+    assert len(errors) == 2
+    assert all(isinstance(error, PermissionError) for error in errors)
+
+
+def test_async_cache_hit_and_single_flight():
+    inner = FakeAsyncCredential(3600)
+
+    async def main():
+        credential = AsyncRefreshAheadCredential(inner)
+        tokens = await asyncio.gather(*(credential.get_token(SCOPE) for _ in range(8)))
+        cached = await credential.get_token(SCOPE)
+        stats = credential.get_stats()
+        await credential.close()
+        return tokens, cached, stats
+
+    tokens, cached, stats = asyncio.run(main())
+
+    assert inner.calls == 1
+    assert {token.token for token in tokens} == {"token-1"}
+    assert cached is tokens[0]
+    assert stats["cache_hits"] == 1
+
+
+def test_async_token_is_refreshed_in_the_background():
+    # Tokens live 2s; refresh starts at half-life without any caller waiting
+    inner = FakeAsyncCredential(2)
+
+    async def main():
+        credential = AsyncRefreshAheadCredential(
+            inner, refresh_margin_seconds=0.5, min_validity_seconds=0.0
+        )
+        first = await credential.get_token(SCOPE)
+        for _ in range(200):
+            if inner.calls == 2:
+                break
+            await asyncio.sleep(0.01)
+        await asyncio.sleep(0.05)
+        second = await credential.get_token(SCOPE)
+        stats = credential.get_stats()
+        await credential.close()
+        return first, second, stats
+
+    first, second, stats = asyncio.run(main())
+
+    assert (first.token, second.token) == ("token-1", "token-2")
+    assert stats["background_refreshes"] == 1
+    assert stats["acquisitions"] == 2
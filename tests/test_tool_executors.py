@@ -0,0 +1,35 @@
+import asyncio
+import threading
+
+from tool_executors import ToolExecutorPools
+
+
+def _thread_name(args):
+    return threading.current_thread().name
+
+
+def test_reconfigure_resizes_pools_used_by_wrapped_tools():
+    pools = ToolExecutorPools({"thread": {"max_workers": 2}})
+    tool = pools.wrap("thread", _thread_name, __name__, "_thread_name")
+
+    async def main():
+        await tool({})
+        before = pools.get_stats()["thread"]["max_workers"]
+        pools.reconfigure({"thread": {"max_workers": 5}})
+        await tool({})
+        return before, pools.get_stats()["thread"]["max_workers"]
+
+    try:
+        assert asyncio.run(main()) == (2, 5)
+    finally:
+        pools.shutdown()
+
+
+def test_reconfigure_with_same_settings_keeps_pools():
+    pools = ToolExecutorPools({"thread": {"max_workers": 2}})
+    pool = pools._get_pool("thread")
+
+    pools.reconfigure({"thread": {"max_workers": 2}})
+
+    assert pools._get_pool("thread") is pool
+    pools.shutdown()
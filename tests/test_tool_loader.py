@@ -0,0 +1,59 @@
+import threading
+import time
+
+import tool_loader
+
+
+def test_concurrent_first_use_builds_one_loader(monkeypatch):
+    built = []
+
+    class SlowLoader:
+        def __init__(self, config_file="tools_config.yaml"):
+            time.sleep(0.05)
+            built.append(self)
+
+    monkeypatch.setattr(tool_loader, "ToolConfigLoader", SlowLoader)
+    monkeypatch.setattr(tool_loader, "_tool_loader", None)
+    loaders = []
+    threads = [
+        threading.Thread(target=lambda: loaders.append(tool_loader.get_tool_loader()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(built) == 1
+    assert all(loader is built[0] for loader in loaders)
+
+
+def test_reload_applies_resilience_and_retry_budget_changes(tmp_path):
+    config_path = tmp_path / "tools_config.yaml"
+    config_path.write_text(
+        "retry_budget: {ratio: 0.1, max_tokens: 10}\n"
+        "tools:\n"
+        "  - name: lookup\n"
+        "    resilience: {max_retries: 1}\n"
+    )
+    loader = tool_loader.ToolConfigLoader()
+    loader.config_path = config_path
+    loader.reload()
+    policy = loader._get_resilience_policy(
+        "lookup", loader.get_tool_config("lookup")["resilience"]
+    )
+
+    config_path.write_text(
+        "retry_budget: {ratio: 0.2, max_tokens: 4}\n"
+        "tools:\n"
+        "  - name: lookup\n"
+        "    resilience: {max_retries: 3, fallback_message: indisponível}\n"
+    )
+    loader.reload()
+
+    assert loader.resilience_policies["lookup"] is policy
+    assert policy.max_retries == 3
+    assert policy.fallback_message == "indisponível"
+    assert (loader.retry_budget.ratio, loader.retry_budget.max_tokens) == (0.2, 4)
+    assert loader.retry_budget.tokens == 4
+    loader.shutdown_executors()
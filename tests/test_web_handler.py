@@ -0,0 +1,349 @@
+import asyncio
+import json
+
+import pytest
+from azure.ai.voicelive.models import ServerEvent
+
+from replay_session import FakeConnection, NullBridge
+import web_handler
+from tracing import TracingManager
+from web_handler import WebSocketVoiceClient
+
+
+def _event(payload):
+    return ServerEvent.deserialize({"event_id": "event", **payload})
+
+
+def _function_call(call_id, name, arguments='{"query": "taxa"}'):
+    return [
+        _event(
+            {
+                "type": "conversation.item.created",
+                "item": {
+                    "type": "function_call",
+                    "id": f"item-{call_id}",
+                    "call_id": call_id,
+                    "name": name,
+                    "arguments": "",
+                },
+            }
+        ),
+        _event(
+            {
+                "type": "response.function_call_arguments.done",
+                "response_id": "response-1",
+                "item_id": f"item-{call_id}",
+                "output_index": 0,
+                "call_id": call_id,
+                "name": name,
+                "arguments": arguments,
+            }
+        ),
+    ]
+
+
+def _response_done(status="completed"):
+    return _event(
+        {"type": "response.done", "response": {"id": "response-1", "status": status}}
+    )
+
+
+def _client():
+    client = WebSocketVoiceClient(
+        client_id="test-client",
+        endpoint="test",
+        credential=None,
+        bridge=NullBridge(),
+    )
+    executed = []
+
+    async def lookup(arguments):
+        executed.append(arguments)
+        return {"answer": "8% ao mês"}
+
+    client.available_functions = {"lookup": lookup}
+    client.tool_loader = None
+    return client, executed
+
+
+async def _handle(client, connection, events):
+    for event in events:
+        await client._handle_event(event, connection)
+    await asyncio.gather(*client.function_call_tasks)
+
+
+def test_calls_of_a_cancelled_response_are_dropped():
+    async def main():
+        client, executed = _client()
+        connection = FakeConnection()
+        events = _function_call("call-1", "lookup") + [_response_done("cancelled")]
+        await _handle(client, connection, events)
+        return client, executed, connection
+
+    client, executed, connection = asyncio.run(main())
+
+    assert executed == []
+    assert client.pending_function_calls == {}
+    assert connection.calls["response.create"] == 0
+    assert connection.calls["conversation.item.create"] == 0
+
+
+def test_calls_of_a_completed_response_are_answered():
+    async def main():
+        client, executed = _client()
+        connection = FakeConnection()
+        events = _function_call("call-1", "lookup") + [_response_done()]
+        await _handle(client, connection, events)
+        return executed, connection
+
+    executed, connection = asyncio.run(main())
+
+    assert len(executed) == 1
+    assert connection.calls["conversation.item.create"] == 1
+    assert connection.calls["response.create"] == 1
+
+
+def test_unknown_function_gets_an_error_output():
+    async def main():
+        client, _ = _client()
+        connection = FakeConnection()
+        events = _function_call("call-1", "missing") + [_response_done()]
+        await _handle(client, connection, events)
+        return client, connection
+
+    client, connection = asyncio.run(main())
+
+    assert connection.calls["conversation.item.create"] == 1
+    assert connection.calls["response.create"] == 1
+    assert client.bridge.messages["tool_call_error"] == 1
+
+
+class SpeculativeLoader:
+    """Tool loader stand-in that marks every tool speculative."""
+
+    def is_tool_speculative(self, function_name):
+        return True
+
+    def get_tool_timeout(self, function_name):
+        return 10
+
+    def get_tool_filler_after_ms(self, function_name):
+        return None
+
+
+def test_speculative_tool_starts_before_the_response_is_done():
+    async def main():
+        client, executed = _client()
+        client.tool_loader = SpeculativeLoader()
+        connection = FakeConnection()
+        for event in _function_call("call-1", "lookup"):
+            await client._handle_event(event, connection)
+        # Give the speculative task a moment to reach the tool
+        await asyncio.sleep(0.01)
+        started_early = len(executed)
+        await _handle(client, connection, [_response_done()])
+        return started_early, executed, connection
+
+    started_early, executed, connection = asyncio.run(main())
+
+    assert started_early == 1
+    # The early result is reused rather than running the tool again
+    assert len(executed) == 1
+    assert connection.calls["conversation.item.create"] == 1
+    assert connection.calls["response.create"] == 1
+
+
+class PrefetchLoader:
+    """Tool loader stand-in that prefetches `lookup` for every session."""
+
+    def __init__(self, timeout_s=10):
+        self.timeout_s = timeout_s
+
+    def get_prefetch_tools(self):
+        return [{"name": "lookup", "prefetch_arguments": {"query": "Fatura  atual"}}]
+
+    def get_tool_timeout(self, function_name):
+        return self.timeout_s
+
+
+def test_prefetched_result_only_answers_matching_arguments():
+    async def main():
+        client, executed = _client()
+        client.tool_loader = PrefetchLoader()
+        client._start_prefetch()
+        matching = await client._invoke_function("lookup", '{"query": "fatura atual"}')
+        await client._invoke_function("lookup", '{"query": "limite do cartão"}')
+        client.tool_store.clear()
+        return matching, executed
+
+    matching, executed = asyncio.run(main())
+
+    assert matching == {"answer": "8% ao mês"}
+    # The prefetch answered the matching call; the other query ran the tool
+    assert executed == [{"query": "Fatura  atual"}, '{"query": "limite do cartão"}']
+
+
+def test_prefetch_is_bounded_by_the_tool_timeout():
+    async def main():
+        client, _ = _client()
+
+        async def hanging(arguments):
+            await asyncio.Event().wait()
+
+        client.available_functions = {"lookup": hanging}
+        client.tool_loader = PrefetchLoader(timeout_s=0.05)
+        client._start_prefetch()
+        key = client._prefetch_key("lookup", {"query": "fatura atual"})
+        await asyncio.sleep(0.1)
+        return client.tool_store.get(key)
+
+    # The timed-out prefetch is discarded instead of lingering in the store
+    assert asyncio.run(main()) is None
+
+
+def _speech_started():
+    return _event(
+        {
+            "type": "input_audio_buffer.speech_started",
+            "audio_start_ms": 1200,
+            "item_id": "next-user-item",
+        }
+    )
+
+
+def test_barge_in_during_a_tool_call_skips_the_tool_reply():
+    async def main():
+        client, executed = _client()
+        release = asyncio.Event()
+
+        async def slow_lookup(arguments):
+            await release.wait()
+            executed.append(arguments)
+            return {"answer": "8% ao mês"}
+
+        client.available_functions = {"lookup": slow_lookup}
+        connection = FakeConnection()
+        for event in _function_call("call-1", "lookup") + [_response_done()]:
+            await client._handle_event(event, connection)
+        # The caller speaks while the tool is still running
+        await client._handle_event(_speech_started(), connection)
+        release.set()
+        await asyncio.gather(*client.function_call_tasks)
+        return executed, connection
+
+    executed, connection = asyncio.run(main())
+
+    assert len(executed) == 1
+    # The output is kept as context, but no reply talks over the caller
+    assert connection.calls["conversation.item.create"] == 1
+    assert connection.calls["response.create"] == 0
+
+
+def test_failed_submission_still_answers_every_call(monkeypatch):
+    outputs = []
+
+    def output_item(call_id, output):
+        outputs.append((call_id, output))
+        return {"call_id": call_id, "output": output}
+
+    monkeypatch.setattr(web_handler, "FunctionCallOutputItem", output_item)
+
+    async def main():
+        client, _ = _client()
+
+        async def unserializable(arguments):
+            return {"answer": {8, 5}}
+
+        client.available_functions["broken"] = unserializable
+        connection = FakeConnection()
+        events = (
+            _function_call("call-1", "broken")
+            + _function_call("call-2", "lookup")
+            + [_response_done()]
+        )
+        await _handle(client, connection, events)
+        return connection
+
+    connection = asyncio.run(main())
+
+    assert [call_id for call_id, _ in outputs] == ["call-1", "call-2"]
+    assert all("error" in json.loads(output) for _, output in outputs)
+    assert connection.calls["conversation.item.create"] == 2
+    assert connection.calls["response.create"] == 1
+
+
+class StubPhraseCache:
+    def get_phrase(self, name):
+        return "Olá!"
+
+    async def get(self, text, voice):
+        return None
+
+
+@pytest.mark.parametrize("enabled, expected", [(None, 0), ("true", 1)])
+def test_greeting_is_spoken_only_when_enabled(monkeypatch, enabled, expected):
+    if enabled is None:
+        monkeypatch.delenv("GREETING_ENABLED", raising=False)
+    else:
+        monkeypatch.setenv("GREETING_ENABLED", enabled)
+
+    async def main():
+        client, _ = _client()
+        client.phrase_cache = StubPhraseCache()
+        connection = FakeConnection()
+        await client._speak_greeting(connection)
+        return connection
+
+    assert asyncio.run(main()).calls["response.create"] == expected
+
+
+def _turn_events(*response_events):
+    return [
+        _event(
+            {
+                "type": "input_audio_buffer.speech_stopped",
+                "audio_end_ms": 900,
+                "item_id": "user-item",
+            }
+        ),
+        *response_events,
+    ]
+
+
+def _audio_done():
+    return _event(
+        {
+            "type": "response.audio.done",
+            "response_id": "response-1",
+            "item_id": "audio-item",
+            "output_index": 0,
+            "content_index": 0,
+        }
+    )
+
+
+def test_turn_spans_tool_calls_made_after_speaking():
+    pytest.importorskip("opentelemetry.sdk")
+    tracing = TracingManager(exporter="memory", sample_ratio=1.0)
+
+    async def main():
+        client, _ = _client()
+        client.tracing = tracing
+        connection = FakeConnection()
+        # The model speaks, then calls a tool in the same response
+        events = _turn_events(
+            _audio_done(), *_function_call("call-1", "lookup"), _response_done()
+        )
+        await _handle(client, connection, events)
+        open_after_tools = client.turn_span.is_recording()
+        # The follow-up answer closes the turn
+        await _handle(client, connection, [_audio_done(), _response_done()])
+        return open_after_tools
+
+    assert asyncio.run(main())
+    spans = {span.name: span for span in tracing.memory_exporter.get_finished_spans()}
+    turn, tool = spans["voice.turn"], spans["voice.tool"]
+    assert turn.attributes["turn.tool_calls"] == 1
+    assert turn.attributes["turn.interrupted"] is False
+    assert tool.parent.span_id == turn.context.span_id
+    tracing.shutdown()